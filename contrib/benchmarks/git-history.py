@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Measure git history ingestion for package history caches.
+
+Generates a synthetic ebuild repo history via ``git fast-import`` including
+merged side branches, then times the underlying ``git log`` run on its own
+and building the package history used by the git cache, e.g.:
+
+    contrib/benchmarks/git-history.py -n 50000
+
+An existing git repo can be benchmarked instead via ``--repo``.
+"""
+
+import argparse
+import random
+import shlex
+import subprocess
+import tempfile
+import time
+
+from pkgcheck.addons.git import GitAddon, GitRepoPkgs
+
+
+class Repo:
+    """Minimal repo object exposing what history parsing requires."""
+
+    def __init__(self, location):
+        self.location = location
+
+    def __str__(self):
+        return self.location
+
+
+def generate(path, commits, pkgs, seed):
+    """Create a git repo with the given number of commits changing ebuilds.
+
+    Every 50th commit merges a side branch started 20 commits earlier.
+    """
+    rng = random.Random(seed)
+    subprocess.run(["git", "init", "-q", "-b", "main", path], check=True)
+    versions = {}
+    timestamp = 1_500_000_000
+    stream = []
+
+    def commit(mark, ref, parents):
+        nonlocal timestamp
+        timestamp += rng.randint(1, 600)
+        stream.extend(
+            (
+                f"commit {ref}",
+                f"mark :{mark}",
+                f"committer dev <dev@example.com> {timestamp} +0000",
+                "data 6",
+                "change",
+            )
+        )
+        stream.extend(f"{x} :{parent}" for x, parent in zip(("from", "merge"), parents))
+        for _ in range(rng.randint(1, 4)):
+            pkg = rng.randrange(pkgs)
+            path = f"cat-{pkg % 100}/pkg{pkg}/pkg{pkg}"
+            if (version := versions.get(pkg)) is not None and rng.random() < 0.3:
+                stream.append(f"D {path}-{version}.ebuild")
+                del versions[pkg]
+            else:
+                version = versions[pkg] = (version or 0) + rng.randint(0, 1)
+                data = f"EAPI=8\n# {rng.random()}\n"
+                stream.extend((f"M 644 inline {path}-{version}.ebuild", f"data {len(data)}", data))
+
+    main_marks = []
+    for i in range(1, commits + 1):
+        parents = main_marks[-1:]
+        if i % 50 == 0 and len(main_marks) > 20:
+            side = [main_marks[-20]]
+            for j in range(5):
+                side.append(commits + i + j)
+                commit(side[-1], "refs/heads/side", side[-2:-1])
+            parents.append(side[-1])
+        commit(i, "refs/heads/main", parents)
+        main_marks.append(i)
+    data = "\n".join(stream) + "\n"
+    subprocess.run(["git", "fast-import", "--quiet"], cwd=path, input=data.encode(), check=True)
+    subprocess.run(["git", "checkout", "-q", "-f", "main"], cwd=path, check=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--repo", help="existing git repo to benchmark")
+    parser.add_argument("-n", "--commits", type=int, default=20_000, help="generated commits")
+    parser.add_argument("-p", "--pkgs", type=int, default=5_000, help="generated packages")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        if options.repo is None:
+            options.repo = tmpdir
+            start = time.perf_counter()
+            generate(tmpdir, options.commits, options.pkgs, options.seed)
+            print(f"generated {options.commits} commits in {time.perf_counter() - start:.2f}s")
+
+        cmd = shlex.split(GitRepoPkgs._git_cmd)
+        cmd.extend(("--format=tformat:%n%h%n%ct", "HEAD"))
+        start = time.perf_counter()
+        subprocess.run(cmd, cwd=options.repo, stdout=subprocess.DEVNULL, check=True)
+        print(f"git log: {time.perf_counter() - start:.2f}s")
+
+        start = time.perf_counter()
+        changes = sum(1 for _ in GitAddon._pkg_changes(Repo(options.repo), "HEAD"))
+        elapsed = time.perf_counter() - start
+        print(f"history: {elapsed:.2f}s, {changes} changes, {changes / elapsed:.0f} changes/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Measure the cost of the line scanning ebuild file checks over a repo.
+
+Loads the file contents of a repo's ebuilds up front and then times feeding
+them to every check using the line scanning addon, both with one scanner
+shared between all checks as done during scans and with a separate scanner
+per check, e.g.:
+
+    contrib/benchmarks/line-scan.py /var/db/repos/gentoo
+
+Per-check timings for the shared run are also reported, with the first check
+fed each ebuild being charged for scanning it.
+"""
+
+import argparse
+import time
+from collections import defaultdict
+from itertools import islice
+
+from pkgcore.restrictions import packages
+
+from pkgcheck import addons, objects, scan, sources
+
+
+def feed(pkgs, checks):
+    """Feed packages to checks, returning the time spent per check."""
+    times = defaultdict(float)
+    for pkg in pkgs:
+        for check in checks:
+            start = time.perf_counter()
+            for _ in check.feed(pkg):
+                pass
+            times[check.__class__.__name__] += time.perf_counter() - start
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("repo", help="path to the repo to scan")
+    parser.add_argument("-n", "--num", type=int, help="limit the number of ebuilds")
+    options = parser.parse_args()
+
+    check_classes = [
+        cls for cls in objects.CHECKS.values() if addons.LineScanAddon in cls.required_addons
+    ]
+    pipeline = scan(["-r", options.repo, "-c", ",".join(x.__name__ for x in check_classes)])
+    scan_options = pipeline.options
+
+    start = time.perf_counter()
+    source = sources.EbuildFileRepoSource(scan_options)
+    pkgs = list(islice(source.itermatch(packages.AlwaysTrue), options.num))
+    print(f"loaded {len(pkgs)} ebuilds in {time.perf_counter() - start:.2f}s")
+
+    addon = addons.LineScanAddon(scan_options)
+    shared = [cls(scan_options, line_scan_addon=addon) for cls in check_classes]
+    separate = [
+        cls(scan_options, line_scan_addon=addons.LineScanAddon(scan_options))
+        for cls in check_classes
+    ]
+
+    times = feed(pkgs, shared)
+    total = sum(times.values())
+    for name, elapsed in sorted(times.items(), key=lambda x: x[1], reverse=True):
+        print(f"  {name}: {elapsed:.2f}s")
+    print(f"shared:   {total:.2f}s, {len(pkgs) / total:.0f} ebuilds/s")
+    total = sum(feed(pkgs, separate).values())
+    print(f"separate: {total:.2f}s, {len(pkgs) / total:.0f} ebuilds/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""Measure network check throughput against local servers.
+
+Starts local HTTP, HTTPS, and FTP servers responding with a configurable
+latency, generates a repo with one package per URL, and scans its homepages
+for each given ``--tasks`` value, reporting wall time and URLs per second, e.g.:
+
+    contrib/benchmarks/network.py -n 500 --tasks 10 50 100 --latency 0.1
+
+A fraction of the URLs point to missing paths to exercise dead URL handling.
+HTTPS support requires the openssl binary to generate a self-signed
+certificate, otherwise it's skipped. Per-host task limits default to the
+largest tasks value since all servers run on the same host.
+"""
+
+import argparse
+import os
+import shutil
+import socket
+import socketserver
+import ssl
+import subprocess
+import tempfile
+import textwrap
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from pkgcheck import scan
+
+
+class HTTPHandler(BaseHTTPRequestHandler):
+    """Respond to requests for existing paths with 200, otherwise 404."""
+
+    def _respond(self):
+        time.sleep(self.server.latency)
+        self.send_response(200 if self.path.startswith("/ok") else 404)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    do_GET = do_HEAD = _respond
+
+    def log_message(self, *args):
+        pass
+
+
+class FTPHandler(socketserver.StreamRequestHandler):
+    """Minimal passive mode FTP server supporting what urllib requires."""
+
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def transfer(self, data_sock, data=b""):
+        self.reply("150 opening data connection")
+        conn, _ = data_sock.accept()
+        with conn:
+            conn.sendall(data)
+        data_sock.close()
+        self.reply("226 transfer complete")
+
+    def handle(self):
+        self.reply("220 ready")
+        data_sock = None
+        for line in self.rfile:
+            cmd, _, arg = line.decode().strip().partition(" ")
+            match cmd.upper():
+                case "USER":
+                    self.reply("331 password required")
+                case "PASS":
+                    self.reply("230 logged in")
+                case "TYPE":
+                    self.reply("200 type set")
+                case "PWD":
+                    self.reply('257 "/"')
+                case "CWD":
+                    if arg in ("", ".", "/"):
+                        self.reply("250 directory changed")
+                    else:
+                        self.reply("550 no such directory")
+                case "PASV":
+                    data_sock = socket.create_server(("127.0.0.1", 0))
+                    port = data_sock.getsockname()[1]
+                    self.reply(f"227 entering passive mode (127,0,0,1,{port >> 8},{port & 255})")
+                case "RETR":
+                    time.sleep(self.server.latency)
+                    if arg.lstrip("/").startswith("ok"):
+                        self.transfer(data_sock, b"data")
+                    else:
+                        self.reply("550 no such file")
+                case "LIST":
+                    self.transfer(data_sock)
+                case "QUIT":
+                    self.reply("221 bye")
+                    break
+                case _:
+                    self.reply("502 command not implemented")
+
+
+@contextmanager
+def serve(server):
+    """Run a given server in a separate thread."""
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def https_server(tmpdir, latency):
+    """Create an HTTPS server using a self-signed certificate, if possible."""
+    if shutil.which("openssl") is None:
+        return None
+    cert = os.path.join(tmpdir, "cert.pem")
+    key = os.path.join(tmpdir, "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1"]
+        + ["-subj", "/CN=127.0.0.1", "-addext", "subjectAltName=IP:127.0.0.1"]
+        + ["-keyout", key, "-out", cert],
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    # trust the certificate for requests made by the scan
+    os.environ["REQUESTS_CA_BUNDLE"] = cert
+    server = ThreadingHTTPServer(("127.0.0.1", 0), HTTPHandler)
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    server.latency = latency
+    return server
+
+
+def create_repo(path, urls):
+    """Create a repo with a package per URL."""
+    os.makedirs(os.path.join(path, "profiles"))
+    os.makedirs(os.path.join(path, "metadata"))
+    with open(os.path.join(path, "profiles", "repo_name"), "w") as f:
+        f.write("benchmark\n")
+    with open(os.path.join(path, "metadata", "layout.conf"), "w") as f:
+        f.write("masters =\ncache-formats =\nthin-manifests = true\n")
+    for i, url in enumerate(urls):
+        pkgdir = os.path.join(path, "cat", f"pkg{i}")
+        os.makedirs(pkgdir)
+        with open(os.path.join(pkgdir, f"pkg{i}-0.ebuild"), "w") as f:
+            f.write(
+                textwrap.dedent(
+                    f"""\
+                        EAPI=8
+                        DESCRIPTION="benchmark package"
+                        HOMEPAGE="{url}"
+                        SLOT="0"
+                    """
+                )
+            )
+
+
+def measure(repo, cache_dir, tasks, host_tasks, timeout):
+    """Scan a repo's homepages, returning the wall time and number of results."""
+    args = ["--config", "no", "--cache-dir", cache_dir, "--cache=-url", "--net"]
+    args += ["-r", repo, "-c", "HomepageUrlCheck", "--timeout", str(timeout)]
+    args += ["--tasks", str(tasks), "--host-tasks", str(host_tasks)]
+    start = time.perf_counter()
+    results = list(scan(args))
+    return time.perf_counter() - start, len(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("-n", "--urls", type=int, default=300, help="URLs per protocol")
+    parser.add_argument(
+        "--tasks", type=int, nargs="+", default=[5, 20, 50, 100], help="--tasks values to run"
+    )
+    parser.add_argument("--host-tasks", type=int, help="per-host task limit")
+    parser.add_argument("--latency", type=float, default=0.05, help="response latency in seconds")
+    parser.add_argument("--timeout", type=float, default=5, help="network check timeout")
+    parser.add_argument("--dead", type=float, default=0.1, help="fraction of dead URLs")
+    parser.add_argument(
+        "--protocols",
+        nargs="+",
+        choices=("http", "https", "ftp"),
+        default=["http", "https", "ftp"],
+        help="protocols to test",
+    )
+    options = parser.parse_args()
+    host_tasks = options.host_tasks or max(options.tasks)
+
+    with ExitStack() as stack:
+        tmpdir = stack.enter_context(tempfile.TemporaryDirectory(prefix="pkgcheck-bench-"))
+        servers = {}
+        if "http" in options.protocols:
+            server = ThreadingHTTPServer(("127.0.0.1", 0), HTTPHandler)
+            server.latency = options.latency
+            servers["http"] = stack.enter_context(serve(server))
+        if "https" in options.protocols:
+            if server := https_server(tmpdir, options.latency):
+                servers["https"] = stack.enter_context(serve(server))
+            else:
+                print("openssl not found, skipping HTTPS")
+        if "ftp" in options.protocols:
+            server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), FTPHandler)
+            server.latency = options.latency
+            servers["ftp"] = stack.enter_context(serve(server))
+
+        print(
+            f"{'protocol':<8} {'tasks':>6} {'URLs':>6} {'results':>7} {'seconds':>9} {'URLs/sec':>9}"
+        )
+        for protocol, server in servers.items():
+            port = server.server_address[1]
+            dead = int(options.urls * options.dead)
+            urls = [
+                f"{protocol}://127.0.0.1:{port}/{'dead' if i < dead else 'ok'}{i}"
+                for i in range(options.urls)
+            ]
+            repo = os.path.join(tmpdir, protocol)
+            create_repo(repo, urls)
+            for tasks in options.tasks:
+                cache_dir = tempfile.mkdtemp(dir=tmpdir)
+                elapsed, results = measure(repo, cache_dir, tasks, host_tasks, options.timeout)
+                print(
+                    f"{protocol:<8} {tasks:>6} {len(urls):>6} {results:>7} "
+                    f"{elapsed:>9.2f} {len(urls) / elapsed:>9.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
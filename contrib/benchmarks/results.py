@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Measure the cost of creating, hashing, and sorting large result sets.
+
+Generates a mix of version, line, package, and category level results spread
+across a configurable number of packages, then reports the time taken to
+create them, deduplicate them via hashing, and sort them in the same manner
+as pipeline batches, along with their memory usage, e.g.:
+
+    contrib/benchmarks/results.py -n 1000000
+"""
+
+import argparse
+import gc
+import random
+import resource
+import time
+
+from pkgcheck import results
+from pkgcheck.packages import RawCPV
+
+
+class VersionWarning(results.VersionResult, results.Warning):
+    def __init__(self, flags, **kwargs):
+        super().__init__(**kwargs)
+        self.flags = tuple(flags)
+
+    @property
+    def desc(self):
+        return f"unknown flags: {', '.join(self.flags)}"
+
+
+class LineStyle(results.LineResult, results.Style):
+    @property
+    def desc(self):
+        return f"line {self.lineno}: {self.line!r}"
+
+
+class PackageError(results.PackageResult, results.Error):
+    def __init__(self, filename, **kwargs):
+        super().__init__(**kwargs)
+        self.filename = filename
+
+    @property
+    def desc(self):
+        return f"bad file: {self.filename}"
+
+
+class CategoryInfo(results.CategoryResult, results.Info):
+    @property
+    def desc(self):
+        return "category info"
+
+
+def generate(num, pkgs, seed):
+    """Generate a given number of shuffled results."""
+    rng = random.Random(seed)
+    cpvs = [
+        RawCPV(f"cat-{i % 50}", f"pkg-{i}", f"{rng.randint(0, 9)}.{rng.randint(0, 99)}-r{j}")
+        for i in range(pkgs)
+        for j in range(3)
+    ]
+    objs = []
+    for i in range(num):
+        pkg = rng.choice(cpvs)
+        kind = i % 8
+        if kind < 4:
+            objs.append(VersionWarning((f"flag{i % 17}", f"flag{i % 5}"), pkg=pkg))
+        elif kind < 7:
+            objs.append(LineStyle(f"line {i % 101}", i % 300, pkg=pkg))
+        elif i % 16 == 7:
+            objs.append(PackageError(f"file{i % 7}", pkg=pkg))
+        else:
+            objs.append(CategoryInfo(pkg=pkg))
+    rng.shuffle(objs)
+    return objs
+
+
+def max_rss():
+    """Return the peak memory usage of the current process in MiB."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    value = func(*args)
+    return value, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("-n", "--num", type=int, default=1_000_000, help="number of results")
+    parser.add_argument("-p", "--pkgs", type=int, default=20_000, help="number of packages")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    options = parser.parse_args()
+
+    gc.collect()
+    base_mem = max_rss()
+    objs, create = timed(generate, options.num, options.pkgs, options.seed)
+    created_mem = max_rss() - base_mem
+    _, dedupe = timed(set, objs)
+    _, sort = timed(sorted, objs)
+    # sorting again reuses any values cached by the first sort
+    _, resort = timed(sorted, objs)
+    total_mem = max_rss() - base_mem
+
+    print(f"results: {len(objs)}")
+    print(f"create:  {create:.2f}s")
+    print(f"hash:    {dedupe:.2f}s")
+    print(f"sort:    {sort:.2f}s")
+    print(f"resort:  {resort:.2f}s")
+    print(f"memory:  {created_mem:.0f} MiB created, {total_mem:.0f} MiB peak")
+
+
+if __name__ == "__main__":
+    main()
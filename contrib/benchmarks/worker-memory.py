@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Measure the memory usage of forked scanning processes.
+
+Scans a repo and reports the memory usage of every pool process once it
+finishes its work, split into private pages (copied after forking) and
+proportional set size (shared pages divided between the processes using them).
+
+By default two scans are run, one with GC freezing before forking disabled and
+one with it enabled, e.g.:
+
+    contrib/benchmarks/worker-memory.py -j 8 /var/db/repos/gentoo -- -c VisibilityCheck
+
+Requires Linux for /proc/self/smaps_rollup support.
+"""
+
+import argparse
+import gc
+import multiprocessing
+import os
+import statistics
+from unittest.mock import patch
+
+from pkgcheck import scan
+from pkgcheck.pipeline import Pipeline
+
+FIELDS = ("Rss", "Pss", "Private_Dirty", "Shared_Clean", "Shared_Dirty")
+
+
+def memory_usage():
+    """Return memory usage of the current process in KiB."""
+    usage = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in FIELDS:
+                usage[key] = int(value.split()[0])
+    return usage
+
+
+def measure(repo, jobs, args, frozen):
+    """Run a scan and return the memory usage of all pool processes."""
+    stats_q = multiprocessing.get_context("fork").SimpleQueue()
+    run_checks = Pipeline._run_checks
+
+    def _run_checks(self, *args):
+        run_checks(self, *args)
+        stats_q.put(memory_usage())
+
+    patches = [patch.object(Pipeline, "_run_checks", _run_checks)]
+    if not frozen:
+        patches.extend(
+            [
+                patch("pkgcheck.pipeline.gc.freeze", lambda: None),
+                patch("pkgcheck.pipeline.gc.unfreeze", lambda: None),
+            ]
+        )
+
+    for p in patches:
+        p.start()
+    try:
+        for _ in scan(["-r", repo, "-j", str(jobs)] + args):
+            pass
+    finally:
+        for p in patches:
+            p.stop()
+        gc.collect()
+
+    return [stats_q.get() for _ in range(jobs)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("repo", help="path to the repo to scan")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="pool processes")
+    parser.add_argument(
+        "--mode",
+        choices=("both", "plain", "frozen"),
+        default="both",
+        help="run without GC freezing (plain), with it, or both",
+    )
+    parser.add_argument("args", nargs="*", help="extra `pkgcheck scan` arguments")
+    options = parser.parse_args()
+
+    modes = ("plain", "frozen") if options.mode == "both" else (options.mode,)
+    print(f"{'mode':<8} " + " ".join(f"{x:>14}" for x in FIELDS) + "  (mean KiB per process)")
+    for mode in modes:
+        usage = measure(options.repo, options.jobs, options.args, mode == "frozen")
+        means = (statistics.mean(x[field] for x in usage) for field in FIELDS)
+        print(f"{mode:<8} " + " ".join(f"{x:>14.0f}" for x in means))
+
+
+if __name__ == "__main__":
+    main()
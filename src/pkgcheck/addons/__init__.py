@@ -1,18 +1,27 @@
 """Addon functionality shared by multiple checkers."""
 
-from collections import defaultdict
+import re
+import threading
+import time
+from bisect import bisect_right
+from collections import defaultdict, deque
+from concurrent.futures import Future
 from functools import partial
-from itertools import chain, filterfalse
+from itertools import accumulate, chain, filterfalse
+from urllib.parse import urlsplit
 
 from pkgcore.ebuild import misc
 from pkgcore.ebuild import profiles as profiles_mod
+from pkgcore.fetch import fetchable
+from pkgcore.log import logger as pkgcore_logger
 from pkgcore.restrictions import packages
 from snakeoil.cli import arghparse
+from snakeoil.mappings import ImmutableDict
 from snakeoil.sequences import iflatten_instance
 from snakeoil.strings import pluralism
 
 from .. import base, results
-from ..base import PkgcheckUserException
+from ..base import LogMap, LogReports, PkgcheckUserException
 from ..log import logger
 from . import caches
 
@@ -157,10 +166,18 @@ class UnstatedIuse(results.VersionResult, results.Error):
 class UseAddon(base.Addon):
     """Addon supporting USE flag functionality."""
 
+    # number of recently seen packages with memoized data
+    _memo_size = 64
+
     def __init__(self, *args):
         super().__init__(*args)
         target_repo = self.options.target_repo
+        self._memo = {}
 
+        # Profile objects aren't shared or persisted. Scans create a single
+        # instance per repo via the addons map and new repo objects per run, so
+        # an in-process cache only ever hit in tests. Loading them via the
+        # profiles cache is avoided for the reasons noted below.
         self.profiles = []
         for p in target_repo.profiles:
             try:
@@ -169,6 +186,8 @@ class UseAddon(base.Addon):
                 )
             except profiles_mod.ProfileError:
                 continue
+        # bitmasks of profiles lacking a given flag in IUSE_EFFECTIVE
+        self._profiles_lacking = {}
 
         # TODO: Figure out if there is a more efficient method to determine a
         # repo's global implicit iuse while avoiding profiles cache usage. The
@@ -238,18 +257,47 @@ class UseAddon(base.Addon):
                 unstated.update(filterfalse(stated.__contains__, node.vals))
             yield k, tuple(v)
 
+    def _lacking_profiles(self, flag):
+        """Return the bitmask of profiles lacking a given flag in IUSE_EFFECTIVE."""
+        try:
+            return self._profiles_lacking[flag]
+        except KeyError:
+            bits = 0
+            for i, p in enumerate(self.profiles):
+                if flag not in p.iuse_effective:
+                    bits |= 1 << i
+            self._profiles_lacking[flag] = bits
+            return bits
+
+    def _group_profiles(self, unstated_iuse):
+        """Yield profile names grouped by the sorted USE flags they lack."""
+        groups = [((), (1 << len(self.profiles)) - 1)]
+        for flag in sorted(unstated_iuse):
+            lacking = self._lacking_profiles(flag)
+            split = []
+            for unstated, bits in groups:
+                if missing := bits & lacking:
+                    split.append((unstated + (flag,), missing))
+                if stated := bits & ~lacking:
+                    split.append((unstated, stated))
+            groups = split
+
+        # order groups by their first profile
+        for unstated, bits in sorted(groups, key=lambda x: x[1] & -x[1]):
+            if unstated:
+                names = set()
+                while bits:
+                    names.add(self.profiles[(bits & -bits).bit_length() - 1].name)
+                    bits &= bits - 1
+                yield unstated, sorted(names)
+
     def _unstated_iuse(self, pkg, attr, unstated_iuse):
         """Determine if packages use unstated IUSE for a given attribute."""
         # determine profiles lacking USE flags
         if self.profiles:
-            profiles_unstated = defaultdict(set)
-            if attr is not None:
-                for p in self.profiles:
-                    if profile_unstated := unstated_iuse - p.iuse_effective:
-                        profiles_unstated[tuple(sorted(profile_unstated))].add(p.name)
-
-            for unstated, profiles in profiles_unstated.items():
-                profiles = sorted(profiles)
+            if attr is None:
+                return
+            for unstated, profiles in self._group_profiles(unstated_iuse):
                 if self.options.verbosity > 0:
                     for p in profiles:
                         yield UnstatedIuse(attr, unstated, p, pkg=pkg)
@@ -263,7 +311,8 @@ class UseAddon(base.Addon):
             if unstated_iuse:
                 yield UnstatedIuse(attr, sorted(unstated_iuse), pkg=pkg)
 
-    def use_validate(self, klasses, pkg, seq, attr=None):
+    def _flatten(self, klasses, pkg, seq, attr=None):
+        """Return the flattened USE-conditional mapping and unstated IUSE."""
         skip_filter = (packages.Conditional,) + klasses
         nodes = iflatten_instance(seq, skip_filter)
         unstated = set()
@@ -272,7 +321,258 @@ class UseAddon(base.Addon):
                 nodes, skip_filter, stated=pkg.iuse_stripped, unstated=unstated, attr=attr
             )
         )
-        return vals, self._unstated_iuse(pkg, attr, unstated)
+        return vals, unstated
+
+    def _unstated(self, pkg, attr, unstated):
+        """Yield unstated IUSE results, determining them once per package."""
+        memo = self._pkg_memo(pkg)
+        key = ("unstated", attr, unstated)
+        if (reports := memo.get(key)) is None:
+            reports = memo[key] = tuple(self._unstated_iuse(pkg, attr, set(unstated)))
+        yield from reports
+
+    def use_validate(self, klasses, pkg, seq, attr=None):
+        """Return the USE-conditional mapping and unstated IUSE results for a sequence.
+
+        Flattened sequences are memoized per package and attribute for
+        recently seen packages so checks fed the same package share them.
+        The returned mapping is shared and must not be modified.
+        """
+        memo = self._pkg_memo(pkg)
+        key = (klasses, attr, id(seq))
+        # sequences are kept referenced in entries so their ids can't be reused
+        if (entry := memo.get(key)) is None or entry[0] is not seq:
+            vals, unstated = self._flatten(klasses, pkg, seq, attr)
+            entry = memo[key] = (seq, vals, frozenset(unstated))
+        _seq, vals, unstated = entry
+        return vals, self._unstated(pkg, attr, unstated)
+
+    def _pkg_memo(self, pkg):
+        """Return the memoized data mapping for a given package."""
+        # packages are kept referenced so their ids can't be reused
+        if (entry := self._memo.get(id(pkg))) is not None:
+            return entry[1]
+        memo = {}
+        self._memo[id(pkg)] = (pkg, memo)
+        if len(self._memo) > self._memo_size:
+            del self._memo[next(iter(self._memo))]
+        return memo
+
+    def parse_fetchables(
+        self,
+        pkg,
+        allow_missing_checksums=True,
+        ignore_unknown_mirrors=True,
+        skip_default_mirrors=True,
+    ):
+        """Return the parsed, unflattened SRC_URI of a package.
+
+        SRC_URI is parsed once per package and flag combination for recently
+        seen packages so all checks fed the same package share the results.
+        Log messages emitted during parsing are replayed for every request so
+        log-based reports are still generated.
+        """
+        key = ("fetchables", allow_missing_checksums, ignore_unknown_mirrors, skip_default_mirrors)
+        memo = self._pkg_memo(pkg)
+        if (entry := memo.get(key)) is None:
+            with LogReports(LogMap("pkgcore.log.logger.info", str)) as messages:
+                seq = pkg.generate_fetchables(
+                    allow_missing_checksums=allow_missing_checksums,
+                    ignore_unknown_mirrors=ignore_unknown_mirrors,
+                    skip_default_mirrors=skip_default_mirrors,
+                )
+            entry = memo[key] = (seq, tuple(messages))
+        seq, messages = entry
+        for msg in messages:
+            pkgcore_logger.info(msg)
+        return seq
+
+    def fetchables(self, pkg, **kwargs):
+        """Return the USE-conditional fetchables mapping for a package.
+
+        Keyword arguments are passed through to :py:meth:`parse_fetchables`.
+        For repos lacking USE flag data, conditionals are flattened without
+        their restrictions and unstated IUSE isn't reported.
+        """
+        seq = self.parse_fetchables(pkg, **kwargs)
+        return self.get_filter("fetchables")((fetchable,), pkg, seq)
+
+
+class LineScanAddon(base.Addon):
+    """Scan file lines for multiple registered patterns at once.
+
+    Checks register regexes on initialization which are then run over an
+    item's full text in C instead of per line in Python. Patterns anchored to
+    line starts are combined into a single alternation while others are
+    searched for separately, since combining them defeats the regex engine's
+    literal prefix optimizations. Anchored patterns using capturing groups are
+    also searched for separately since group names and backreference numbers
+    don't survive being combined. Patterns are rerun on matching lines to
+    determine exact results. Results for the most recently scanned item are
+    kept so all checks fed the same item share one scan.
+
+    Registrations last as long as the addon, so each pipeline only scans for
+    the patterns of its enabled checks.
+    """
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._patterns = {}
+        self._groups = None
+        self._item = None
+        self._matches = None
+
+    def register(self, pattern):
+        """Register a given regex pattern, returning its compiled form.
+
+        Patterns are matched against separate lines and shouldn't use
+        anchors other than ``^`` at their start.
+        """
+        regex = re.compile(pattern)
+        if regex not in self._patterns:
+            self._patterns[regex] = None
+            # force regrouping and rescans
+            self._groups = None
+            self._item = None
+        return regex
+
+    def _compile(self):
+        """Return scanning regexes paired with the patterns they cover."""
+        anchored = [x for x in self._patterns if x.pattern.startswith("^") and not x.groups]
+        groups = [
+            (re.compile(x.pattern, re.MULTILINE), (x,)) for x in self._patterns if x not in anchored
+        ]
+        if anchored:
+            combined = "|".join(f"(?:{x.pattern[1:]})" for x in anchored)
+            groups.append((re.compile(f"^(?:{combined})", re.MULTILINE), tuple(anchored)))
+        return groups
+
+    def _scan(self, lines):
+        matches = defaultdict(list)
+        if self._groups is None:
+            self._groups = self._compile()
+        text = "".join(lines)
+        sep = 0
+        if text.count("\n") < len(lines) - 1:
+            # lines lacking newlines
+            text = "\n".join(lines)
+            sep = 1
+        ends = None
+        for scan_regex, patterns in self._groups:
+            search = scan_regex.search
+            pos = 0
+            while mo := search(text, pos):
+                if ends is None:
+                    ends = list(accumulate(len(x) + sep for x in lines))
+                i = bisect_right(ends, mo.start())
+                if i == len(lines):
+                    # empty match at the end of the text
+                    break
+                line = lines[i]
+                for regex in patterns:
+                    if regex.search(line):
+                        matches[regex].append(i + 1)
+                pos = ends[i]
+        return matches
+
+    def lines(self, item, regex):
+        """Return the line numbers of an item's lines matching a registered regex."""
+        if item is not self._item:
+            self._matches = self._scan(item.lines)
+            self._item = item
+        return self._matches.get(regex, ())
+
+
+class UrlCacheTtlArgs(arghparse.CommaSeparatedValues):
+    """Parse URL cache TTL overrides for the UrlCacheAddon."""
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        ttls = {}
+        for value in self.parse_values(values):
+            ttl_type, _, days = value.partition("=")
+            if ttl_type not in UrlCacheAddon.ttls:
+                choices = ", ".join(sorted(UrlCacheAddon.ttls))
+                parser.error(f"unknown URL cache TTL type: {ttl_type!r} (choose from {choices})")
+            try:
+                ttls[ttl_type] = float(days)
+            except ValueError:
+                parser.error(f"invalid URL cache TTL: {value!r}")
+        setattr(namespace, self.dest, ttls)
+
+
+class UrlCacheAddon(caches.CachedAddon):
+    """Cache of URL verification results for network checks.
+
+    Entries map verification methods and URLs to their results and the time
+    they were verified. Entries expire using the TTL for their result type
+    so dead URLs are rechecked sooner than valid ones.
+    """
+
+    # cache registry
+    cache = caches.CacheData(type="url", file="url.pickle", version=1, portable=True)
+    # default TTLs in days for each result type
+    ttls = ImmutableDict({"ok": 7, "redirect": 7, "dead": 1, "ssl": 1})
+    # mapping of result names to TTL types, unlisted results use the "ok" TTL
+    result_ttls = ImmutableDict(
+        {
+            "DeadUrl": "dead",
+            "SSLCertificateError": "ssl",
+            "RedirectedUrl": "redirect",
+            "HttpsUrlAvailable": "redirect",
+        }
+    )
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        ttls = dict(self.ttls)
+        ttls.update(getattr(self.options, "url_cache_ttl", None) or {})
+        self._ttls = {k: v * 86400 for k, v in ttls.items()}
+        # mapping of (method, URL) keys to (timestamp, result class, result attrs)
+        self._entries = {}
+        self._modified = False
+
+    def _expired(self, entry, now):
+        """Determine if a given cache entry is older than its TTL."""
+        timestamp, result_cls, _attrs = entry
+        ttl_type = "ok" if result_cls is None else self.result_ttls.get(result_cls.__name__, "ok")
+        return now - timestamp >= self._ttls[ttl_type]
+
+    def get(self, key):
+        """Return the cached result for a given key.
+
+        KeyError is raised for missing or expired entries.
+        """
+        entry = self._entries[key]
+        if self._expired(entry, time.time()):
+            raise KeyError(key)
+        _timestamp, result_cls, attrs = entry
+        return None if result_cls is None else result_cls._create(**attrs)
+
+    def record(self, key, future):
+        """Cache the result of a completed verification task."""
+        if future.exception() is None:
+            if (result := future.result()) is None:
+                self._entries[key] = (time.time(), None, None)
+            else:
+                self._entries[key] = (time.time(), result.__class__, dict(result._attrs))
+            self._modified = True
+
+    def flush(self):
+        """Push cache updates to disk."""
+        if self._modified:
+            data = caches.DictCache(self._entries, self.cache)
+            self.save_cache(data, self.cache_file(self.options.target_repo))
+            self._modified = False
+
+    def update_cache(self, force=False):
+        """Load the related cache, dropping expired entries."""
+        entries = {}
+        if not force:
+            entries = self.load_cache(self.cache_file(self.options.target_repo), fallback={})
+        now = time.time()
+        self._entries = {k: v for k, v in entries.items() if not self._expired(v, now)}
+        self._modified = force or len(self._entries) != len(entries)
+        self.flush()
 
 
 class NetAddon(base.Addon):
@@ -281,6 +581,14 @@ class NetAddon(base.Addon):
     def __init__(self, *args):
         super().__init__(*args)
 
+        # cached URL verification results, disabled via --cache=-url
+        self.url_cache = None
+        if self.options.net:
+            try:
+                self.url_cache = init_addon(UrlCacheAddon, self.options)
+            except caches.CacheDisabled:
+                pass
+
         if self.options.timeout == 0:
             # set timeout to 0 to never timeout
             self.timeout = None
@@ -288,6 +596,11 @@ class NetAddon(base.Addon):
             # default to timing out connections after 5 seconds
             self.timeout = self.options.timeout if self.options.timeout is not None else 5
 
+        # per-host task limits and queued tasks
+        self._host_lock = threading.Lock()
+        self._host_tasks = defaultdict(int)
+        self._host_queues = defaultdict(deque)
+
     @classmethod
     def mangle_argparser(cls, parser):
         group = parser.add_argument_group("network")
@@ -297,6 +610,76 @@ class NetAddon(base.Addon):
         group.add_argument(
             "--user-agent", default="Wget/1.20.3 (linux-gnu)", help="custom user agent spoofing"
         )
+        group.add_argument(
+            "--host-tasks",
+            type=arghparse.positive_int,
+            default=4,
+            help="number of concurrent network tasks per host",
+            docs="""
+                Number of network tasks to run concurrently against any single
+                host (defaults to 4). Further tasks for busy hosts are queued
+                so they don't block tasks for other hosts.
+            """,
+        )
+        group.add_argument(
+            "--host-delay",
+            type=float,
+            default=0,
+            help="delay in seconds between network tasks per host",
+            docs="""
+                Delay in seconds between consecutive network tasks run against
+                the same host (disabled by default).
+            """,
+        )
+        group.add_argument(
+            "--url-cache-ttl",
+            metavar="TYPE=DAYS",
+            action=UrlCacheTtlArgs,
+            help="comma separated list of URL cache TTLs",
+            docs="""
+                Comma separated list of TTLs in days for cached URL verification
+                results by result type, e.g. ``--url-cache-ttl ok=14,dead=0.5``.
+
+                Supported types are ``ok``, ``redirect``, ``dead``, and ``ssl``
+                defaulting to 7, 7, 1, and 1 days respectively. Setting a TTL
+                of zero forces URLs with related results to be rechecked.
+            """,
+        )
+
+    def submit(self, executor, url, func, *args, **kwargs):
+        """Schedule a task targeting a given URL, limiting concurrent tasks per host.
+
+        Tasks for hosts already running the maximum number of tasks are queued
+        and run in order by the threads serving those hosts, so busy hosts
+        don't tie up the threads required by others.
+        """
+        future = Future()
+        host = urlsplit(url).hostname
+        task = (future, func, args, kwargs)
+        with self._host_lock:
+            if self._host_tasks[host] < self.options.host_tasks:
+                self._host_tasks[host] += 1
+                executor.submit(self._run_host_tasks, host, task)
+            else:
+                self._host_queues[host].append(task)
+        return future
+
+    def _run_host_tasks(self, host, task):
+        """Run a given task and all tasks queued for its host."""
+        while True:
+            future, func, args, kwargs = task
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(func(*args, **kwargs))
+                except Exception as e:
+                    future.set_exception(e)
+            with self._host_lock:
+                if not (queue := self._host_queues[host]):
+                    self._host_tasks[host] -= 1
+                    return
+                task = queue.popleft()
+            if self.options.host_delay:
+                time.sleep(self.options.host_delay)
 
     @property
     def session(self):
@@ -333,6 +716,14 @@ def init_addon(cls, options, addons_map=None, **kwargs):
                 for addon in required_addons
             }
         )
+        optional_addons = chain.from_iterable(
+            x.optional_addons for x in cls.__mro__ if issubclass(x, base.Addon)
+        )
+        for addon in optional_addons:
+            try:
+                kwargs[base.param_name(addon)] = init_addon(addon, options, addons_map)
+            except caches.CacheDisabled:
+                kwargs[base.param_name(addon)] = None
 
         # verify the cache type is enabled
         if issubclass(cls, caches.CachedAddon) and not options.cache[cls.cache.type]:
@@ -1,20 +1,26 @@
 """Base cache support."""
 
 import errno
+import fcntl
+import io
+import json
 import os
 import pathlib
 import pickle
 import shutil
 import subprocess
+import tarfile
+import tempfile
 from collections import UserDict
+from contextlib import contextmanager, nullcontext
 from dataclasses import dataclass
 from hashlib import blake2b
 from operator import attrgetter
 from os.path import join as pjoin
 
+from pkgcore.ebuild.cpv import InvalidCPV, VersionedCPV
 from snakeoil import klass
 from snakeoil.compatibility import IGNORED_EXCEPTIONS
-from snakeoil.fileutils import AtomicWriteFile
 from snakeoil.mappings import ImmutableDict
 
 from ..base import Addon, PkgcheckException, PkgcheckUserException
@@ -28,6 +34,8 @@ class CacheData:
     type: str
     file: str
     version: int
+    # cache doesn't depend on the repo's location or file mtimes
+    portable: bool = False
 
 
 class Cache:
@@ -44,6 +52,27 @@ class DictCache(UserDict, Cache):
         self._cache = cache
 
 
+class _BundleUnpickler(pickle.Unpickler):
+    """Unpickler restricting bundled caches to known, data-only types."""
+
+    _allowed = frozenset(
+        {
+            ("pkgcheck.addons.caches", "CacheData"),
+            ("pkgcheck.addons.caches", "DictCache"),
+        }
+    )
+
+    def find_class(self, module, name):
+        if (module, name) in self._allowed:
+            return super().find_class(module, name)
+        # cached result keywords
+        from .. import objects
+
+        if (cls := objects.KEYWORDS.get(name)) is not None and cls.__module__ == module:
+            return cls
+        raise pickle.UnpicklingError(f"disallowed global: {module}.{name}")
+
+
 class CacheDisabled(PkgcheckException):
     """Exception flagging that a requested cache type is disabled."""
 
@@ -51,6 +80,77 @@ class CacheDisabled(PkgcheckException):
         super().__init__(f"{cache.type} cache support required")
 
 
+class MetadataIndex:
+    """Mixin for cached addons indexing metadata from a repo's md5-cache.
+
+    Index entries are mappings of package versions to their md5-cache file
+    mtimes, package keys, and generated values. Only new or modified md5-cache
+    files are parsed when updating existing indexes.
+    """
+
+    # md5-cache metadata keys used to generate index values
+    metadata_keys = frozenset()
+
+    def index_value(self, metadata):
+        """Return the index value for the given md5-cache metadata."""
+        raise NotImplementedError(self.index_value)
+
+    def _read_metadata(self, path):
+        """Return the used metadata from a given md5-cache file."""
+        metadata = {}
+        with open(path, encoding="utf8") as f:
+            for line in f:
+                key, _, val = line.partition("=")
+                if key in self.metadata_keys:
+                    metadata[key] = val.rstrip("\n")
+        return metadata
+
+    def update_index(self, repo, force=False):
+        """Update the md5-cache index for a given repo and push updates to disk."""
+        md5_cache = pjoin(repo.location, "metadata", "md5-cache")
+        cache_file = self.cache_file(repo)
+        cache_entries = False
+        entries = {}
+
+        if not force:
+            entries = self.load_cache(cache_file, fallback={})
+
+        try:
+            categories = sorted(x.name for x in os.scandir(md5_cache) if x.is_dir())
+        except FileNotFoundError:
+            logger.debug("%s: no md5-cache, %s index disabled", repo, self.cache.type)
+            categories = []
+
+        # check for md5-cache additions and updates
+        existing = set()
+        for category in categories:
+            with os.scandir(pjoin(md5_cache, category)) as it:
+                for entry in it:
+                    cpvstr = f"{category}/{entry.name}"
+                    existing.add(cpvstr)
+                    mtime = entry.stat().st_mtime_ns
+                    if (data := entries.get(cpvstr)) is not None and data[0] == mtime:
+                        continue
+                    try:
+                        key = VersionedCPV(cpvstr).key
+                        value = self.index_value(self._read_metadata(entry.path))
+                    except (InvalidCPV, OSError, UnicodeDecodeError):
+                        continue
+                    entries[cpvstr] = (mtime, key, value)
+                    cache_entries = True
+
+        # check for md5-cache removals
+        for cpvstr in entries.keys() - existing:
+            del entries[cpvstr]
+            cache_entries = True
+
+        if cache_entries:
+            data = DictCache(entries, self.cache)
+            self.save_cache(data, cache_file)
+
+        return entries
+
+
 class CachedAddon(Addon):
     """Mixin for addon classes that create/use data caches."""
 
@@ -58,6 +158,9 @@ class CachedAddon(Addon):
     cache = None
     # registered cache types
     caches = {}
+    # cache bundle format version and manifest file name
+    bundle_version = 1
+    bundle_manifest = "manifest.json"
 
     def __init_subclass__(cls, **kwargs):
         """Register available caches."""
@@ -70,61 +173,277 @@ class CachedAddon(Addon):
         """Update related cache and push updates to disk."""
         raise NotImplementedError(self.update_cache)
 
-    def cache_file(self, repo):
+    def flush(self):
+        """Push cache updates made while scanning to disk."""
+
+    def cache_file(self, repo, cache=None):
         """Return the cache file for a given repository.
 
         A unique token using the repo's location is used so separate repos
-        using the same identifier don't use the same cache file.
+        using the same identifier don't use the same cache file. Portable
+        caches for checkouts of staged changes use their source repo's
+        location.
         """
-        token = blake2b(repo.location.encode()).hexdigest()[:10]
+        cache = cache if cache is not None else self.cache
+        location = repo.location
+        if cache.portable:
+            location = getattr(self.options, "staged_sources", {}).get(location, location)
+        token = blake2b(location.encode()).hexdigest()[:10]
         dirname = f"{repo.repo_id.lstrip(os.sep)}-{token}"
-        return pjoin(self.options.cache_dir, "repos", dirname, self.cache.file)
+        return pjoin(self.options.cache_dir, "repos", dirname, cache.file)
+
+    @staticmethod
+    @contextmanager
+    def _lock_cache(path: str, exclusive=False):
+        """Hold an advisory lock on a given cache file.
 
-    def load_cache(self, path: str, fallback=None):
+        Shared locks are used for reading and exclusive locks for writing so
+        separate pkgcheck processes can safely use the same cache directory.
+        Read-only cache directories are read without locking.
+
+        Lock files are only removed alongside their caches while holding their
+        exclusive lock, so locking is retried if the locked file was unlinked
+        or replaced while waiting on it.
+        """
+        lock_path = f"{path}.lock"
+        while True:
+            try:
+                fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+            except OSError as e:
+                if exclusive or e.errno not in (errno.EACCES, errno.EPERM, errno.EROFS):
+                    raise
+                fd = None
+                break
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+                if os.path.samestat(os.fstat(fd), os.stat(lock_path)):
+                    break
+            except FileNotFoundError:
+                pass
+            except BaseException:
+                os.close(fd)
+                raise
+            os.close(fd)
+        try:
+            yield
+        finally:
+            if fd is not None:
+                os.close(fd)
+
+    def load_cache(self, path: str, fallback=None, lock=True):
+        """Load a given cache file, returning the fallback for missing or invalid caches.
+
+        Locking can be disabled for callers already holding the cache's lock.
+        """
         cache = fallback
         try:
-            if path.endswith(".zst"):
-                if not os.path.exists(path):
-                    raise FileNotFoundError(path)
-                with subprocess.Popen(("zstd", "-qdcf", path), stdout=subprocess.PIPE) as proc:
-                    if proc.poll():
-                        raise PkgcheckUserException(
-                            f"failed decompressing {self.cache.type} cache: {path!r}"
-                        )
-                    cache = pickle.load(proc.stdout)
-            else:
-                with open(path, "rb") as f:
-                    cache = pickle.load(f)
+            if not os.path.exists(path):
+                raise FileNotFoundError(path)
+            with self._lock_cache(path) if lock else nullcontext():
+                if path.endswith(".zst"):
+                    with subprocess.Popen(("zstd", "-qdcf", path), stdout=subprocess.PIPE) as proc:
+                        if proc.poll():
+                            raise PkgcheckUserException(
+                                f"failed decompressing {self.cache.type} cache: {path!r}"
+                            )
+                        cache = pickle.load(proc.stdout)
+                else:
+                    with open(path, "rb") as f:
+                        cache = pickle.load(f)
             if cache.version != self.cache.version:
                 logger.debug("forcing %s cache regen due to outdated version", self.cache.type)
-                os.remove(path)
                 cache = fallback
         except IGNORED_EXCEPTIONS:
             raise
         except FileNotFoundError:
             pass
         except Exception as e:
+            # Invalid cache files are left in place, they're atomically
+            # replaced when the regenerated cache is saved. Removing them here
+            # could clobber a cache that another process is writing.
             logger.debug("forcing %s cache regen: %s", self.cache.type, e)
-            os.remove(path)
             cache = fallback
         return cache
 
-    def save_cache(self, data, path: str):
+    @contextmanager
+    def _write_cache(self, path: str, lock=True):
+        """Context manager yielding a file object that atomically replaces a cache file.
+
+        Data is written to a unique temporary file that is renamed into place
+        so concurrent readers never see partially written caches.
+        """
+        dirname, basename = os.path.split(path)
+        os.makedirs(dirname, exist_ok=True)
+        with self._lock_cache(path, exclusive=True) if lock else nullcontext():
+            fd, tmp_path = tempfile.mkstemp(prefix=f".{basename}.", dir=dirname)
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    yield f
+                os.chmod(tmp_path, 0o644)
+                os.replace(tmp_path, path)
+            except BaseException:
+                try:
+                    os.unlink(tmp_path)
+                except FileNotFoundError:
+                    pass
+                raise
+
+    def save_cache(self, data, path: str, lock=True):
+        """Atomically save data to a given cache file.
+
+        Locking can be disabled for callers already holding the cache's
+        exclusive lock.
+        """
         try:
-            os.makedirs(os.path.dirname(path), exist_ok=True)
-            if path.endswith(".zst"):
-                with subprocess.Popen(("zstd", "-T0", "-fqo", path), stdin=subprocess.PIPE) as proc:
-                    pickle.dump(data, proc.stdin, protocol=-1)
-                if os.path.exists(path[:-4]):
-                    logger.warning("removing old %s cache file", self.cache.type)
-                    os.remove(path[:-4])
-            else:
-                with AtomicWriteFile(path, binary=True) as f:
+            with self._write_cache(path, lock=lock) as f:
+                if path.endswith(".zst"):
+                    with subprocess.Popen(
+                        ("zstd", "-T0", "-qc"), stdin=subprocess.PIPE, stdout=f
+                    ) as proc:
+                        pickle.dump(data, proc.stdin, protocol=-1)
+                    if proc.returncode:
+                        raise OSError(errno.EIO, "zstd compression failed")
+                else:
                     pickle.dump(data, f, protocol=-1)
+            if path.endswith(".zst") and os.path.exists(path[:-4]):
+                logger.warning("removing old %s cache file", self.cache.type)
+                os.remove(path[:-4])
         except OSError as e:
             msg = f"failed dumping {self.cache.type} cache: {path!r}: {e.strerror}"
             raise PkgcheckUserException(msg)
 
+    @staticmethod
+    def _repo_commit(repo):
+        """Return the HEAD commit hash for a git-based repo, if available."""
+        try:
+            p = subprocess.run(
+                ["git", "rev-parse", "HEAD"],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                cwd=repo.location,
+                check=True,
+                encoding="utf8",
+            )
+        except (OSError, subprocess.CalledProcessError):
+            return None
+        return p.stdout.strip()
+
+    @staticmethod
+    def _has_commit(repo, commit):
+        """Determine if a given commit exists in a repo's git history."""
+        try:
+            subprocess.run(
+                ["git", "cat-file", "-e", f"{commit}^{{commit}}"],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                cwd=repo.location,
+                check=True,
+            )
+        except (OSError, subprocess.CalledProcessError):
+            return False
+        return True
+
+    @property
+    def _portable_caches(self):
+        """Registered, portable caches enabled via the current options."""
+        return sorted(
+            (
+                cache
+                for cache in self.caches.values()
+                if cache.portable and self.options.cache.get(cache.type)
+            ),
+            key=attrgetter("type"),
+        )
+
+    @staticmethod
+    def _verify_bundled(cache, data):
+        """Verify bundled cache data only contains expected types."""
+        if cache.file.endswith(".sqlite"):
+            if not data.startswith(b"SQLite format 3\x00"):
+                raise ValueError("not an sqlite database")
+        else:
+            obj = _BundleUnpickler(io.BytesIO(data)).load()
+            if not isinstance(obj, Cache):
+                raise ValueError(f"unexpected cache object: {obj.__class__.__name__}")
+
+    def export_caches(self, path: str):
+        """Export the portable caches for all target repos to a relocatable bundle.
+
+        Cache files are stored by repo identifier and commit instead of the
+        repo's location so they can be imported for checkouts at other paths.
+        Caches depending on file locations or mtimes aren't exported since
+        they'd be regenerated after importing them anyway.
+        """
+        manifest = {"version": self.bundle_version, "repos": []}
+        try:
+            with tarfile.open(path, "w:gz") as tar:
+                for i, repo in enumerate(self.options.target_repo.trees):
+                    entry = {"repo_id": repo.repo_id, "commit": self._repo_commit(repo)}
+                    entry["caches"] = caches = {}
+                    for cache in self._portable_caches:
+                        cache_file = self.cache_file(repo, cache)
+                        if not os.path.exists(cache_file):
+                            continue
+                        with self._lock_cache(cache_file), open(cache_file, "rb") as f:
+                            data = f.read()
+                        caches[cache.type] = name = f"{i}/{cache.file}"
+                        tarinfo = tarfile.TarInfo(name)
+                        tarinfo.size = len(data)
+                        tar.addfile(tarinfo, io.BytesIO(data))
+                    if caches:
+                        manifest["repos"].append(entry)
+                data = json.dumps(manifest, indent=2).encode()
+                tarinfo = tarfile.TarInfo(self.bundle_manifest)
+                tarinfo.size = len(data)
+                tar.addfile(tarinfo, io.BytesIO(data))
+        except (OSError, tarfile.TarError) as e:
+            raise PkgcheckUserException(f"failed exporting caches: {path!r}: {e}")
+
+    def import_caches(self, path: str):
+        """Import caches for all matching target repos from a bundle.
+
+        Bundled caches are verified to only contain data types used by
+        portable caches before they're imported, but bundles should still only
+        be imported from trusted sources.
+        """
+        try:
+            with tarfile.open(path, "r:*") as tar:
+                try:
+                    manifest = json.load(tar.extractfile(self.bundle_manifest))
+                except (KeyError, ValueError):
+                    raise PkgcheckUserException(f"invalid cache bundle: {path!r}")
+                if manifest.get("version") != self.bundle_version:
+                    raise PkgcheckUserException(f"unsupported cache bundle version: {path!r}")
+
+                bundled_repos = {x["repo_id"]: x for x in manifest["repos"]}
+                for repo in self.options.target_repo.trees:
+                    if (entry := bundled_repos.get(repo.repo_id)) is None:
+                        continue
+                    commit = entry["commit"]
+                    if commit is not None and not self._has_commit(repo, commit):
+                        logger.warning(
+                            "skipping %s cache import: unknown commit %s", repo, commit[:13]
+                        )
+                        continue
+                    for cache in self._portable_caches:
+                        if (name := entry["caches"].get(cache.type)) is None:
+                            continue
+                        data = tar.extractfile(name).read()
+                        try:
+                            self._verify_bundled(cache, data)
+                        except Exception as e:
+                            raise PkgcheckUserException(
+                                f"invalid {cache.type} cache in bundle: {path!r}: {e}"
+                            )
+                        cache_file = self.cache_file(repo, cache)
+                        if self.options.dry_run:
+                            print(f"Would import {cache_file}")
+                            continue
+                        with self._write_cache(cache_file) as f:
+                            f.write(data)
+        except (OSError, tarfile.TarError) as e:
+            raise PkgcheckUserException(f"failed importing caches: {path!r}: {e}")
+
     @klass.jit_attr
     def existing_caches(self):
         """Mapping of all existing cache types to file paths."""
@@ -151,7 +470,11 @@ class CachedAddon(Addon):
                             if self.options.dry_run:
                                 print(f"Would remove {path}")
                             else:
-                                os.unlink(path)
+                                # remove lock files while holding them so
+                                # concurrent lockers notice and retry
+                                with self._lock_cache(str(path), exclusive=True):
+                                    os.unlink(path)
+                                    os.unlink(f"{path}.lock")
                                 # remove empty cache dirs
                                 try:
                                     while str(path) != self.options.cache_dir:
@@ -1,6 +1,7 @@
 """Eclass specific support and addon."""
 
 import os
+from collections import defaultdict
 from functools import total_ordering
 from os.path import join as pjoin
 
@@ -131,3 +132,44 @@ class EclassAddon(caches.CachedAddon):
                 self.save_cache(data, cache_file)
 
             self._eclass_repos[repo.location] = eclasses
+
+
+class EclassInheritAddon(caches.MetadataIndex, caches.CachedAddon):
+    """Reverse index of eclasses to the packages inheriting them.
+
+    The index is generated from the ``_eclasses_`` entries of the target
+    repo's md5-cache which include both directly and indirectly inherited
+    eclasses.
+    """
+
+    # cache registry
+    cache = caches.CacheData(type="inherit", file="inherit.pickle", version=1)
+    metadata_keys = frozenset(["_eclasses_"])
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        # mapping of package versions to md5-cache index entries
+        self._entries = {}
+
+    @jit_attr_none
+    def index(self):
+        """Mapping of eclasses to the package keys inheriting them."""
+        d = defaultdict(set)
+        for _mtime, key, eclasses in self._entries.values():
+            for eclass in eclasses:
+                d[eclass].add(key)
+        return ImmutableDict((k, frozenset(v)) for k, v in d.items())
+
+    def inheritors(self, eclasses):
+        """Return the set of package keys inheriting any of the given eclasses."""
+        return frozenset().union(*(self.index.get(x, ()) for x in eclasses))
+
+    def index_value(self, metadata):
+        # entries are tab-separated eclass name and checksum pairs
+        return tuple(metadata.get("_eclasses_", "").split()[::2])
+
+    def update_cache(self, force=False):
+        """Update related cache and push updates to disk."""
+        self._entries = self.update_index(self.options.target_repo, force=force)
+        # reset jit attrs
+        self._index = None
@@ -2,23 +2,30 @@
 
 import abc
 import argparse
+import fcntl
 import os
 import re
 import shlex
+import shutil
+import sqlite3
 import subprocess
 import tempfile
 import typing
 from collections import defaultdict, deque
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime
-from functools import partial
-from itertools import takewhile
+from functools import lru_cache, partial
+from itertools import chain, takewhile
 from os.path import join as pjoin
 
 from pathspec import PathSpec
 from pkgcore.ebuild import cpv
 from pkgcore.ebuild.atom import MalformedAtom
 from pkgcore.ebuild.atom import atom as atom_cls
+from pkgcore.repository import errors as repo_errors
 from pkgcore.repository import multiplex
 from pkgcore.repository.util import SimpleTree
 from pkgcore.restrictions import packages
@@ -33,7 +40,10 @@ from .. import base
 from ..base import PkgcheckUserException
 from ..checks import GitCommitsCheck
 from ..log import logger
-from . import caches
+from ..utils import is_binary
+from . import caches, init_addon
+from .eclass import EclassInheritAddon
+from .revdeps import RevdepsAddon
 
 
 @dataclass(frozen=True, eq=False)
@@ -72,12 +82,125 @@ class GitError(Exception):
     """Generic git-related error."""
 
 
-class GitCache(caches.DictCache):
-    """Dictionary-based cache that encapsulates git commit data."""
+class _GitHistoryPackages(Mapping):
+    """Lazily queried mapping of a category's packages to their git history."""
 
-    def __init__(self, *args, commit):
-        super().__init__(*args)
-        self.commit = commit
+    def __init__(self, history, category):
+        self._history = history
+        self._category = category
+
+    def __getitem__(self, package):
+        data = {}
+        for status, *commit in self._history.query(
+            "SELECT status, fullver, time, commit_hash FROM history "
+            "WHERE category = ? AND package = ? ORDER BY rowid",
+            (self._category, package),
+        ):
+            data.setdefault(status, []).append(tuple(commit))
+        if not data:
+            raise KeyError(package)
+        return data
+
+    def __iter__(self):
+        for (package,) in self._history.query(
+            "SELECT DISTINCT package FROM history WHERE category = ?", (self._category,)
+        ):
+            yield package
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+class GitHistory(Mapping):
+    """Historical package data for a git repo stored in an sqlite database.
+
+    Exposes the same ``{category: {package: {status: [commit, ...]}}}``
+    layout created by :meth:`GitAddon.pkg_history`, but package entries are
+    only queried on demand so load time and memory usage don't scale with the
+    size of the repo's history.
+    """
+
+    schema = (
+        "CREATE TABLE meta (key TEXT PRIMARY KEY, value)",
+        "CREATE TABLE history ("
+        "category TEXT, package TEXT, status TEXT, fullver TEXT, time INTEGER, commit_hash TEXT)",
+    )
+    index = "CREATE INDEX IF NOT EXISTS history_pkgs ON history (category, package)"
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = None
+        self._pid = None
+        meta = dict(self.query("SELECT key, value FROM meta"))
+        self.version = meta.get("version")
+        self.commit = meta.get("commit")
+
+    @property
+    def conn(self):
+        # sqlite connections can't be shared across forked processes
+        if self._pid != os.getpid():
+            self._conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, timeout=30)
+            self._pid = os.getpid()
+        return self._conn
+
+    def query(self, sql, params=()):
+        return self.conn.execute(sql, params)
+
+    @classmethod
+    def write(cls, path, entries, *, commit, version, create=False):
+        """Write history entries to a given database, returning the number added."""
+        if create:
+            dirname, basename = os.path.split(path)
+            fd, db_path = tempfile.mkstemp(prefix=f".{basename}.", dir=dirname)
+            os.close(fd)
+        else:
+            db_path = path
+        try:
+            conn = sqlite3.connect(db_path, timeout=30)
+            try:
+                with conn:
+                    if create:
+                        for sql in cls.schema:
+                            conn.execute(sql)
+                    cursor = conn.executemany(
+                        "INSERT INTO history VALUES (?, ?, ?, ?, ?, ?)",
+                        (
+                            (category, package, status, *commit)
+                            for category, package, status, commit in entries
+                        ),
+                    )
+                    added = cursor.rowcount
+                    conn.execute(cls.index)
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                        (("version", version), ("commit", commit)),
+                    )
+            finally:
+                conn.close()
+            if create:
+                # always install the db so empty histories are cached as well
+                os.chmod(db_path, 0o644)
+                os.replace(db_path, path)
+        except BaseException:
+            if create:
+                try:
+                    os.unlink(db_path)
+                except FileNotFoundError:
+                    pass
+            raise
+        return added
+
+    def __getitem__(self, category):
+        if self.query("SELECT 1 FROM history WHERE category = ? LIMIT 1", (category,)).fetchone():
+            return _GitHistoryPackages(self, category)
+        raise KeyError(category)
+
+    def __iter__(self):
+        for (category,) in self.query("SELECT DISTINCT category FROM history"):
+            yield category
+
+    def __len__(self):
+        return sum(1 for _ in self)
 
 
 class GitConfig:
@@ -143,10 +266,320 @@ class GitLog:
 
         return line.rstrip()
 
+    def records(self, sep=b"\x00\n", size=1 << 20):
+        """Iterator of raw, separator-delimited output records.
+
+        Output is pulled using large, buffered reads instead of line by line
+        which avoids most of the per-line overhead for huge histories.
+        """
+        buf = b""
+        read = self.proc.stdout.read1
+        while data := read(size):
+            *records, buf = (buf + data).split(sep)
+            yield from records
+        if buf:
+            yield buf
+
+
+class GitCatFile:
+    """Persistent `git cat-file --batch` process for reading git objects."""
+
+    def __init__(self, path):
+        self.path = path
+        self._proc = None
+
+    @property
+    def proc(self):
+        """Running cat-file process, started on first use."""
+        if self._proc is None or self._proc.poll() is not None:
+            try:
+                self._proc = subprocess.Popen(
+                    ["git", "cat-file", "--batch"],
+                    cwd=self.path,
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                )
+            except OSError as e:
+                raise GitError(f"failed running git cat-file: {e}")
+        return self._proc
+
+    def read(self, obj):
+        """Return the contents of a given object, None if it doesn't exist."""
+        proc = self.proc
+        try:
+            proc.stdin.write(f"{obj}\n".encode())
+            proc.stdin.flush()
+        except BrokenPipeError:
+            raise GitError(f"failed reading git object: {obj}")
+        header = proc.stdout.readline().split()
+        if not header:
+            raise GitError(f"failed reading git object: {obj}")
+        elif header[-1] == b"missing" or len(header) != 3:
+            return None
+        data = proc.stdout.read(int(header[2]))
+        # discard trailing newline
+        proc.stdout.read(1)
+        return data
+
+    def ls_tree(self, tree_ish, paths=()):
+        """Return a mapping of file paths to (mode, blob id) tuples for a tree."""
+        try:
+            p = subprocess.run(
+                ["git", "ls-tree", "-r", "-z", tree_ish, "--", *paths],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                cwd=self.path,
+                check=True,
+            )
+        except subprocess.CalledProcessError as e:
+            raise GitError(e.stderr.decode().strip())
+        files = {}
+        for entry in p.stdout.decode("utf-8", "replace").split("\x00"):
+            if entry:
+                info, path = entry.split("\t", 1)
+                mode, obj_type, obj = info.split()
+                # skip submodules
+                if obj_type == "blob":
+                    files[path] = (mode, obj)
+        return files
+
+    def close(self):
+        """Terminate the cat-file process."""
+        if self._proc is not None:
+            try:
+                self._proc.stdin.close()
+            except BrokenPipeError:
+                # process already exited leaving unflushed input behind
+                pass
+            self._proc.wait()
+            self._proc.stdout.close()
+            self._proc = None
+
+
+class GitStagedTree:
+    """Context manager checking out a git repo's staged content.
+
+    The index is checked out via ``git checkout-index`` into a directory
+    under the git dir so the working tree is never touched. Files matching
+    the index keep their working tree mtimes, ignored paths such as generated
+    metadata caches are symlinked in, and a ``.git`` file links the checkout
+    to the repo's git dir so git commands work within it.
+
+    The checkout location is reused between runs, keeping location-based
+    caches valid, and is locked while in use so concurrent staged scans of
+    the same repo wait on each other.
+    """
+
+    # checkout directory created under the git dir
+    _dirname = "pkgcheck-staged"
+
+    def __init__(self, path):
+        self.path = path
+        # location of the repo within the checkout
+        self.location = None
+        self._checkout = None
+        self._lock = None
+
+    def _git(self, *args):
+        return subprocess.run(
+            ["git", *args],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=self.path,
+            check=True,
+        ).stdout.decode()
+
+    def _paths(self, *args):
+        """Return the paths output by a given git command using -z."""
+        return [x for x in self._git(*args, "-z").split("\x00") if x]
+
+    def __enter__(self):
+        try:
+            git_dir = self._git("rev-parse", "--absolute-git-dir").strip()
+            prefix = self._git("rev-parse", "--show-prefix").strip()
+        except subprocess.CalledProcessError:
+            raise ValueError(f"not a git repo: {self.path}")
+
+        checkout = pjoin(git_dir, self._dirname)
+        self._lock = os.open(f"{checkout}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self._lock, fcntl.LOCK_EX)
+        self._checkout = checkout
+        self.location = pjoin(checkout, prefix).rstrip(os.sep)
+        try:
+            # remove checkouts left behind by interrupted scans
+            shutil.rmtree(checkout, ignore_errors=True)
+            os.makedirs(self.location)
+            # only index entries under the repo are checked out
+            self._git("checkout-index", "--all", f"--prefix={checkout}/")
+
+            # keep mtimes for files matching the index
+            modified = frozenset(self._paths("ls-files", "--modified"))
+            for path in self._paths("ls-files"):
+                if path not in modified:
+                    try:
+                        st = os.lstat(pjoin(self.path, path))
+                        os.utime(
+                            pjoin(self.location, path),
+                            ns=(st.st_atime_ns, st.st_mtime_ns),
+                            follow_symlinks=False,
+                        )
+                    except FileNotFoundError:
+                        # submodules aren't checked out
+                        continue
+
+            # link in ignored files such as generated caches
+            ignored = self._paths(
+                "ls-files", "--others", "--ignored", "--exclude-standard", "--directory"
+            )
+            for path in ignored:
+                path = path.rstrip("/")
+                dest = pjoin(self.location, path)
+                if not os.path.lexists(dest):
+                    os.makedirs(os.path.dirname(dest), exist_ok=True)
+                    os.symlink(pjoin(os.path.abspath(self.path), path), dest)
+
+            with open(pjoin(checkout, ".git"), "w") as f:
+                f.write(f"gitdir: {git_dir}\n")
+        except (OSError, subprocess.CalledProcessError) as e:
+            self.__exit__(None, None, None)
+            if isinstance(e, subprocess.CalledProcessError):
+                e = e.stderr.decode().strip()
+            raise PkgcheckUserException(f"git failed checking out staged files: {e}")
+        return self
+
+    def __exit__(self, _exc_type, _exc_value, _traceback):
+        if self._lock is not None:
+            shutil.rmtree(self._checkout, ignore_errors=True)
+            os.close(self._lock)
+            self._checkout = self._lock = None
+
+
+@contextmanager
+def _staged_scan(namespace):
+    """Point a scan's target repo at a checkout of its staged content."""
+    target_repo, search_repo = namespace.target_repo, namespace.search_repo
+    with GitStagedTree(target_repo.location) as tree:
+        try:
+            repo = namespace.domain.add_repo(tree.location, config=namespace.config)
+        except repo_errors.RepoError as e:
+            raise PkgcheckUserException(f"failed loading staged repo: {e}")
+        namespace.target_repo = repo
+        namespace.search_repo = multiplex.tree(*repo.trees)
+        # portable caches are shared with the source repo
+        namespace.staged_sources = {repo.location: target_repo.location}
+        try:
+            yield repo
+        finally:
+            namespace.target_repo, namespace.search_repo = target_repo, search_repo
+            namespace.staged_sources = {}
+
 
 T = typing.TypeVar("T")
 
 
+class GitIgnore:
+    """Compiled matcher for gitignore patterns.
+
+    Patterns are parsed by pathspec, then literal name and path patterns as
+    well as name patterns using a single wildcard between a literal prefix and
+    suffix are matched via set lookups. All other patterns are combined into a
+    single regex. Directory matches are cached so paths under ignored
+    directories don't require any further pattern matching.
+
+    Pattern sets using negation depend on pattern order and are matched
+    directly by pathspec without any caching.
+    """
+
+    # pathspec regex forms for literal and single wildcard patterns
+    _literal = r"(?:[^\\.^$*+?{}\[\]|()]|\\.)+"
+    _literal_re = re.compile(
+        rf"^\^(?P<any>\(\?:\.\+/\)\?)?(?:(?P<prefix>{_literal})?(?P<glob>\[\^/\]\*))?"
+        rf"(?P<literal>{_literal})?(?P<end>\(\?:/\|\$\)|/)$"
+    )
+    _unescape_re = re.compile(r"\\(.)")
+
+    def __init__(self, lines):
+        self._spec = PathSpec.from_lines("gitignore", lines)
+        patterns = [x for x in self._spec.patterns if x.include is not None]
+        self._negated = any(not x.include for x in patterns)
+        # cached directory matches
+        self._dirs = {}
+
+        # Name and path sets plus name prefix and suffix pairs for wildcard
+        # patterns. Directory variants include all patterns since directories
+        # are also matched by patterns that aren't directory-only.
+        self._names, self._dir_names = set(), set()
+        self._paths, self._dir_paths = set(), set()
+        self._globs, self._dir_globs = set(), set()
+        regexes = []
+        for pattern in patterns:
+            if mo := self._literal_re.match(pattern.regex.pattern):
+                prefix, literal = (
+                    self._unescape_re.sub(r"\1", mo.group(x) or "") for x in ("prefix", "literal")
+                )
+                dir_only = mo.group("end") == "/"
+                if mo.group("any") and "/" not in prefix + literal:
+                    if mo.group("glob"):
+                        (self._dir_globs if dir_only else self._globs).add((prefix, literal))
+                        continue
+                    elif literal:
+                        (self._dir_names if dir_only else self._names).add(literal)
+                        continue
+                elif not mo.group("any") and not mo.group("glob") and literal:
+                    (self._dir_paths if dir_only else self._paths).add(literal)
+                    continue
+            regexes.append(f"(?:{pattern.regex.pattern})")
+        self._regex = re.compile("|".join(regexes)) if regexes else None
+        self._dir_names.update(self._names)
+        self._dir_paths.update(self._paths)
+        self._dir_globs.update(self._globs)
+        # wildcard pattern prefixes and suffixes used to quickly skip non-matching names
+        self._glob_prefixes = tuple({x for x, _ in self._dir_globs})
+        self._glob_suffixes = tuple({x for _, x in self._dir_globs})
+
+    def _match(self, path, name, directory):
+        """Determine if a path matches any pattern, ignoring its parent directories."""
+        if directory:
+            names, paths, globs = self._dir_names, self._dir_paths, self._dir_globs
+        else:
+            names, paths, globs = self._names, self._paths, self._globs
+        if name in names or path in paths:
+            return True
+        if name.endswith(self._glob_suffixes) and name.startswith(self._glob_prefixes):
+            for prefix, suffix in globs:
+                if (
+                    len(prefix) + len(suffix) <= len(name)
+                    and name.startswith(prefix)
+                    and name.endswith(suffix)
+                ):
+                    return True
+        if self._regex is not None:
+            return self._regex.match(f"{path}/" if directory else path) is not None
+        return False
+
+    def _dir_match(self, path):
+        """Determine if all paths under a given directory are ignored."""
+        try:
+            return self._dirs[path]
+        except KeyError:
+            parent, _, name = path.rpartition("/")
+            ignored = (parent and self._dir_match(parent)) or self._match(path, name, True)
+            self._dirs[path] = ignored
+            return ignored
+
+    def match(self, path, directory=False):
+        """Determine if a given repo relative path is ignored."""
+        if not path:
+            return False
+        elif self._negated:
+            return self._spec.match_file(f"{path}/" if directory else path)
+        elif directory:
+            return self._dir_match(path)
+        parent, _, name = path.rpartition("/")
+        return bool(parent and self._dir_match(parent)) or self._match(path, name, False)
+
+
 class _ParseGitRepo(typing.Generic[T], abc.ABC):
     """Generic iterator for custom git log output parsing support."""
 
@@ -170,6 +603,8 @@ class _ParseGitRepo(typing.Generic[T], abc.ABC):
         self.git_log = GitLog(cmd, self.path)
         # discard the initial newline
         next(self.git_log)
+        # paths are frequently changed many times in a row, cache parsed atoms
+        self._atom = lru_cache(maxsize=65536)(self._parse_atom)
 
     def __iter__(self):
         return self
@@ -178,33 +613,34 @@ class _ParseGitRepo(typing.Generic[T], abc.ABC):
     def __next__(self) -> T:
         pass
 
-    @property
-    def changes(self):
+    def _parse_atom(self, path):
+        """Return the versioned atom for a given ebuild path, if valid."""
+        if path.endswith(".ebuild") and (mo := self._ebuild_re.match(path)):
+            try:
+                return atom_cls(f"={mo.group('category')}/{mo.group('package')}")
+            except MalformedAtom:
+                pass
+        return None
+
+    def _changes(self, data):
         """Generator of file change status with changed packages."""
-        changes = deque(next(self.git_log).strip("\x00").split("\x00"))
-        while changes:
-            status = changes.popleft()
+        if not (data := data.strip("\x00")):
+            return
+        changes = iter(data.split("\x00"))
+        for status in changes:
             if status.startswith("R"):
                 # matched R status change
-                status = "R"
-                old = changes.popleft()
-                new = changes.popleft()
-                if (mo := self._ebuild_re.match(old)) and (mn := self._ebuild_re.match(new)):
-                    try:
-                        old_pkg = atom_cls(f"={mo.group('category')}/{mo.group('package')}")
-                        new_pkg = atom_cls(f"={mn.group('category')}/{mn.group('package')}")
-                        yield status, [old_pkg, new_pkg]
-                    except MalformedAtom:
-                        continue
-            else:
+                old_pkg, new_pkg = self._atom(next(changes)), self._atom(next(changes))
+                if old_pkg is not None and new_pkg is not None:
+                    yield "R", [old_pkg, new_pkg]
+            elif (pkg := self._atom(next(changes))) is not None:
                 # matched ADM status change
-                path = changes.popleft()
-                if mo := self._ebuild_re.match(path):
-                    try:
-                        pkg = atom_cls(f"={mo.group('category')}/{mo.group('package')}")
-                        yield status, [pkg]
-                    except MalformedAtom:
-                        continue
+                yield status, [pkg]
+
+    @property
+    def changes(self):
+        """Generator of file change status with changed packages."""
+        return self._changes(next(self.git_log))
 
 
 class GitRepoCommits(_ParseGitRepo["GitCommit"]):
@@ -247,19 +683,22 @@ class GitRepoPkgs(_ParseGitRepo["GitPkgChange"]):
         super().__init__(*args)
         self.local = local
         self._pkgs = deque()
+        # commit headers and file changes are separated by NUL-newline pairs
+        self._records = self.git_log.records()
 
     def __next__(self):
         while True:
             try:
                 return self._pkgs.popleft()
             except IndexError:
-                commit_hash = next(self.git_log)
-                commit_time = int(next(self.git_log).rstrip("\x00"))
-                self._pkg_changes(commit_hash, commit_time)
+                commit_hash, commit_time = next(self._records).decode().split("\n")
+                # use replacement character for non-UTF8 decoding issues (issue #166)
+                changes = next(self._records, b"").decode("utf-8", "replace")
+                self._pkg_changes(commit_hash, int(commit_time), changes)
 
-    def _pkg_changes(self, commit_hash, commit_time):
+    def _pkg_changes(self, commit_hash, commit_time, changes):
         """Queue package change objects from git log file changes."""
-        for status, pkgs in self.changes:
+        for status, pkgs in self._changes(changes):
             if status == "R":
                 old, new = pkgs
                 if not self.local:  # treat rename as addition and removal
@@ -457,7 +896,155 @@ class _ScanGit(argparse.Action):
         # generate scanning restrictions
         namespace.restrictions = self.generate_restrictions(parser, namespace, ref)
         # ignore irrelevant changes during scan
-        namespace.contexts.append(GitStash(namespace.target_repo.location, staged=self.staged))
+        if self.staged:
+            namespace.contexts.append(_staged_scan(namespace))
+        else:
+            namespace.contexts.append(GitStash(namespace.target_repo.location))
+
+
+class _ExpandEclasses(argparse.Action):
+    """Argparse action expanding changed eclass targets into their inheriting packages."""
+
+    def __call__(self, parser, namespace, value, option_string=None):
+        if not (namespace.commits or namespace.staged):
+            parser.error(f"{option_string} requires --commits or --staged")
+        setattr(namespace, self.dest, True)
+
+        pkgs, eclasses, restrictions = OrderedSet(), (), []
+        for scope, restrict, *checks in namespace.restrictions:
+            # targets limited to specific checks are left as is
+            if scope == base.package_scope and not checks:
+                pkgs.update(restrict.restrictions)
+                continue
+            elif scope == base.eclass_scope:
+                eclasses = restrict
+            restrictions.append((scope, restrict, *checks))
+
+        if not eclasses:
+            return
+
+        try:
+            addon = init_addon(EclassInheritAddon, namespace)
+        except caches.CacheDisabled as exc:
+            parser.error(f"{option_string}: {exc}")
+        pkgs.update(map(atom_cls, sorted(addon.inheritors(eclasses))))
+        if pkgs:
+            restrictions.insert(0, (base.package_scope, packages.OrRestriction(*pkgs)))
+        namespace.restrictions = restrictions
+
+
+# ebuild assignments and inherits affecting reverse dependencies: SLOT, IUSE,
+# KEYWORDS, dependency variables including intermediate ones such as
+# COMMON_DEPEND, and implementation compat arrays that set IUSE and
+# dependencies via eclasses
+_dep_metadata_re = re.compile(
+    r"^[ \t]*(?:(?:SLOT|IUSE|KEYWORDS|\w*DEP\w*|\w+_COMPAT)\+?="
+    r"(?:\"[^\"]*\"|'[^']*'|\([^)]*\)|\S*)|inherit[ \t].*)",
+    re.MULTILINE,
+)
+
+
+def _dep_metadata(data):
+    """Return the normalized statements affecting reverse dependencies from ebuild content."""
+    return [" ".join(x.split()) for x in _dep_metadata_re.findall(data.decode("utf8", "replace"))]
+
+
+def _dep_changes(namespace):
+    """Return keys of packages with changes that can affect their reverse dependencies.
+
+    That includes removed versions along with changes to SLOT, IUSE,
+    KEYWORDS, dependencies or inherited eclasses.
+
+    Old and new ebuild content is compared for the scanned commits or staged
+    changes. None is returned if the changes can't be determined.
+    """
+    if ref := getattr(namespace, "staged", False):
+        cmd = ["git", "diff-index", "--cached", "-r", "-M", "-z", ref]
+    else:
+        cmd = ["git", "diff-tree", "-r", "-M", "--no-commit-id", "-z", namespace.commits]
+    repo = namespace.target_repo
+    try:
+        p = subprocess.run(
+            cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, cwd=repo.location, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    pkgs = set()
+    git = GitCatFile(repo.location)
+    try:
+        fields = iter(p.stdout.split(b"\x00"))
+        for info in fields:
+            if not info:
+                continue
+            _old_mode, _new_mode, old_blob, new_blob, status = info[1:].decode().split()
+            path = os.fsdecode(next(fields))
+            if status[0] in "RC":
+                # renames and copies also list their target path
+                next(fields)
+            category, _, name = path.partition(os.sep)
+            package, _, ebuild = name.partition(os.sep)
+            if (
+                category not in repo.categories
+                or os.sep in ebuild
+                or not ebuild.endswith(".ebuild")
+            ):
+                continue
+            key = f"{category}/{package}"
+            if key in pkgs or status[0] == "A":
+                continue
+            elif status[0] in "DR":
+                pkgs.add(key)
+            else:
+                old, new = git.read(old_blob), git.read(new_blob)
+                if old is None or new is None or _dep_metadata(old) != _dep_metadata(new):
+                    pkgs.add(key)
+    except GitError:
+        return None
+    finally:
+        git.close()
+    return frozenset(pkgs)
+
+
+def _scan_revdeps(namespace):
+    """Add VisibilityCheck targets for reverse dependencies of changed packages.
+
+    Only packages with removed versions or changes to their SLOT, IUSE,
+    KEYWORDS, dependencies or inherits are considered since other changes
+    can't break their reverse dependencies.
+    """
+    if not (getattr(namespace, "commits", False) or getattr(namespace, "staged", False)):
+        return
+
+    pkgs = frozenset(
+        atom.key
+        for scope, restrict, *_ in namespace.restrictions
+        if scope == base.package_scope
+        for atom in restrict.restrictions
+    )
+    if not pkgs:
+        return
+
+    if (changed := _dep_changes(namespace)) is not None:
+        if not (changed := changed & pkgs):
+            return
+    else:
+        changed = pkgs
+
+    try:
+        addon = init_addon(RevdepsAddon, namespace)
+    except caches.CacheDisabled:
+        return
+
+    # skip packages that are already fully scanned
+    revdeps = sorted(x for x in addon.revdeps(changed) if cpv.VersionedCPV(x).key not in pkgs)
+    if revdeps:
+        # avoid circular import issues
+        from .. import objects
+
+        restrict = packages.OrRestriction(*(atom_cls(f"={x}") for x in revdeps))
+        checks = frozenset([objects.CHECKS["VisibilityCheck"]])
+        namespace.restrictions.append((base.package_scope, restrict, checks))
 
 
 class GitAddon(caches.CachedAddon):
@@ -481,7 +1068,7 @@ class GitAddon(caches.CachedAddon):
     """
 
     # cache registry
-    cache = caches.CacheData(type="git", file="git.pickle", version=5)
+    cache = caches.CacheData(type="git", file="git.sqlite", version=6, portable=True)
 
     @classmethod
     def mangle_argparser(cls, parser):
@@ -504,6 +1091,12 @@ class GitAddon(caches.CachedAddon):
                 the current branch compared to the branch named 'old' use
                 ``pkgcheck scan --commits old``. For two separate branches
                 named 'old' and 'new' use ``pkgcheck scan --commits old..new``.
+
+                For repos with an md5-cache, package versions depending on the
+                changed packages are also scanned using VisibilityCheck in
+                order to catch dependency breakage caused by removals or
+                metadata changes. Their lookups use a reverse dependency index
+                that is cached and updated incrementally.
             """,
         )
         git_opts.add_argument(
@@ -518,7 +1111,27 @@ class GitAddon(caches.CachedAddon):
             docs="""
                 Targets are determined using all staged changes for the git
                 repo. Unstaged changes and untracked files are ignored by
-                temporarily stashing them during the scanning process.
+                scanning a checkout of the git index created under the git
+                dir, leaving the working tree untouched.
+            """,
+        )
+        group.add_argument(
+            "--expand-eclasses",
+            nargs=0,
+            default=False,
+            action=arghparse.Delayed,
+            target=_ExpandEclasses,
+            priority=101,
+            help="scan packages inheriting changed eclasses",
+            docs="""
+                When used with ``--commits`` or ``--staged``, changed eclasses
+                are expanded into package targets for all packages directly
+                or indirectly inheriting them.
+
+                Inheriting packages are determined via an index generated from
+                the repo's md5-cache which is cached and updated incrementally.
+                Repos lacking an md5-cache don't have any eclass changes
+                expanded.
             """,
         )
         group.add_argument(
@@ -532,6 +1145,7 @@ class GitAddon(caches.CachedAddon):
                 you can use any valid git remote name.
             """,
         )
+        parser.bind_parse_priority(102)(_scan_revdeps)
 
     def __init__(self, *args):
         super().__init__(*args)
@@ -559,16 +1173,20 @@ class GitAddon(caches.CachedAddon):
             except (OSError, FileNotFoundError):
                 pass
         if patterns:
-            return PathSpec.from_lines("gitignore", patterns)
+            return GitIgnore(patterns)
         return None
 
-    def gitignored(self, path):
-        """Determine if a given path in a repository is matched by .gitignore settings."""
+    def gitignored(self, path, directory=False):
+        """Determine if a given path in a repository is matched by .gitignore settings.
+
+        Directories are matched against directory-only patterns when
+        ``directory`` is enabled, signifying all paths under them are ignored.
+        """
         if self._gitignore is not None:
             if path.startswith(self.options.target_repo.location):
                 repo_prefix_len = len(self.options.target_repo.location) + 1
                 path = path[repo_prefix_len:]
-            return self._gitignore.match_file(path)
+            return self._gitignore.match(path, directory)
         return False
 
     @staticmethod
@@ -619,11 +1237,9 @@ class GitAddon(caches.CachedAddon):
             raise GitError(f"failed retrieving branch for git repo: {path!r}")
         return p.stdout.strip().split("/")[-1]
 
-    @staticmethod
-    def pkg_history(repo, commit_range, data=None, local=False, verbosity=-1):
-        """Create or update historical package data for a given commit range."""
-        if data is None:
-            data = {}
+    @classmethod
+    def _pkg_changes(cls, repo, commit_range, local=False, verbosity=-1):
+        """Generator of historical package changes for a given commit range."""
         seen = set()
         with base.ProgressManager(verbosity=verbosity) as progress:
             for pkg in GitRepoPkgs(repo.location, commit_range, local=local):
@@ -637,11 +1253,52 @@ class GitAddon(caches.CachedAddon):
                         date = datetime.fromtimestamp(pkg.commit_time).strftime("%Y-%m-%d")
                         progress(f"{repo} -- updating git cache: commit date: {date}")
                         commit = (atom.fullver, pkg.commit_time, pkg.commit)
-                    data.setdefault(atom.category, {}).setdefault(atom.package, {}).setdefault(
-                        pkg.status, []
-                    ).append(commit)
+                    yield atom.category, atom.package, pkg.status, commit
+
+    @classmethod
+    def pkg_history(cls, repo, commit_range, data=None, local=False, verbosity=-1):
+        """Create or update historical package data for a given commit range."""
+        if data is None:
+            data = {}
+        for category, package, status, commit in cls._pkg_changes(
+            repo, commit_range, local=local, verbosity=verbosity
+        ):
+            data.setdefault(category, {}).setdefault(package, {}).setdefault(status, []).append(
+                commit
+            )
         return data
 
+    def load_cache(self, path, fallback=None):
+        """Load the git history database for a repo if it's valid."""
+        if not os.path.exists(path):
+            return fallback
+        try:
+            with self._lock_cache(path):
+                history = GitHistory(path)
+            if history.version == self.cache.version:
+                return history
+            logger.debug("forcing %s cache regen due to outdated version", self.cache.type)
+        except sqlite3.Error as e:
+            # invalid databases are regenerated and atomically replaced
+            logger.debug("forcing %s cache regen: %s", self.cache.type, e)
+        return fallback
+
+    def save_cache(self, changes, path, *, commit, create=False):
+        """Push historical package changes to a repo's git history database."""
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with self._lock_cache(path, exclusive=True):
+                GitHistory.write(
+                    path, changes, commit=commit, version=self.cache.version, create=create
+                )
+            # remove obsolete, pickle-based cache
+            old_cache = pjoin(os.path.dirname(path), "git.pickle")
+            if os.path.exists(old_cache):
+                os.remove(old_cache)
+        except (OSError, sqlite3.Error) as e:
+            msg = f"failed dumping {self.cache.type} cache: {path!r}: {e}"
+            raise PkgcheckUserException(msg)
+
     def update_cache(self, force=False):
         """Update related cache and push updates to disk."""
         remote = self.options.git_remote
@@ -663,36 +1320,27 @@ class GitAddon(caches.CachedAddon):
 
             # initialize cache file location
             cache_file = self.cache_file(repo)
-            git_cache = None
-            cache_repo = True
+            history = None
 
             if not force:
-                git_cache = self.load_cache(cache_file)
+                history = self.load_cache(cache_file)
 
-            if git_cache is None or commit != git_cache.commit:
+            if history is None or commit != history.commit:
                 logger.debug("updating %s git repo cache to %s", repo, commit[:13])
-                if git_cache is None:
-                    data = {}
+                if history is None:
                     commit_range = f"{remote}/HEAD"
                 else:
-                    data = git_cache.data
-                    commit_range = f"{git_cache.commit}..{remote}/HEAD"
+                    commit_range = f"{history.commit}..{remote}/HEAD"
 
+                changes = self._pkg_changes(repo, commit_range, verbosity=self.options.verbosity)
                 try:
-                    self.pkg_history(
-                        repo, commit_range, data=data, verbosity=self.options.verbosity
-                    )
+                    self.save_cache(changes, cache_file, commit=commit, create=history is None)
                 except GitError as exc:
                     raise PkgcheckUserException(str(exc))
-                git_cache = GitCache(data, self.cache, commit=commit)
-            else:
-                cache_repo = False
+                history = self.load_cache(cache_file)
 
-            if git_cache:
-                self._cached_repos[repo.location] = git_cache
-                # push repo to disk if it was created or updated
-                if cache_repo:
-                    self.save_cache(git_cache, cache_file)
+            if history is not None:
+                self._cached_repos[repo.location] = history
 
     def cached_repo(self, repo_cls):
         git_repos = []
@@ -729,8 +1377,161 @@ class GitAddon(caches.CachedAddon):
             origin = self._get_commit_hash(target_repo.location, f"{remote}/HEAD")
             head = self._get_commit_hash(target_repo.location, "HEAD")
             if origin != head:
-                commits = GitRepoCommits(target_repo.location, f"{remote}/HEAD..HEAD")
+                # commits are pulled up front so they can be shared with forked processes
+                commits = tuple(GitRepoCommits(target_repo.location, f"{remote}/HEAD..HEAD"))
         except GitError as exc:
             raise PkgcheckUserException(str(exc))
 
-        return iter(commits)
+        return commits
+
+
+class GitFilesAddon(caches.CachedAddon):
+    """Git repo file listing support with cached binary file detection.
+
+    Files are listed via git so the working tree doesn't have to be walked.
+    Binary file verdicts for tracked files are cached by blob id so unchanged
+    files are never reread; untracked and modified files are always checked.
+    The blob ids also serve as content digests for unmodified tracked files.
+
+    The repo is only listed and files are only checked on demand, so scans
+    that don't need the full listing never pay for it.
+    """
+
+    # cache registry
+    cache = caches.CacheData(type="files", file="files.pickle", version=1, portable=True)
+
+    # number of files checked per parallelized task
+    _chunksize = 256
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        try:
+            find_binary("git")
+        except CommandNotFound:
+            raise caches.CacheDisabled(self.cache)
+
+        # mapping of repo relative file paths to blob ids, listed on first access
+        self._files = None
+        self._listed = False
+        # mapping of blob ids to binary file verdicts
+        self._verdicts = {}
+        # verdicts changed since the cache was loaded
+        self._modified = False
+
+    @staticmethod
+    def _git(path, *args, pathspecs=()):
+        p = subprocess.run(
+            ["git", *args, "-z", "--", *pathspecs],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=path,
+            check=True,
+            encoding="utf8",
+        )
+        return filter(None, p.stdout.split("\x00"))
+
+    @classmethod
+    def _ls_files(cls, path, *pathspecs):
+        """Return a mapping of non-ignored files in a git repo to their blob ids.
+
+        Untracked, modified, symlinked, and unmerged files map to None.
+        """
+        files = {}
+        # paths are relative to the given dir, which may be a git repo subdir
+        modified = frozenset(cls._git(path, "ls-files", "--modified", pathspecs=pathspecs))
+        for entry in cls._git(path, "ls-files", "--stage", pathspecs=pathspecs):
+            info, name = entry.split("\t", 1)
+            mode, blob, stage = info.split()
+            if mode == "160000":
+                # skip submodules
+                continue
+            elif stage != "0" or mode == "120000" or name in modified:
+                files[name] = None
+            else:
+                files[name] = blob
+        for name in cls._git(
+            path, "ls-files", "--others", "--exclude-standard", pathspecs=pathspecs
+        ):
+            # skip nested git repos
+            if not name.endswith("/"):
+                files[name] = None
+        return files
+
+    @property
+    def files(self):
+        """Mapping of all repo relative file paths to blob ids, None for non-git repos.
+
+        Untracked, modified, symlinked, and unmerged files map to None.
+        """
+        if not self._listed:
+            try:
+                self._files = self._ls_files(self.options.target_repo.location)
+            except subprocess.CalledProcessError:
+                # not a git repo
+                pass
+            self._listed = True
+        return self._files
+
+    def blobs(self, path):
+        """Return a mapping of files under a repo relative directory to their blob ids.
+
+        The repo-wide listing is reused if it was already pulled, otherwise
+        only the given directory is listed.
+        """
+        if self._listed:
+            prefix = f"{path}/"
+            return {k: v for k, v in (self._files or {}).items() if k.startswith(prefix)}
+        try:
+            return self._ls_files(self.options.target_repo.location, path)
+        except subprocess.CalledProcessError:
+            return {}
+
+    def _is_binary(self, paths):
+        """Determine binary file verdicts for the given paths in parallel."""
+        paths = list(paths)
+        chunks = [paths[i : i + self._chunksize] for i in range(0, len(paths), self._chunksize)]
+        jobs = getattr(self.options, "jobs", os.cpu_count())
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            results = executor.map(lambda x: list(map(is_binary, x)), chunks)
+            return list(chain.from_iterable(results))
+
+    def binary(self, paths):
+        """Return binary file verdicts for the given repo relative paths.
+
+        New verdicts for unmodified tracked files are pushed to disk on flush.
+        """
+        location = self.options.target_repo.location
+        files = self.files or {}
+        verdicts = {}
+        unknown = []
+        for path in paths:
+            if (blob := files.get(path)) is not None and blob in self._verdicts:
+                verdicts[path] = self._verdicts[blob]
+            else:
+                unknown.append(path)
+        for path, verdict in zip(unknown, self._is_binary(pjoin(location, x) for x in unknown)):
+            verdicts[path] = verdict
+            if (blob := files.get(path)) is not None:
+                self._verdicts[blob] = verdict
+                self._modified = True
+        return verdicts
+
+    def update_cache(self, force=False):
+        """Load the related cache."""
+        if force:
+            self._verdicts = {}
+            self._modified = True
+        else:
+            self._verdicts = dict(
+                self.load_cache(self.cache_file(self.options.target_repo), fallback={})
+            )
+
+    def flush(self):
+        """Push binary file verdicts to disk if any were added."""
+        if self._modified and self.files is not None:
+            # drop verdicts for blobs no longer in the repo
+            blobs = set(self.files.values())
+            verdicts = {k: v for k, v in self._verdicts.items() if k in blobs}
+            data = caches.DictCache(verdicts, self.cache)
+            self.save_cache(data, self.cache_file(self.options.target_repo))
+            self._modified = False
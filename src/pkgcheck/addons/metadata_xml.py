@@ -0,0 +1,71 @@
+"""metadata.xml schema validation support and addon."""
+
+import os
+from hashlib import blake2b
+from os.path import join as pjoin
+
+from ..base import PkgcheckUserException
+from . import caches
+
+
+class XmlValidationAddon(caches.CachedAddon):
+    """Cached schema validation results for metadata.xml files.
+
+    Entries map file paths relative to the target repo to the digests of
+    the validated file and schema along with the resulting errors, so
+    validation is only rerun for modified files or schemas.
+    """
+
+    # cache registry
+    cache = caches.CacheData(type="xml", file="xml.pickle", version=1, portable=True)
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.repo_base = self.options.target_repo.location
+        self._entries = {}
+        # entries added while scanning
+        self._updates = {}
+
+    def validate(self, xml, schema, schema_digest):
+        """Return the schema validation errors for a given MetadataXml object."""
+        path = os.path.relpath(xml.path, self.repo_base)
+        key = (blake2b(xml.data).digest(), schema_digest)
+        if (entry := self._entries.get(path)) is not None and entry[0] == key:
+            return entry[1]
+        errors = xml.validate(schema)
+        self._entries[path] = self._updates[path] = (key, errors)
+        return errors
+
+    def _write(self, updates=(), removals=()):
+        """Merge changes into the cache file saved by all processes."""
+        path = self.cache_file(self.options.target_repo)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # merge with entries saved by other processes, holding the lock
+            # throughout so concurrent writes don't drop each other's entries
+            with self._lock_cache(path, exclusive=True):
+                entries = dict(self.load_cache(path, fallback={}, lock=False))
+                entries.update(updates)
+                for key in removals:
+                    entries.pop(key, None)
+                self.save_cache(caches.DictCache(entries, self.cache), path, lock=False)
+        except OSError as e:
+            msg = f"failed dumping {self.cache.type} cache: {path!r}: {e.strerror}"
+            raise PkgcheckUserException(msg)
+
+    def flush(self):
+        if self._updates:
+            self._write(updates=self._updates)
+            self._updates = {}
+
+    def update_cache(self, force=False):
+        """Load the related cache, dropping entries for removed files."""
+        if force:
+            self._entries = {}
+            return
+        entries = self.load_cache(self.cache_file(self.options.target_repo), fallback={})
+        self._entries = {
+            k: v for k, v in entries.items() if os.path.exists(pjoin(self.repo_base, k))
+        }
+        if removed := entries.keys() - self._entries.keys():
+            self._write(removals=removed)
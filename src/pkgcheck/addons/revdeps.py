@@ -0,0 +1,71 @@
+"""Reverse dependency support and addon."""
+
+from collections import defaultdict
+from functools import lru_cache
+
+from pkgcore.ebuild.atom import MalformedAtom
+from pkgcore.ebuild.atom import atom as atom_cls
+from snakeoil.klass import jit_attr_none
+from snakeoil.mappings import ImmutableDict
+
+from . import caches
+
+# dependency string tokens that aren't package atoms
+_dep_operators = frozenset(["||", "^^", "??", "(", ")"])
+
+
+@lru_cache(maxsize=65536)
+def _dep_key(dep):
+    """Return the package key for a given dependency atom string."""
+    try:
+        return atom_cls(dep).key
+    except MalformedAtom:
+        return None
+
+
+class RevdepsAddon(caches.MetadataIndex, caches.CachedAddon):
+    """Reverse dependency index for the target repo.
+
+    The index maps package keys to all package versions depending on them via
+    any dependency attribute, generated from the target repo's md5-cache.
+    Blockers are skipped since they can't be broken by changes to their
+    targets.
+    """
+
+    # cache registry
+    cache = caches.CacheData(type="revdeps", file="revdeps.pickle", version=1)
+    metadata_keys = frozenset(["DEPEND", "RDEPEND", "PDEPEND", "BDEPEND", "IDEPEND"])
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        # mapping of package versions to md5-cache index entries
+        self._entries = {}
+
+    @jit_attr_none
+    def index(self):
+        """Mapping of package keys to the package versions depending on them."""
+        d = defaultdict(set)
+        for cpvstr, (_mtime, _key, deps) in self._entries.items():
+            for dep in deps:
+                d[dep].add(cpvstr)
+        return ImmutableDict((k, frozenset(v)) for k, v in d.items())
+
+    def revdeps(self, pkgs):
+        """Return the set of package versions depending on any of the given package keys."""
+        return frozenset().union(*(self.index.get(x, ()) for x in pkgs))
+
+    def index_value(self, metadata):
+        deps = set()
+        for depstr in metadata.values():
+            for token in depstr.split():
+                if token in _dep_operators or token[-1] == "?" or token[0] == "!":
+                    continue
+                if key := _dep_key(token):
+                    deps.add(key)
+        return frozenset(deps)
+
+    def update_cache(self, force=False):
+        """Update related cache and push updates to disk."""
+        self._entries = self.update_index(self.options.target_repo, force=force)
+        # reset jit attrs
+        self._index = None
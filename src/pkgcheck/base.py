@@ -142,14 +142,18 @@ class Addon:
     (but if not overridden they will be no-ops).
 
     :cvar required_addons: sequence of addon dependencies
+    :cvar optional_addons: sequence of addon dependencies that are passed as
+        None when they can't be enabled, e.g. due to disabled caches
     """
 
     required_addons = ()
+    optional_addons = ()
 
     def __init__(self, options, **kwargs):
         """Initialize.
 
-        An instance of every addon in required_addons is passed as extra arg.
+        An instance of every addon in required_addons and optional_addons is
+        passed as extra arg.
 
         :param options: the argparse values.
         """
@@ -174,8 +178,8 @@ def get_addons(objects):
         """Recursively determine addons that are requested."""
         for addon in objs:
             if addon not in addons:
-                if addon.required_addons:
-                    _addons(addon.required_addons)
+                if addon.required_addons or addon.optional_addons:
+                    _addons(addon.required_addons + addon.optional_addons)
                 addons[addon] = None
 
     _addons(objects)
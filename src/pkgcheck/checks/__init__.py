@@ -1,9 +1,9 @@
 """Core check classes."""
 
 from collections import defaultdict
-from functools import total_ordering
+from concurrent.futures import Future
+from functools import partial, total_ordering
 
-from pkgcore import fetch
 from snakeoil import klass
 from snakeoil.strings import pluralism
 
@@ -100,7 +100,7 @@ class OptionalCheck(Check):
 class GitCommitsCheck(OptionalCheck):
     """Check that is only run when explicitly enabled via the --commits git option."""
 
-    runner_cls = runners.SequentialCheckRunner
+    runner_cls = runners.PartitionedCheckRunner
 
     def __init__(self, *args):
         super().__init__(*args)
@@ -129,6 +129,31 @@ class NetworkCheck(AsyncCheck, OptionalCheck):
             raise SkipCheck(self, "network checks not enabled")
         self.timeout = net_addon.timeout
         self.session = net_addon.session
+        self.url_cache = net_addon.url_cache
+        self._submit_task = net_addon.submit
+
+    def _cached_future(self, func, url):
+        """Return a completed future for a fresh cached verification result, if available."""
+        if self.url_cache is not None:
+            try:
+                result = self.url_cache.get((func.__name__, url))
+            except KeyError:
+                return None
+            future = Future()
+            future.set_result(result)
+            return future
+        return None
+
+    def _submit(self, executor, func, arg, url, **kwargs):
+        """Submit a verification task against a given URL, caching its result."""
+        future = self._submit_task(executor, url, func, arg, url, **kwargs)
+        if self.url_cache is not None:
+            future.add_done_callback(partial(self.url_cache.record, (func.__name__, url)))
+        return future
+
+    def flush(self):
+        if self.url_cache is not None:
+            self.url_cache.flush()
 
 
 class MirrorsCheck(Check):
@@ -138,15 +163,11 @@ class MirrorsCheck(Check):
 
     def __init__(self, *args, use_addon):
         super().__init__(*args)
-        self.iuse_filter = use_addon.get_filter("fetchables")
+        self.use_addon = use_addon
 
     def get_mirrors(self, pkg):
         mirrors = []
-        fetchables, _ = self.iuse_filter(
-            (fetch.fetchable,),
-            pkg,
-            pkg.generate_fetchables(allow_missing_checksums=True, ignore_unknown_mirrors=True),
-        )
+        fetchables, _ = self.use_addon.fetchables(pkg)
         for f in fetchables:
             for m in f.uri.visit_mirrors(treat_default_as_mirror=False):
                 mirrors.append(m[0].mirror_name)
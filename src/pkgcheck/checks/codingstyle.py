@@ -190,6 +190,7 @@ class PathVariablesCheck(Check):
 
     _source = sources.EbuildFileRepoSource
     known_results = frozenset({MissingSlash, UnnecessarySlashStrip, DoublePrefixInPath})
+    required_addons = (addons.LineScanAddon,)
     prefixed_dir_functions = (
         "insinto",
         "exeinto",
@@ -250,8 +251,9 @@ class PathVariablesCheck(Check):
         "PYTHON_SCRIPTDIR",
     )
 
-    def __init__(self, *args):
+    def __init__(self, *args, line_scan_addon):
         super().__init__(*args)
+        self.line_scanner = line_scan_addon
         self.missing_regex = re.compile(r'(\${(%s)})"?\w+/' % r"|".join(PATH_VARIABLES))
         self.unnecessary_regex = re.compile(r"(\${(%s)%%/})" % r"|".join(PATH_VARIABLES))
         self.double_prefix_regex = re.compile(
@@ -275,16 +277,28 @@ class PathVariablesCheck(Check):
             r'.*?[#]["]?\$(\((%s)\)|{(%s)})'
             % (r"|".join(self.prefixed_getters), r"|".join(self.prefixed_rhs_variables))
         )
+        self.regexes = tuple(
+            self.line_scanner.register(x)
+            for x in (
+                self.missing_regex.pattern,
+                self.unnecessary_regex.pattern,
+                self.double_prefix_regex.pattern,
+                # leading word boundaries defeat fast scanning
+                r"(?:%s)\s" % r"|".join(self.prefixed_dir_functions),
+            )
+        )
 
     def feed(self, pkg):
         missing = defaultdict(list)
         unnecessary = defaultdict(list)
         double_prefix = defaultdict(list)
 
-        for lineno, line in enumerate(pkg.lines, 1):
-            line = line.strip()
-            if not line:
-                continue
+        linenos = set()
+        for regex in self.regexes:
+            linenos.update(self.line_scanner.lines(pkg, regex))
+
+        for lineno in sorted(linenos):
+            line = pkg.lines[lineno - 1].strip()
 
             # flag double path prefix usage on uncommented lines only
             if line[0] != "#":
@@ -327,21 +341,23 @@ class AbsoluteSymlinkCheck(Check):
 
     _source = sources.EbuildFileRepoSource
     known_results = frozenset([AbsoluteSymlink])
+    required_addons = (addons.LineScanAddon,)
 
     DIRS = ("bin", "etc", "lib", "opt", "sbin", "srv", "usr", "var")
 
-    def __init__(self, *args):
+    def __init__(self, *args, line_scan_addon):
         super().__init__(*args)
+        self.line_scanner = line_scan_addon
         dirs = "|".join(self.DIRS)
         path_vars = "|".join(PATH_VARIABLES)
         prefixed_regex = rf'"\${{({path_vars})(%/)?}}(?P<cp>")?(?(cp)\S*|.*?")'
         non_prefixed_regex = rf'(?P<op>["\'])?/({dirs})(?(op).*?(?P=op)|\S*)'
         self.regex = re.compile(rf"^\s*(?P<cmd>dosym\s+({prefixed_regex}|{non_prefixed_regex}))")
+        self.dosym_regex = self.line_scanner.register(r"^\s*dosym\s")
 
     def feed(self, pkg):
-        for lineno, line in enumerate(pkg.lines, 1):
-            if not line.strip():
-                continue
+        for lineno in self.line_scanner.lines(pkg, self.dosym_regex):
+            line = pkg.lines[lineno - 1]
             if mo := self.regex.match(line):
                 yield AbsoluteSymlink(mo.group("cmd"), line=line, lineno=lineno, pkg=pkg)
 
@@ -363,6 +379,7 @@ class InsintoCheck(Check):
 
     _source = sources.EbuildFileRepoSource
     known_results = frozenset([DeprecatedInsinto])
+    required_addons = (addons.LineScanAddon,)
 
     path_mapping = ImmutableDict(
         {
@@ -378,8 +395,9 @@ class InsintoCheck(Check):
         }
     )
 
-    def __init__(self, *args):
+    def __init__(self, *args, line_scan_addon):
         super().__init__(*args)
+        self.line_scanner = line_scan_addon
         paths = "|".join(s.replace("/", "/+") + "/?" for s in self.path_mapping)
         self._insinto_re = re.compile(
             rf"(?P<insinto>insinto[ \t]+(?P<path>{paths})(?!/\w+))(?:$|[/ \t])"
@@ -387,11 +405,11 @@ class InsintoCheck(Check):
         self._insinto_doc_re = re.compile(
             r'(?P<insinto>insinto[ \t]+/usr/share/doc/(")?\$\{PF?\}(?(2)\2)(/\w+)*)(?:$|[/ \t])'
         )
+        self._insinto_lines_re = self.line_scanner.register(r"insinto[ \t]")
 
     def feed(self, pkg):
-        for lineno, line in enumerate(pkg.lines, 1):
-            if not line.strip():
-                continue
+        for lineno in self.line_scanner.lines(pkg, self._insinto_lines_re):
+            line = pkg.lines[lineno - 1]
             matches = self._insinto_re.search(line)
             if matches is not None:
                 path = re.sub("//+", "/", matches.group("path"))
@@ -437,6 +455,7 @@ class ObsoleteUriCheck(Check):
 
     _source = sources.EbuildFileRepoSource
     known_results = frozenset([ObsoleteUri])
+    required_addons = (addons.LineScanAddon,)
 
     REGEXPS = (
         (
@@ -452,16 +471,22 @@ class ObsoleteUriCheck(Check):
         ),
     )
 
-    def __init__(self, *args):
+    def __init__(self, *args, line_scan_addon):
         super().__init__(*args)
-        self.regexes = tuple((re.compile(regexp), repl) for regexp, repl in self.REGEXPS)
+        self.line_scanner = line_scan_addon
+        self.regexes = tuple(
+            (re.compile(regexp), self.line_scanner.register(regexp.removeprefix(r".*\b")), repl)
+            for regexp, repl in self.REGEXPS
+        )
 
     def feed(self, pkg):
-        for lineno, line in enumerate(pkg.lines, 1):
-            if not line.strip() or line.startswith("#"):
-                continue
-            # searching for multiple matches on a single line is too slow
-            for regexp, repl in self.regexes:
+        # leading wildcards defeat fast scanning so only the URIs are scanned for
+        for regexp, uri_regex, repl in self.regexes:
+            for lineno in self.line_scanner.lines(pkg, uri_regex):
+                line = pkg.lines[lineno - 1]
+                if line.startswith("#"):
+                    continue
+                # searching for multiple matches on a single line is too slow
                 if mo := regexp.match(line):
                     uri = mo.group("uri")
                     yield ObsoleteUri(lineno, uri, regexp.sub(repl, uri), pkg=pkg)
@@ -492,6 +517,7 @@ class BetterCompressionCheck(Check):
 
     _source = sources.EbuildFileRepoSource
     known_results = frozenset([BetterCompressionUri])
+    required_addons = (addons.LineScanAddon,)
 
     REGEXPS = (
         (
@@ -500,16 +526,22 @@ class BetterCompressionCheck(Check):
         ),
     )
 
-    def __init__(self, *args):
+    def __init__(self, *args, line_scan_addon):
         super().__init__(*args)
-        self.regexes = tuple((re.compile(regexp), repl) for regexp, repl in self.REGEXPS)
+        self.line_scanner = line_scan_addon
+        self.regexes = tuple(
+            (re.compile(regexp), self.line_scanner.register(regexp.removeprefix(r".*\b")), repl)
+            for regexp, repl in self.REGEXPS
+        )
 
     def feed(self, pkg):
-        for lineno, line in enumerate(pkg.lines, 1):
-            if not line.strip() or line.startswith("#"):
-                continue
-            # searching for multiple matches on a single line is too slow
-            for regexp, replacement in self.regexes:
+        # leading wildcards defeat fast scanning so only the URIs are scanned for
+        for regexp, uri_regex, replacement in self.regexes:
+            for lineno in self.line_scanner.lines(pkg, uri_regex):
+                line = pkg.lines[lineno - 1]
+                if line.startswith("#"):
+                    continue
+                # searching for multiple matches on a single line is too slow
                 if mo := regexp.match(line):
                     uri = mo.group("uri")
                     yield BetterCompressionUri(replacement, lineno=lineno, line=uri, pkg=pkg)
@@ -1235,26 +1267,25 @@ class RedundantDodirCheck(Check):
 
     _source = sources.EbuildFileRepoSource
     known_results = frozenset([RedundantDodir])
+    required_addons = (addons.LineScanAddon,)
 
-    def __init__(self, *args):
+    def __init__(self, *args, line_scan_addon):
         super().__init__(*args)
+        self.line_scanner = line_scan_addon
         cmds = r"|".join(("insinto", "exeinto", "docinto"))
         self.cmds_regex = re.compile(rf"^\s*(?P<cmd>({cmds}))\s+(?P<path>\S+)")
-        self.dodir_regex = re.compile(r"^\s*(?P<call>dodir\s+(?P<path>\S+))")
+        self.dodir_regex = self.line_scanner.register(r"^\s*(?P<call>dodir\s+(?P<path>\S+))")
 
     def feed(self, pkg):
-        lines = enumerate(pkg.lines, 1)
-        for lineno, line in lines:
-            line = line.strip()
-            if not line or line[0] == "#":
-                continue
-            if dodir := self.dodir_regex.match(line):
-                lineno, line = next(lines)
-                if cmd := self.cmds_regex.match(line):
-                    if dodir.group("path") == cmd.group("path"):
-                        yield RedundantDodir(
-                            cmd.group("cmd"), line=dodir.group("call"), lineno=lineno - 1, pkg=pkg
-                        )
+        for lineno in self.line_scanner.lines(pkg, self.dodir_regex):
+            if lineno == len(pkg.lines):
+                break
+            dodir = self.dodir_regex.match(pkg.lines[lineno - 1])
+            if cmd := self.cmds_regex.match(pkg.lines[lineno]):
+                if dodir.group("path") == cmd.group("path"):
+                    yield RedundantDodir(
+                        cmd.group("cmd"), line=dodir.group("call"), lineno=lineno, pkg=pkg
+                    )
 
 
 class UnquotedVariable(results.BaseLinesResult, results.AliasResult, results.Warning):
@@ -1406,20 +1437,21 @@ class LineLengthCheck(Check):
 
     _source = sources.EbuildFileRepoSource
     known_results = frozenset([ExcessiveLineLength])
+    required_addons = (addons.LineScanAddon,)
 
-    def __init__(self, options, **kwargs):
-        super().__init__(options, **kwargs)
+    def __init__(self, *args, line_scan_addon):
+        super().__init__(*args)
+        self.line_scanner = line_scan_addon
         self.exception = re.compile(r"\s*(?:DESCRIPTION|KEYWORDS|IUSE)=")
         str_length = f"[^'\"]{{{ExcessiveLineLength.word_length},}}"
         self.long_string = re.compile(rf'"{str_length}"|\'{str_length}\'')
+        self.long_line = self.line_scanner.register(rf"^.{{{ExcessiveLineLength.line_length + 1}}}")
 
     def feed(self, pkg):
         lines = []
-        for lineno, line in enumerate(pkg.lines, 1):
+        for lineno in self.line_scanner.lines(pkg, self.long_line):
             # Lines is literally the line including the newline, thus don't count it.
-            line = line.rstrip("\n")
-            if len(line) <= ExcessiveLineLength.line_length:
-                continue
+            line = pkg.lines[lineno - 1].rstrip("\n")
             if self.exception.match(line):
                 continue  # exception variables which are fine to be long
             if max(map(len, line.split())) > ExcessiveLineLength.word_length:
@@ -4,7 +4,6 @@ import contextlib
 import os
 import re
 import subprocess
-import tarfile
 from collections import defaultdict, deque
 from datetime import datetime
 from itertools import chain
@@ -273,6 +272,9 @@ class _RemovalRepo(UnconfiguredTree):
         self.__parent_repo = repo
         self.__tmpdir = TemporaryDirectory(prefix="tmp-pkgcheck-", suffix=".repo")
         self.__created = False
+        self.__git = git.GitCatFile(repo.location)
+        # mapping of written file paths to their blob ids
+        self.__blobs = {}
         repo_dir = self.__tmpdir.name
 
         # set up some basic repo files so pkgcore doesn't complain
@@ -285,40 +287,86 @@ class _RemovalRepo(UnconfiguredTree):
         super().__init__(repo_dir)
 
     def cleanup(self):
+        self.__git.close()
         self.__tmpdir.cleanup()
 
     def __call__(self, pkgs):
         """Update the repo with a given sequence of packages."""
-        self._populate(pkgs)
+        changed = self._populate(pkgs)
         if self.__created:
-            # notify the repo object that new pkgs were added
-            for pkg in pkgs:
-                self.notify_add_package(pkg)
+            # force the repo object to rescan package dirs with updated ebuilds
+            for category, package in changed:
+                self.categories.force_regen()
+                self.packages.force_regen(category)
+                self.versions.force_regen((category, package), None)
         self.__created = True
         return self
 
     def _populate(self, pkgs):
-        """Populate the repo with a given sequence of historical packages."""
+        """Populate the repo with a given sequence of historical packages.
+
+        Files are pulled from a persistent ``git cat-file`` process and only
+        blobs differing from the ones already written are updated, so eclass
+        and profile snapshots are mostly reused between populate calls.
+
+        Returns the (category, package) keys of package dirs with added or
+        removed ebuilds.
+        """
         pkg = min(pkgs, key=attrgetter("time"))
         paths = [pjoin(pkg.category, pkg.package)]
         for subdir in ("eclass", "profiles"):
             if os.path.exists(pjoin(self.__parent_repo.location, subdir)):
                 paths.append(subdir)
-        old_files = subprocess.Popen(
-            ["git", "archive", f"{pkg.commit}~1"] + paths,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            cwd=self.__parent_repo.location,
-        )
-        if old_files.poll():
-            error = old_files.stderr.read().decode().strip()
-            raise PkgcheckUserException(f"failed populating archive repo: {error}")
-        # https://docs.python.org/3.12/library/tarfile.html#tarfile-extraction-filter
-        if hasattr(tarfile, "data_filter"):
-            # https://docs.python.org/3.12/library/tarfile.html#tarfile.TarFile.extraction_filter
-            tarfile.TarFile.extraction_filter = staticmethod(tarfile.data_filter)
-        with tarfile.open(mode="r|", fileobj=old_files.stdout) as tar:
-            tar.extractall(path=self.location)
+        changed = set()
+        try:
+            files = self.__git.ls_tree(f"{pkg.commit}~1", paths)
+            # remove files that don't exist in the targeted snapshot
+            prefixes = tuple(f"{x}/" for x in paths)
+            for path in [x for x in self.__blobs if x.startswith(prefixes) and x not in files]:
+                del self.__blobs[path]
+                os.unlink(pjoin(self.location, path))
+                with contextlib.suppress(OSError):
+                    os.removedirs(os.path.dirname(pjoin(self.location, path)))
+                changed.update(self._ebuild_pkg(path))
+            for path, (mode, blob) in files.items():
+                if (old_blob := self.__blobs.get(path)) != blob:
+                    self._write_blob(path, mode, blob)
+                    self.__blobs[path] = blob
+                    if old_blob is None:
+                        changed.update(self._ebuild_pkg(path))
+        except git.GitError as e:
+            raise PkgcheckUserException(f"failed populating archive repo: {e}")
+        return changed
+
+    @staticmethod
+    def _ebuild_pkg(path):
+        """Yield the (category, package) key for a given ebuild path."""
+        parts = path.split("/")
+        if len(parts) == 3 and parts[2].endswith(".ebuild"):
+            yield parts[0], parts[1]
+
+    def _write_blob(self, path, mode, blob):
+        """Write a git blob to a given repo path."""
+        data = self.__git.read(blob)
+        if data is None:
+            raise git.GitError(f"missing blob for {path!r}")
+        dest = pjoin(self.location, path)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        if os.path.lexists(dest):
+            os.unlink(dest)
+        if mode == "120000":
+            # skip symlinks pointing outside the repo
+            target = os.fsdecode(data)
+            if os.path.isabs(target) or os.path.normpath(
+                pjoin(os.path.dirname(path), target)
+            ).startswith(".."):
+                return
+            os.symlink(target, dest)
+        else:
+            with open(dest, "wb") as f:
+                f.write(data)
+            if mode == "100755":
+                os.chmod(dest, 0o755)
 
 
 class GitPkgCommitsCheck(GentooRepoCheck, GitCommitsCheck):
@@ -367,16 +415,18 @@ class GitPkgCommitsCheck(GentooRepoCheck, GitCommitsCheck):
         }
 
     def cleanup(self):
-        for repo in self._cleanup:
-            repo.cleanup()
+        while self._cleanup:
+            self._cleanup.pop().cleanup()
+        # historical repos are recreated if the check is run again
+        self._removal_repo = self._modified_repo = None
 
-    @klass.jit_attr
+    @klass.jit_attr_none
     def removal_repo(self):
         """Create a repository of packages removed from git."""
         self._cleanup.append(repo := _RemovalRepo(self.repo))
         return repo
 
-    @klass.jit_attr
+    @klass.jit_attr_none
     def modified_repo(self):
         """Create a repository of old packages newly modified in git."""
         self._cleanup.append(repo := _RemovalRepo(self.repo))
@@ -547,7 +597,7 @@ class GitPkgCommitsCheck(GentooRepoCheck, GitCommitsCheck):
                 )
                 if fetch.chksums
             }
-        except (IndexError, FileNotFoundError, tarfile.ReadError):
+        except (IndexError, FileNotFoundError, PkgcheckUserException):
             # ignore broken ebuild
             return
 
@@ -896,8 +946,9 @@ class GitCommitMessageCheck(GentooRepoCheck, GitCommitsCheck):
                 remaining.appendleft((lineno, line))
                 break
 
-        # mapping of defined tags to any existing verification methods
-        tags = dict(self._required_tags)
+        # mapping of defined tags to any existing verification methods, using
+        # new value lists so tag values don't leak between commits
+        tags = {key: [] for key in self._required_tags}
 
         # verify footer
         while (item := pull()) is not None:
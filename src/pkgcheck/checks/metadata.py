@@ -12,7 +12,7 @@ from pkgcore.ebuild.atom import atom as atom_cls
 from pkgcore.ebuild.atom import transitive_use_atom
 from pkgcore.ebuild.eapi import get_eapi
 from pkgcore.ebuild.misc import sort_keywords
-from pkgcore.fetch import fetchable, unknown_mirror
+from pkgcore.fetch import unknown_mirror
 from pkgcore.package.errors import MetadataException
 from pkgcore.restrictions import boolean, packages, values
 from pkgcore.restrictions.required_use import find_constraint_satisfaction
@@ -1631,7 +1631,7 @@ class SrcUriCheck(Check):
 
     def __init__(self, *args, use_addon):
         super().__init__(*args)
-        self.iuse_filter = use_addon.get_filter("fetchables")
+        self.use_addon = use_addon
         self.zip_to_tar_re = re.compile(
             r"https?://(github\.com/.*?/.*?/archive/.+\.zip|"
             r"gitlab\.com/.*?/.*?/-/archive/.+\.zip)"
@@ -1651,15 +1651,7 @@ class SrcUriCheck(Check):
 
         report_uris = LogMap("pkgcore.log.logger.info", partial(RedundantUriRename, pkg))
         with LogReports(report_uris) as log_reports:
-            fetchables, unstated = self.iuse_filter(
-                (fetchable,),
-                pkg,
-                pkg.generate_fetchables(
-                    allow_missing_checksums=True,
-                    ignore_unknown_mirrors=True,
-                    skip_default_mirrors=True,
-                ),
-            )
+            fetchables, unstated = self.use_addon.fetchables(pkg)
         yield from log_reports
 
         yield from unstated
@@ -1982,17 +1974,11 @@ class MissingUnpackerDepCheck(Check):
     def __init__(self, *args, use_addon):
         super().__init__(*args)
         self.dep_filter = use_addon.get_filter()
-        self.fetch_filter = use_addon.get_filter("fetchables")
+        self.use_addon = use_addon
 
     def feed(self, pkg):
         # ignore conditionals
-        fetchables, _ = self.fetch_filter(
-            (fetchable,),
-            pkg,
-            pkg.generate_fetchables(
-                allow_missing_checksums=True, ignore_unknown_mirrors=True, skip_default_mirrors=True
-            ),
-        )
+        fetchables, _ = self.use_addon.fetchables(pkg)
 
         missing_unpackers = defaultdict(set)
 
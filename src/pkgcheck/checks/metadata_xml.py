@@ -1,6 +1,9 @@
+import io
 import os
 import re
 from difflib import SequenceMatcher
+from functools import lru_cache
+from hashlib import blake2b
 from itertools import chain
 from os.path import join as pjoin
 
@@ -12,7 +15,8 @@ from pkgcore.restrictions.packages import Conditional
 from snakeoil.sequences import iflatten_instance
 from snakeoil.strings import pluralism
 
-from .. import results, sources
+from .. import addons, results, sources
+from ..addons.metadata_xml import XmlValidationAddon
 from . import Check
 
 
@@ -307,16 +311,72 @@ class InvalidMetadataRestrict(results.PackageResult, results.Error):
         return f"metadata.xml: invalid package restrictions {self.restrict!r}: {self.msg}"
 
 
+class MetadataXml:
+    """Parsed metadata.xml file shared between its consumers.
+
+    Files are read and parsed once, storing the raw data alongside the
+    resulting document or parsing error. Schema validation errors are stored
+    per schema.
+    """
+
+    __slots__ = ("path", "data", "doc", "error", "_validated")
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self.data = f.read()
+        self.doc = self.error = None
+        try:
+            self.doc = etree.parse(io.BytesIO(self.data), base_url=path)
+        except etree.XMLSyntaxError as e:
+            self.error = e
+        self._validated = {}
+
+    @property
+    def lines(self):
+        """Iterator over the file's decoded lines."""
+        return io.StringIO(self.data.decode(), newline=None)
+
+    def validate(self, schema):
+        """Return the formatted schema validation errors for the document."""
+        try:
+            return self._validated[schema]
+        except KeyError:
+            errors = ()
+            if not schema.validate(self.doc):
+                errors = tuple(
+                    f"line {x.line}, col {x.column}: ({x.type_name}) {x.message}"
+                    for x in schema.error_log
+                )
+            self._validated[schema] = errors
+            return errors
+
+
+@lru_cache(maxsize=64)
+def _metadata_xml(path, mtime, size):
+    return MetadataXml(path)
+
+
+def parse_metadata_xml(path):
+    """Return the shared, parsed metadata.xml for a given path.
+
+    OSError is raised for missing or unreadable files.
+    """
+    st = os.stat(path)
+    return _metadata_xml(path, st.st_mtime_ns, st.st_size)
+
+
 class _XmlBaseCheck(Check):
     """Base class for metadata.xml scans."""
 
     schema = None
+    optional_addons = (XmlValidationAddon,)
 
     misformed_error = None
     invalid_error = None
     missing_error = None
 
-    def __init__(self, *args):
+    def __init__(self, *args, xml_validation_addon=None):
         super().__init__(*args)
         self.repo_base = self.options.target_repo.location
         self.pkgref_cache = {}
@@ -338,6 +398,11 @@ class _XmlBaseCheck(Check):
             metadata_xsd = pjoin(pkgcore_const.DATA_PATH, "xml-schema", "metadata.xsd")
             self.schema = etree.XMLSchema(etree.parse(metadata_xsd))
 
+        # cached schema validation results, keyed by xsd file content
+        with open(metadata_xsd, "rb") as f:
+            self.schema_digest = blake2b(f.read()).digest()
+        self.xml_cache = xml_validation_addon
+
     def _check_doc(self, pkg, loc, doc):
         """Perform additional document structure checks."""
         # Find all root descendant elements that are empty except
@@ -373,44 +438,47 @@ class _XmlBaseCheck(Check):
         """Check for indentation consistency."""
         orig_indent = None
         indents = set()
-        with open(loc) as f:
-            for lineno, line in enumerate(f, 1):
-                for i in line[: -len(line.lstrip())]:
-                    if i != orig_indent:
-                        if orig_indent is None:
-                            orig_indent = i
-                        else:
-                            indents.add(lineno)
+        for lineno, line in enumerate(parse_metadata_xml(loc).lines, 1):
+            for i in line[: -len(line.lstrip())]:
+                if i != orig_indent:
+                    if orig_indent is None:
+                        orig_indent = i
+                    else:
+                        indents.add(lineno)
         if indents:
             yield self.indent_error(os.path.basename(loc), lines=map(str, sorted(indents)), pkg=pkg)
 
-    @staticmethod
-    def _format_lxml_errors(error_log):
-        for x in error_log:
-            yield f"line {x.line}, col {x.column}: ({x.type_name}) {x.message}"
+    def _validate(self, xml):
+        """Return the schema validation errors for a given MetadataXml object."""
+        if self.xml_cache is not None:
+            return self.xml_cache.validate(xml, self.schema, self.schema_digest)
+        return xml.validate(self.schema)
 
     def _parse_xml(self, pkg, loc):
         try:
-            doc = etree.parse(loc)
+            xml = parse_metadata_xml(loc)
         except OSError:
             # it's only an error when missing in the main gentoo repo
             if self.options.gentoo_repo:
                 yield self.missing_error(os.path.basename(loc), pkg=pkg)
             return
-        except etree.XMLSyntaxError as e:
-            yield self.misformed_error(os.path.basename(loc), str(e), pkg=pkg)
+        if xml.error is not None:
+            yield self.misformed_error(os.path.basename(loc), str(xml.error), pkg=pkg)
             return
 
         # note: while doc is available, do not pass it here as it may
         # trigger undefined behavior due to incorrect structure
-        if self.schema is not None and not self.schema.validate(doc):
-            message = "\n".join(self._format_lxml_errors(self.schema.error_log))
-            yield self.invalid_error(os.path.basename(loc), message, pkg=pkg)
+        if self.schema is not None and (errors := self._validate(xml)):
+            yield self.invalid_error(os.path.basename(loc), "\n".join(errors), pkg=pkg)
             return
 
         # run all post parsing/validation checks
         for check in self._checks:
-            yield from check(pkg, loc, doc)
+            yield from check(pkg, loc, xml.doc)
+
+    def flush(self):
+        if self.xml_cache is not None:
+            self.xml_cache.flush()
 
     def feed(self, pkgset):
         pkg = pkgset[0]
@@ -650,6 +718,7 @@ class MissingRemoteIdCheck(Check):
     """Detect missing remote-ids based on SRC_URI and HOMEPAGE."""
 
     _source = sources.PackageRepoSource
+    required_addons = (addons.UseAddon,)
     known_results = frozenset([MissingRemoteId])
 
     # Exclude api groups and raw project names to conform with https://docs.gitlab.com/ee/user/reserved_names.html
@@ -676,8 +745,9 @@ class MissingRemoteIdCheck(Check):
         ("sourcehut", r"https://sr.ht/(?P<value>[^/]+/[^/]+)"),
     )
 
-    def __init__(self, options, **kwargs):
+    def __init__(self, options, use_addon, **kwargs):
         super().__init__(options, **kwargs)
+        self.use_addon = use_addon
         self.remotes_map = tuple(
             (remote_type, re.compile(regex)) for remote_type, regex in self.remotes_map
         )
@@ -697,13 +767,9 @@ class MissingRemoteIdCheck(Check):
     def feed(self, pkgset):
         remotes = {u.type: (None, None) for u in pkgset[0].upstreams}
         for pkg in sorted(pkgset, reverse=True):
+            # ignore conditionals
             fetchables = iflatten_instance(
-                pkg.generate_fetchables(
-                    allow_missing_checksums=True,
-                    ignore_unknown_mirrors=True,
-                    skip_default_mirrors=True,
-                ),
-                (fetchable, Conditional),
+                self.use_addon.parse_fetchables(pkg), (fetchable, Conditional)
             )
             all_urls: set[str] = set(
                 chain.from_iterable(f.uri for f in fetchables if isinstance(f, fetchable))
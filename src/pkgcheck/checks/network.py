@@ -1,17 +1,17 @@
 """Various checks that require network support."""
 
 import abc
+import os
 import re
 import traceback
 import typing
 import urllib.request
 from functools import partial
-
-from lxml import etree
-from pkgcore.fetch import fetchable
+from os.path import join as pjoin
 
 from .. import addons, results, sources
 from . import NetworkCheck
+from .metadata_xml import parse_metadata_xml
 
 
 class _UrlResult(results.VersionResult, results.Warning):
@@ -111,11 +111,26 @@ class _UrlCheck(abc.ABC, NetworkCheck):
         ]
     )
 
+    def _request(self, url):
+        """Request a given URL, preferring HEAD requests and falling back to GET.
+
+        HEAD requests avoid response bodies so connections can be reused,
+        however some servers reject them or respond with arbitrary client or
+        server errors while supporting GET requests, so any HEAD request
+        error response is verified via GET.
+        """
+        try:
+            return self.session.head(url, allow_redirects=True)
+        except RequestError as e:
+            if getattr(e.request_exc, "response", None) is None:
+                raise
+        return self.session.get(url, allow_redirects=True, stream=True)
+
     def _http_check(self, attr, url, *, pkg):
         """Verify http:// and https:// URLs."""
         result = None
         try:
-            with self.session.get(url, allow_redirects=True, stream=True) as r:
+            with self._request(url) as r:
                 redirected_url = None
                 for response in r.history:
                     if not response.is_permanent_redirect:
@@ -141,7 +156,7 @@ class _UrlCheck(abc.ABC, NetworkCheck):
         """Check if https:// alternatives exist for http:// URLs."""
         result = None
         try:
-            with self.session.get(url, allow_redirects=True, stream=True) as r:
+            with self._request(url) as r:
                 redirected_url = None
                 for response in r.history:
                     if not response.is_permanent_redirect:
@@ -193,7 +208,7 @@ class _UrlCheck(abc.ABC, NetworkCheck):
                 attrs = result._attrs.copy()
                 attrs["attr"] = attr
                 result = result._create(**attrs, pkg=pkg)
-            self.results_q.put([result])
+            self.results_q.put(results.pack([result]))
 
     @abc.abstractmethod
     def _get_urls(self, pkg) -> typing.Iterable[tuple[str, str]]:
@@ -207,12 +222,16 @@ class _UrlCheck(abc.ABC, NetworkCheck):
 
         Note that this tries to avoid hitting the network for the same URL
         twice using a mapping from requested URLs to future objects, adding
-        result-checking callbacks to the futures of existing URLs.
+        result-checking callbacks to the futures of existing URLs. Fresh
+        results from the URL cache are reused without any network access.
         """
         future = futures.get(url)
         if future is None:
-            future = executor.submit(func, attr, url, **kwargs)
-            future.add_done_callback(partial(self.task_done, None, None))
+            if (future := self._cached_future(func, url)) is not None:
+                future.add_done_callback(partial(self.task_done, kwargs["pkg"], attr))
+            else:
+                future = self._submit(executor, func, attr, url, **kwargs)
+                future.add_done_callback(partial(self.task_done, None, None))
             futures[url] = future
         else:
             future.add_done_callback(partial(self.task_done, kwargs["pkg"], attr))
@@ -262,17 +281,11 @@ class FetchablesUrlCheck(_UrlCheck):
 
     def __init__(self, *args, use_addon, **kwargs):
         super().__init__(*args, **kwargs)
-        self.fetch_filter = use_addon.get_filter("fetchables")
+        self.use_addon = use_addon
 
     def _get_urls(self, pkg):
         # ignore conditionals
-        fetchables, _ = self.fetch_filter(
-            (fetchable,),
-            pkg,
-            pkg.generate_fetchables(
-                allow_missing_checksums=True, ignore_unknown_mirrors=True, skip_default_mirrors=True
-            ),
-        )
+        fetchables, _ = self.use_addon.fetchables(pkg)
         for f in fetchables.keys():
             for url in f.uri:
                 yield "SRC_URI", url
@@ -320,8 +333,10 @@ class MetadataUrlCheck(_UrlCheck):
 
     def _get_urls(self, pkg):
         try:
-            tree = etree.parse(pkg._shared_pkg_data.metadata_xml._source)
-        except (OSError, etree.XMLSyntaxError):
+            tree = parse_metadata_xml(pjoin(os.path.dirname(pkg.path), "metadata.xml")).doc
+        except OSError:
+            return
+        if tree is None:
             return
 
         # TODO: move upstream parsing to a pkgcore attribute?
@@ -380,7 +395,7 @@ class PyPIAttestationAvailableCheck(NetworkCheck):
 
     def __init__(self, *args, use_addon, **kwargs):
         super().__init__(*args, **kwargs)
-        self.fetch_filter = use_addon.get_filter("fetchables")
+        self.use_addon = use_addon
 
     def _provenance_check(self, filename, url, *, pkg):
         """Check provenance URLs."""
@@ -412,32 +427,30 @@ class PyPIAttestationAvailableCheck(NetworkCheck):
                 attrs = result._attrs.copy()
                 attrs["filename"] = filename
                 result = result._create(**attrs, pkg=pkg)
-            self.results_q.put([result])
+            self.results_q.put(results.pack([result]))
 
     def _schedule_check(self, filename, url, executor, futures, **kwargs):
         """Schedule verification method to run in a separate thread against a given URL.
 
         Note that this tries to avoid hitting the network for the same URL
         twice using a mapping from requested URLs to future objects, adding
-        result-checking callbacks to the futures of existing URLs.
+        result-checking callbacks to the futures of existing URLs. Fresh
+        results from the URL cache are reused without any network access.
         """
         future = futures.get(url)
         if future is None:
-            future = executor.submit(self._provenance_check, filename, url, **kwargs)
-            future.add_done_callback(partial(self.task_done, None, None))
+            if (future := self._cached_future(self._provenance_check, url)) is not None:
+                future.add_done_callback(partial(self.task_done, kwargs["pkg"], filename))
+            else:
+                future = self._submit(executor, self._provenance_check, filename, url, **kwargs)
+                future.add_done_callback(partial(self.task_done, None, None))
             futures[url] = future
         else:
             future.add_done_callback(partial(self.task_done, kwargs["pkg"], filename))
 
     def _get_urls(self, pkg):
         # ignore conditionals
-        fetchables, _ = self.fetch_filter(
-            (fetchable,),
-            pkg,
-            pkg.generate_fetchables(
-                allow_missing_checksums=True, ignore_unknown_mirrors=True, skip_default_mirrors=True
-            ),
-        )
+        fetchables, _ = self.use_addon.fetchables(pkg)
         for f in fetchables.keys():
             for url in f.uri:
                 if m := self.pypi_uri_re.match(url):
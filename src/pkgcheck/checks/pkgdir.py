@@ -2,7 +2,6 @@ import os
 import stat
 from collections import defaultdict
 from datetime import datetime
-from os import listdir
 from os.path import join as pjoin
 
 from pkgcore.ebuild.atom import MalformedAtom
@@ -190,13 +189,30 @@ class InvalidUTF8(results.PackageResult, results.Error):
         return f"invalid UTF-8: {self.err}: {self.filename!r}"
 
 
+class PackageDirRepoSource(sources.PackageRepoSource):
+    """Ebuild repository source yielding package lists with package directory snapshots.
+
+    Gitignored FILESDIR subdirectories are pruned while snapshotting.
+    """
+
+    required_addons = (addons.git.GitAddon,)
+
+    def __init__(self, *args, git_addon: addons.git.GitAddon, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.gitignored = git_addon.gitignored
+
+    def itermatch(self, restrict, **kwargs):
+        for pkgs in super().itermatch(restrict, **kwargs):
+            yield sources.PkgDirPkgs(pkgs, self.repo, self.gitignored)
+
+
 class PkgDirCheck(Check):
     """Scan ebuild directory for various file-related issues."""
 
-    _source = (sources.PackageRepoSource, (), (("source", sources.RawRepoSource),))
+    _source = (PackageDirRepoSource, (), (("source", sources.RawRepoSource),))
 
-    ignore_dirs = frozenset(["cvs", ".svn", ".bzr"])
     required_addons = (addons.git.GitAddon,)
+    optional_addons = (addons.git.GitFilesAddon,)
     known_results = frozenset(
         [
             DuplicateFiles,
@@ -215,25 +231,25 @@ class PkgDirCheck(Check):
     # TODO: put some 'preferred algorithms by purpose' into snakeoil?
     digest_algo = "sha256"
 
-    def __init__(self, *args, git_addon):
+    def __init__(self, *args, git_addon, git_files_addon=None):
         super().__init__(*args)
         self.gitignored = git_addon.gitignored
+        self.git_files = git_files_addon
 
     def feed(self, pkgset):
         pkg = pkgset[0]
-        pkg_path = pjoin(self.options.target_repo.location, pkg.category, pkg.package)
+        pkgdir = pkgset.pkgdir
+        pkg_path = pkgdir.path
         ebuild_ext = ".ebuild"
         mismatched = []
         invalid = []
         unknown = []
-        # note we don't use os.walk, we need size info also
-        for filename in listdir(pkg_path):
-            path = pjoin(pkg_path, filename)
-
-            if self.gitignored(path):
+        for entry in pkgdir.entries:
+            filename = entry.name
+            if self.gitignored(entry.path):
                 continue
 
-            if os.path.isfile(path) and os.stat(path).st_mode & 0o111:
+            if stat.S_ISREG(entry.mode) and entry.mode & 0o111:
                 yield ExecutableFile(filename, pkg=pkg)
 
             # While this may seem odd, written this way such that the filtering
@@ -243,11 +259,11 @@ class PkgDirCheck(Check):
                 yield BannedCharacter(filename, sorted(banned_chars), pkg=pkg)
 
             if filename.endswith(ebuild_ext):
-                try:
-                    with open(path, mode="rb") as f:
-                        f.read(8192).decode()
-                except UnicodeDecodeError as e:
-                    yield InvalidUTF8(filename, str(e), pkg=pkg)
+                if entry.head is not None:
+                    try:
+                        entry.head.decode()
+                    except UnicodeDecodeError as e:
+                        yield InvalidUTF8(filename, str(e), pkg=pkg)
 
                 pkg_name = os.path.basename(filename[: -len(ebuild_ext)])
                 try:
@@ -267,30 +283,30 @@ class PkgDirCheck(Check):
             yield UnknownPkgDirEntry(sorted(unknown), pkg=pkg)
 
         files_by_size = defaultdict(list)
-        pkg_path_len = len(pkg_path) + 1
         total_size = 0
-        for root, dirs, files in os.walk(pjoin(pkg_path, "files")):
-            # don't visit any ignored directories
-            for d in self.ignore_dirs.intersection(dirs):
-                dirs.remove(d)
-            base_dir = root[pkg_path_len:]
-            for filename in files:
-                path = pjoin(root, filename)
-                if self.gitignored(path):
+        dirs = ["files"] if "files" in pkgdir.dirs else []
+        while dirs:
+            base_dir = dirs.pop()
+            for entry in pkgdir.dirs[base_dir]:
+                filename = entry.name
+                if entry.is_dir:
+                    # ignored directories are pruned while snapshotting
+                    subdir = pjoin(base_dir, filename)
+                    if subdir in pkgdir.dirs:
+                        dirs.append(subdir)
+                    continue
+                if self.gitignored(entry.path):
                     continue
-                file_stat = os.lstat(path)
-                if stat.S_ISREG(file_stat.st_mode):
-                    if file_stat.st_mode & 0o111:
+                if stat.S_ISREG(entry.mode):
+                    if entry.mode & 0o111:
                         yield ExecutableFile(pjoin(base_dir, filename), pkg=pkg)
-                    if file_stat.st_size == 0:
+                    if entry.size == 0:
                         yield EmptyFile(pjoin(base_dir, filename), pkg=pkg)
                     else:
-                        files_by_size[file_stat.st_size].append(pjoin(base_dir, filename))
-                        total_size += file_stat.st_size
-                        if file_stat.st_size > SizeViolation.limit:
-                            yield SizeViolation(
-                                pjoin(base_dir, filename), file_stat.st_size, pkg=pkg
-                            )
+                        files_by_size[entry.size].append(pjoin(base_dir, filename))
+                        total_size += entry.size
+                        if entry.size > SizeViolation.limit:
+                            yield SizeViolation(pjoin(base_dir, filename), entry.size, pkg=pkg)
                     if banned_chars := set(filename) - allowed_filename_chars:
                         yield BannedCharacter(
                             pjoin(base_dir, filename), sorted(banned_chars), pkg=pkg
@@ -300,10 +316,18 @@ class PkgDirCheck(Check):
             yield TotalSizeViolation(total_size, pkg=pkg)
 
         files_by_digest = defaultdict(list)
+        blobs = None
         for size, files in files_by_size.items():
             if len(files) > 1:
-                for f in files:
-                    digest = get_chksums(pjoin(pkg_path, f), self.digest_algo)[0]
+                # use git blob ids for unmodified tracked files, otherwise hash them
+                repo_paths = [pjoin(pkg.category, pkg.package, f) for f in files]
+                if blobs is None and self.git_files is not None:
+                    blobs = self.git_files.blobs(pjoin(pkg.category, pkg.package))
+                if blobs and all(blobs.get(x) for x in repo_paths):
+                    digests = (blobs[x] for x in repo_paths)
+                else:
+                    digests = (get_chksums(pjoin(pkg_path, f), self.digest_algo)[0] for f in files)
+                for f, digest in zip(files, digests):
                     files_by_digest[digest].append(f)
 
         for digest, files in files_by_digest.items():
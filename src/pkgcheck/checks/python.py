@@ -3,7 +3,6 @@ from collections import defaultdict
 from itertools import takewhile
 from operator import attrgetter
 
-from pkgcore import fetch
 from pkgcore.ebuild.atom import atom
 from pkgcore.ebuild.conditionals import DepSet
 from pkgcore.ebuild.errors import DepsetParseError
@@ -918,7 +917,7 @@ class PythonFetchableCheck(Check):
 
     def __init__(self, *args, use_addon):
         super().__init__(*args)
-        self.iuse_filter = use_addon.get_filter("fetchables")
+        self.use_addon = use_addon
 
     def check_gh_suffix(self, pkg, fetchables):
         # consider only packages with pypi remote-id
@@ -1053,13 +1052,7 @@ class PythonFetchableCheck(Check):
                 yield PythonInlinePyPIURI(uri, args, pkg=pkg)
 
     def feed(self, pkg):
-        fetchables, _ = self.iuse_filter(
-            (fetch.fetchable,),
-            pkg,
-            pkg.generate_fetchables(
-                allow_missing_checksums=True, ignore_unknown_mirrors=True, skip_default_mirrors=True
-            ),
-        )
+        fetchables, _ = self.use_addon.fetchables(pkg)
 
         yield from self.check_gh_suffix(pkg, fetchables)
         yield from self.check_pypi_mirror(pkg, fetchables)
@@ -25,23 +25,28 @@ class RepoDirCheck(GentooRepoCheck, RepoCheck):
 
     _source = (sources.EmptySource, (base.repo_scope,))
     required_addons = (addons.git.GitAddon,)
+    optional_addons = (addons.git.GitFilesAddon,)
     known_results = frozenset([BinaryFile])
 
     # repo root level directories that are ignored
     ignored_root_dirs = frozenset([".git"])
 
-    def __init__(self, *args, git_addon):
+    def __init__(self, *args, git_addon, git_files_addon=None):
         super().__init__(*args)
         self.gitignored = git_addon.gitignored
+        self.git_files = git_files_addon
         self.repo = self.options.target_repo
         self.ignored_paths = {pjoin(self.repo.location, x) for x in self.ignored_root_dirs}
         self.dirs = [self.repo.location]
 
-    def finish(self):
+    def _walk(self):
+        """Walk the repo for files when a git file listing isn't available."""
         while self.dirs:
             for entry in os.scandir(self.dirs.pop()):
                 if entry.is_dir(follow_symlinks=False):
-                    if entry.path in self.ignored_paths or self.gitignored(entry.path):
+                    if entry.path in self.ignored_paths or self.gitignored(
+                        entry.path, directory=True
+                    ):
                         continue
                     self.dirs.append(entry.path)
                 elif is_binary(entry.path):
@@ -49,6 +54,24 @@ class RepoDirCheck(GentooRepoCheck, RepoCheck):
                         rel_path = entry.path[len(self.repo.location) + 1 :]
                         yield BinaryFile(rel_path)
 
+    def finish(self):
+        if self.git_files is None or self.git_files.files is None:
+            yield from self._walk()
+            return
+
+        paths = (
+            x
+            for x in self.git_files.files
+            if x.split("/", 1)[0] not in self.ignored_root_dirs and not self.gitignored(x)
+        )
+        for path, binary in self.git_files.binary(paths).items():
+            if binary:
+                yield BinaryFile(path)
+
+    def flush(self):
+        if self.git_files is not None:
+            self.git_files.flush()
+
 
 class EmptyCategoryDir(results.CategoryResult, results.Error):
     """Empty category directory in the repository."""
@@ -1,9 +1,8 @@
 """Various whitespace-related checks."""
 
-import re
 from typing import NamedTuple
 
-from .. import results, sources
+from .. import addons, results, sources
 from . import Check, OptionalCheck
 
 
@@ -132,22 +131,22 @@ class WhitespaceCheck(Check):
             BadWhitespaceCharacter,
         }
     )
+    required_addons = (addons.LineScanAddon,)
 
-    _indent_regex = re.compile("^\t* \t+")
-
-    def __init__(self, *args):
+    def __init__(self, *args, line_scan_addon):
         super().__init__(*args)
+        self.line_scanner = line_scan_addon
         bad_whitespace = "".join(whitespace_data.chars)
-        self.bad_whitespace_regex = re.compile(rf"(?P<char>[{bad_whitespace}])")
+        self.bad_whitespace_regex = self.line_scanner.register(rf"(?P<char>[{bad_whitespace}])")
+        self.trailing_regex = self.line_scanner.register(r"[ \t]\n")
+        self.leading_regex = self.line_scanner.register(r"^ ")
+        self.indent_regex = self.line_scanner.register(r"^\t* \t+")
+        self.empty_regex = self.line_scanner.register(r"^\n")
 
     def feed(self, pkg):
-        lastlineempty = False
-        trailing = []
-        leading = []
-        indent = []
-        double_empty = []
-
-        for lineno, line in enumerate(pkg.lines, 1):
+        scan = self.line_scanner.lines
+        for lineno in scan(pkg, self.bad_whitespace_regex):
+            line = pkg.lines[lineno - 1]
             for match in self.bad_whitespace_regex.finditer(line):
                 yield BadWhitespaceCharacter(
                     repr(match.group("char")),
@@ -157,18 +156,17 @@ class WhitespaceCheck(Check):
                     pkg=pkg,
                 )
 
-            if line != "\n":
-                lastlineempty = False
-                if line[-2:-1] == " " or line[-2:-1] == "\t":
-                    trailing.append(lineno)
-                elif line[0] == " ":
-                    leading.append(lineno)
-                if self._indent_regex.match(line):
-                    indent.append(lineno)
-            elif lastlineempty:
-                double_empty.append(lineno)
-            else:
-                lastlineempty = True
+        trailing = list(scan(pkg, self.trailing_regex))
+        # final line lacking a newline
+        if pkg.lines and not (line := pkg.lines[-1]).endswith("\n") and line[-2:-1] in (" ", "\t"):
+            trailing.append(len(pkg.lines))
+        trailing_lines = frozenset(trailing)
+        leading = [x for x in scan(pkg, self.leading_regex) if x not in trailing_lines]
+        indent = scan(pkg, self.indent_regex)
+        empty = scan(pkg, self.empty_regex)
+        empty_lines = frozenset(empty)
+        double_empty = [x for x in empty if x - 1 in empty_lines]
+
         if trailing:
             yield WhitespaceFound("trailing", lines=trailing, pkg=pkg)
         if leading:
@@ -177,7 +175,7 @@ class WhitespaceCheck(Check):
             yield WrongIndentFound(indent, pkg=pkg)
         if double_empty:
             yield DoubleEmptyLine(double_empty, pkg=pkg)
-        if lastlineempty:
+        if pkg.lines and pkg.lines[-1] == "\n":
             yield TrailingEmptyLine(pkg=pkg)
 
         # Dealing with empty ebuilds is just paranoia
@@ -194,12 +192,17 @@ class MissingWhitespaceCheck(OptionalCheck):
             MissingEAPIBlankLine,
         }
     )
+    required_addons = (addons.LineScanAddon,)
 
-    def feed(self, pkg):
-        eapi_lineno = None
+    def __init__(self, *args, line_scan_addon):
+        super().__init__(*args)
+        self.line_scanner = line_scan_addon
+        self.eapi_regex = self.line_scanner.register(r"^EAPI=")
 
-        for lineno, line in enumerate(pkg.lines, 1):
-            if line.startswith("EAPI="):
-                eapi_lineno = lineno
-            elif eapi_lineno is not None and lineno == eapi_lineno + 1 and line != "\n":
-                yield MissingEAPIBlankLine(pkg=pkg)
+    def feed(self, pkg):
+        for lineno in self.line_scanner.lines(pkg, self.eapi_regex):
+            # line numbers index the following line
+            if lineno < len(pkg.lines):
+                line = pkg.lines[lineno]
+                if line != "\n" and not line.startswith("EAPI="):
+                    yield MissingEAPIBlankLine(pkg=pkg)
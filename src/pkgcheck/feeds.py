@@ -36,6 +36,9 @@ class Feed(base.Addon):
     def cleanup(self):
         """Do cleanup here."""
 
+    def flush(self):
+        """Push cached data to disk once a scanning process has run all its tasks."""
+
 
 class QueryCache(Feed):
     @staticmethod
@@ -1,5 +1,6 @@
 """Pipeline that parallelizes check running."""
 
+import gc
 import multiprocessing
 import os
 import signal
@@ -11,13 +12,14 @@ from operator import attrgetter
 
 from . import base
 from .checks import init_checks
-from .sources import UnversionedSource, VersionedSource
+from .results import pack, unpack
+from .sources import PartitionSource, UnversionedSource, VersionedSource
 
 
 class Pipeline:
     """Check-running pipeline leveraging scope-based parallelism.
 
-    All results are pushed into the results queue as lists of result objects or
+    All results are pushed into the results queue as packed result sequences or
     exception traceback strings. This iterator forces exceptions to be handled
     explicitly by outputting the serialized traceback and signaling the process
     group to end when an exception is raised.
@@ -54,9 +56,13 @@ class Pipeline:
                 if scope <= base.repo_scope
             }
 
-    def _filter_checks(self, scope):
+    def _filter_checks(self, scope, checks=None):
         """Verify check scope against given scope to determine activation."""
-        for check in sorted(self.options.enabled_checks, key=attrgetter("__name__")):
+        enabled_checks = self.options.enabled_checks
+        if checks is not None:
+            # restriction targeting specific checks
+            enabled_checks = enabled_checks & checks
+        for check in sorted(enabled_checks, key=attrgetter("__name__")):
             if isinstance(check.scope, base.ConditionalScope):
                 # conditionally enabled check
                 yield check
@@ -77,16 +83,19 @@ class Pipeline:
 
     def _create_runners(self):
         """Initialize and categorize checkrunners for results pipeline."""
-        pipes = {"async": [], "sync": [], "sequential": []}
+        pipes = {"async": [], "sync": [], "partitioned": [], "sequential": []}
 
         # use addon/source caches to avoid re-initializing objects
         addons_map = {}
         source_map = {}
 
-        for scope, restriction in self.options.restrictions:
+        for scope, restriction, *checks in self.options.restrictions:
             # initialize enabled checks
-            addons = list(base.get_addons(self._filter_checks(scope)))
+            addons = list(base.get_addons(self._filter_checks(scope, *checks)))
             if not addons:
+                if checks:
+                    # skip restrictions for disabled checks
+                    continue
                 raise base.PkgcheckUserException(
                     f"no matching checks available for {scope.desc} scope"
                 )
@@ -97,17 +106,18 @@ class Pipeline:
             # Initialize checkrunners per source type using separate runner for
             # async checks and categorize them for parallelization based on the
             # scan and source scope.
-            runners = {
-                "async": defaultdict(list),
-                "sync": defaultdict(list),
-                "sequential": defaultdict(list),
-            }
+            runners = {exec_type: defaultdict(list) for exec_type in pipes}
             for (source, runner_cls), check_objs in checks.items():
-                runner = runner_cls(self.options, source, check_objs)
+                if runner_cls.type == "partitioned":
+                    # split matching source items once between separate runners, one per job
+                    partitions = PartitionSource.split(source, restriction, self.options.jobs)
+                    new_runners = [runner_cls(self.options, x, check_objs) for x in partitions]
+                else:
+                    new_runners = [runner_cls(self.options, source, check_objs)]
                 if not self.options.pkg_scan and source.scope >= base.package_scope:
-                    runners[runner_cls.type][base.package_scope].append(runner)
+                    runners[runner_cls.type][base.package_scope].extend(new_runners)
                 else:
-                    runners[runner_cls.type][source.scope].append(runner)
+                    runners[runner_cls.type][source.scope].extend(new_runners)
 
             for exec_type in pipes:
                 if runners[exec_type]:
@@ -125,8 +135,15 @@ class Pipeline:
         raise KeyboardInterrupt
 
     def __iter__(self):
-        # start running the check pipeline
-        self._runner.start()
+        # Move all objects created during check and addon initialization into
+        # the permanent generation before forking so GC passes in the scanning
+        # processes don't touch them, keeping their memory pages shared.
+        gc.freeze()
+        try:
+            # start running the check pipeline
+            self._runner.start()
+        finally:
+            gc.unfreeze()
         return self
 
     def __next__(self):
@@ -154,6 +171,7 @@ class Pipeline:
                 # traceback, and signal the scanning process to end.
                 if isinstance(results, str):
                     self._kill_pipe(error=results.strip())
+                results = unpack(results)
 
                 # cache registered result scopes to forcibly order output
                 try:
@@ -161,8 +179,15 @@ class Pipeline:
                 except KeyError:
                     self._results.extend(results)
 
-    def _queue_work(self, sync_pipes, work_q):
+    def _queue_work(self, sync_pipes, work_q, partitioned_pipes=()):
         """Producer that queues scanning tasks against granular scope restrictions."""
+        # Partitioned runners are queued first, using the full scan restriction,
+        # so they overlap with the more granular tasks.
+        for i, (_scan_scope, restriction, pipes) in enumerate(partitioned_pipes, len(sync_pipes)):
+            for scope, runners in pipes.items():
+                for j in range(len(runners)):
+                    work_q.put((scope, restriction, i, [j]))
+
         versioned_source = VersionedSource(self.options)
         unversioned_source = UnversionedSource(self.options)
 
@@ -191,12 +216,21 @@ class Pipeline:
                 if results := sorted(
                     chain.from_iterable(pipes[i][-1][scope][j].run(restrict) for j in runners)
                 ):
-                    self._results_q.put(results)
+                    self._results_q.put(pack(results))
+            self._flush(pipes)
         except Exception:  # pragma: no cover
             # traceback can't be pickled so serialize it
             tb = traceback.format_exc()
             self._results_q.put(tb)
 
+    @staticmethod
+    def _flush(pipes):
+        """Flush cached data for all checks in the given pipes."""
+        for _scope, _restriction, runners in pipes:
+            for runner in chain.from_iterable(runners.values()):
+                for check in runner.checks:
+                    check.flush()
+
     def _schedule_async(self, async_pipes):
         """Schedule asynchronous checks."""
         try:
@@ -206,6 +240,7 @@ class Pipeline:
                 for _scope, restriction, pipes in async_pipes:
                     for runner in chain.from_iterable(pipes.values()):
                         runner.schedule(executor, futures, restriction)
+            self._flush(async_pipes)
         except Exception:  # pragma: no cover
             # traceback can't be pickled so serialize it
             tb = traceback.format_exc()
@@ -223,19 +258,23 @@ class Pipeline:
                 async_proc = self._mp_ctx.Process(target=self._schedule_async, args=(async_pipes,))
                 async_proc.start()
 
-            # run synchronous checks using a process pool
-            if sync_pipes := self._pipes["sync"]:
+            # run synchronous and partitioned checks using a process pool
+            sync_pipes, partitioned_pipes = self._pipes["sync"], self._pipes["partitioned"]
+            if sync_pipes or partitioned_pipes:
                 work_q = self._mp_ctx.SimpleQueue()
-                pool = self._mp_ctx.Pool(self.options.jobs, self._run_checks, (sync_pipes, work_q))
+                pool = self._mp_ctx.Pool(
+                    self.options.jobs, self._run_checks, (sync_pipes + partitioned_pipes, work_q)
+                )
                 pool.close()
-                self._queue_work(sync_pipes, work_q)
+                self._queue_work(sync_pipes, work_q, partitioned_pipes)
                 pool.join()
 
             if sequential_pipes := self._pipes["sequential"]:
                 for _scope, restriction, pipes in sequential_pipes:
                     for runner in chain.from_iterable(pipes.values()):
                         if results := tuple(runner.run(restriction)):
-                            self._results_q.put(results)
+                            self._results_q.put(pack(results))
+                self._flush(sequential_pipes)
 
             if async_proc is not None:
                 async_proc.join()
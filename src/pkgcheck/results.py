@@ -1,7 +1,9 @@
 """Base classes for check results."""
 
 import abc
-from functools import total_ordering
+import pickle
+from functools import cache, total_ordering
+from itertools import chain
 
 from pkgcore.ebuild import cpv
 from snakeoil import klass
@@ -44,9 +46,28 @@ class Result(abc.ABC):
 
     @property
     def _attrs(self):
-        """Return all public result attributes."""
+        """Return a new dict of all public result attributes."""
         return {k: v for k, v in self.__dict__.items() if not k.startswith("_")}
 
+    @klass.jit_attr_named("_cached_attr_items")
+    def _attr_items(self):
+        """Flattened, key-sorted public attribute items used for equality and hashing."""
+        items = sorted(x for x in self.__dict__.items() if not x[0].startswith("_"))
+        return tuple(chain.from_iterable(items))
+
+    @klass.jit_attr_named("_cached_desc")
+    def _desc(self):
+        """Cached result description used when sorting."""
+        return self.desc
+
+    @klass.jit_attr_named("_cached_hash")
+    def _hash(self):
+        return hash((self.name, self._attr_items))
+
+    def __getstate__(self):
+        # drop cached values derived from result attributes
+        return {k: v for k, v in self.__dict__.items() if not k.startswith("_cached_")}
+
     @classmethod
     def _create(cls, **kwargs):
         """Create a new result object from a given attributes dict."""
@@ -66,15 +87,15 @@ class Result(abc.ABC):
         return cls(**kwargs)
 
     def __eq__(self, other):
-        return self.name == other.name and self._attrs == other._attrs
+        return self.name == other.name and self._attr_items == other._attr_items
 
     def __hash__(self):
-        return hash((self.name, tuple(sorted(self._attrs.items()))))
+        return self._hash
 
     def __lt__(self, other):
         if self.scope == other.scope:
             if self.name == other.name:
-                return self.desc < other.desc
+                return self._desc < other._desc
             return self.name < other.name
         return self.scope < other.scope
 
@@ -140,7 +161,7 @@ class CommitResult(Result):
             # if hashes match, sort by name/desc
             if self.commit == other.commit:
                 if self.name == other.name:
-                    return self.desc < other.desc
+                    return self._desc < other._desc
                 return self.name < other.name
         except AttributeError:
             pass
@@ -168,7 +189,7 @@ class EclassResult(Result):
             # if eclasses match, sort by name/desc
             if self.eclass == other.eclass:
                 if self.name == other.name:
-                    return self.desc < other.desc
+                    return self._desc < other._desc
                 return self.name < other.name
             return self.eclass < other.eclass
         except AttributeError:
@@ -176,8 +197,35 @@ class EclassResult(Result):
         return False
 
 
+def _version_key(fullver):
+    """Return a sort key for a version matching the ordering of :func:`cpv.ver_cmp`."""
+    version, _, revision = fullver.partition("-r")
+    version, *suffixes = version.split("_")
+    components = version.split(".")
+    letter = -1
+    if components[-1][-1].isalpha():
+        letter = ord(components[-1][-1])
+        components[-1] = components[-1][:-1]
+    # Flattened (type, value) pairs, components with leading zeros are compared
+    # as strings and sort before integers.
+    components_key = []
+    for x in components:
+        components_key.extend((1, int(x)) if x[0] != "0" else (0, x.rstrip("0")))
+    suffixes_key = []
+    for suffix in suffixes:
+        name, num = cpv.suffix_regexp.match(suffix).groups()
+        suffixes_key.extend((cpv.suffix_value[name], int("0" + num)))
+    # missing suffixes sort between prerelease and patch suffixes
+    suffixes_key.extend((0, 0))
+    return tuple(components_key), letter, tuple(suffixes_key), int(revision or 0)
+
+
 class CategoryResult(Result):
-    """Result related to a specific category."""
+    """Result related to a specific category.
+
+    Results related to categories, packages, and versions are ordered by a
+    precomputed key so sorting them mostly avoids Python-level comparisons.
+    """
 
     scope = base.category_scope
 
@@ -186,12 +234,21 @@ class CategoryResult(Result):
         self.category = pkg.category
         self._attr = "category"
 
+    @klass.jit_attr_named("_cached_sort_key")
+    def _sort_key(self):
+        """Sort key ordering results by target, then name and description."""
+        return (self.category, *self._pkg_key, self.name, self._desc)
+
+    # package, version, and line number key components
+    _pkg_key = ("", (), 0)
+
     def __lt__(self, other):
         try:
-            if self.category != other.category:
-                return self.category < other.category
+            return self._cached_sort_key < other._cached_sort_key
         except AttributeError:
             pass
+        if isinstance(other, CategoryResult):
+            return self._sort_key < other._sort_key
         return super().__lt__(other)
 
 
@@ -205,13 +262,9 @@ class PackageResult(CategoryResult):
         self.package = pkg.package
         self._attr = "package"
 
-    def __lt__(self, other):
-        try:
-            if self.category == other.category and self.package != other.package:
-                return self.package < other.package
-        except AttributeError:
-            pass
-        return super().__lt__(other)
+    @property
+    def _pkg_key(self):
+        return self.package, (), 0
 
 
 class VersionResult(PackageResult):
@@ -233,18 +286,9 @@ class VersionResult(PackageResult):
         revision = cpv.Revision(revision)
         return version, revision
 
-    def __lt__(self, other, cmp=None):
-        try:
-            if self.category == other.category and self.package == other.package:
-                if cmp is None:
-                    cmp = cpv.ver_cmp(*(self.ver_rev + other.ver_rev))
-                if cmp < 0:
-                    return True
-                elif cmp > 0:
-                    return False
-        except AttributeError:
-            pass
-        return super().__lt__(other)
+    @property
+    def _pkg_key(self):
+        return self.package, _version_key(self.version), 0
 
 
 class LinesResult(BaseLinesResult, VersionResult):
@@ -252,27 +296,20 @@ class LinesResult(BaseLinesResult, VersionResult):
 
 
 class LineResult(VersionResult):
-    """Result related to a specific line of an ebuild."""
+    """Result related to a specific line of an ebuild.
+
+    Line results for a version are sorted by line number after any other
+    results for the version.
+    """
 
     def __init__(self, line, lineno, **kwargs):
         super().__init__(**kwargs)
         self.line = line
         self.lineno = lineno
 
-    def __lt__(self, other):
-        cmp = None
-        try:
-            if self.category == other.category and self.package == other.package:
-                # sort by line number for matching versions
-                cmp = cpv.ver_cmp(*(self.ver_rev + other.ver_rev))
-                if cmp == 0:
-                    if self.lineno < other.lineno:
-                        return True
-                    elif self.lineno > other.lineno:
-                        return False
-        except AttributeError:
-            pass
-        return super().__lt__(other, cmp=cmp)
+    @property
+    def _pkg_key(self):
+        return self.package, _version_key(self.version), self.lineno
 
 
 class _LogResult(Result):
@@ -321,3 +358,79 @@ class MetadataError(Error):
     @property
     def desc(self):
         return self.msg
+
+
+@cache
+def _keywords():
+    """Return the sorted result keyword names, classes, and class to index mapping."""
+    # avoid circular import issues
+    from . import objects
+
+    names = tuple(sorted(objects.KEYWORDS))
+    classes = tuple(objects.KEYWORDS[name] for name in names)
+    return names, classes, {cls: i for i, cls in enumerate(classes)}
+
+
+def pack(results):
+    """Pack result objects into a compact, picklable form.
+
+    Each result is stored as its keyword index, attribute names, and values.
+    Keyword indices refer to the sorted result keyword table while unknown
+    result classes are stored directly. Matching attribute name tuples are
+    shared between results so pickling a packed sequence only stores them once.
+    """
+    ids = _keywords()[2]
+    attr_names = {}
+    packed = []
+    for result in results:
+        state = result.__getstate__()
+        names = tuple(state)
+        names = attr_names.setdefault(names, names)
+        packed.append((ids.get(result.__class__, result.__class__), names, tuple(state.values())))
+    return tuple(packed)
+
+
+def unpack(packed, keywords=None):
+    """Unpack result objects from their packed form.
+
+    A keyword names table can be given for data packed by other pkgcheck
+    versions, e.g. when loading packed results from disk. InvalidResult is
+    raised for unknown keywords and invalid keyword indices or classes.
+    """
+    if keywords is None:
+        classes = _keywords()[1]
+    else:
+        # avoid circular import issues
+        from . import objects
+
+        classes = tuple(objects.KEYWORDS.get(name) for name in keywords)
+
+    results = []
+    for k, names, values in packed:
+        if isinstance(k, int):
+            if not 0 <= k < len(classes):
+                raise InvalidResult(f"invalid result keyword index: {k}")
+            if (cls := classes[k]) is None:
+                raise InvalidResult(f"unknown result keyword: {keywords[k]!r}")
+        elif isinstance(k, type) and issubclass(k, Result):
+            cls = k
+        else:
+            raise InvalidResult(f"invalid result class: {k!r}")
+        result = cls.__new__(cls)
+        result.__dict__.update(zip(names, values))
+        results.append(result)
+    return results
+
+
+def dump(results, f):
+    """Write result objects in packed form to a given binary file object."""
+    pickle.dump((_keywords()[0], pack(results)), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load(f):
+    """Read result objects written by :func:`dump` from a given binary file object."""
+    try:
+        keywords, packed = pickle.load(f)
+        return unpack(packed, keywords)
+    except (EOFError, IndexError, ValueError, TypeError, pickle.UnpicklingError) as e:
+        raise InvalidResult(f"failed loading results: {e}")
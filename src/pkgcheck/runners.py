@@ -63,9 +63,13 @@ class SyncCheckRunner(CheckRunner):
             result = result_cls(e.attr, error_str, pkg=e.pkg)
             self._metadata_errors.append((e.pkg, result))
 
+    def _itermatch(self, restrict):
+        """Iterate over all source items matching a given restriction."""
+        return self.source.itermatch(restrict)
+
     def run(self, restrict=packages.AlwaysTrue):
         """Run registered checks against all matching source items."""
-        for item in self.source.itermatch(restrict):
+        for item in self._itermatch(restrict):
             for check in self.checks:
                 try:
                     yield from check.feed(item)
@@ -102,6 +106,19 @@ class SequentialCheckRunner(SyncCheckRunner):
     type = "sequential"
 
 
+class PartitionedCheckRunner(SyncCheckRunner):
+    """Generic runner for checks partitioned across the process pool.
+
+    Matching source items are split once into interleaved partitions by the
+    pipeline, each run by a separate runner as a pool task. All runners share
+    the same check instances, so any state kept by the checks must be local to
+    the forked pool process and reset on cleanup since a process can run
+    multiple partitions.
+    """
+
+    type = "partitioned"
+
+
 class AsyncCheckRunner(CheckRunner):
     """Generic runner for asynchronous checks.
 
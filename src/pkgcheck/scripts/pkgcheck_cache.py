@@ -35,6 +35,36 @@ cache_actions.add_argument(
 cache_actions.add_argument(
     "-R", "--remove", dest="remove_cache", action="store_true", help="forcibly remove caches"
 )
+cache_actions.add_argument(
+    "--export",
+    dest="export_cache",
+    metavar="BUNDLE",
+    help="export caches to a bundle",
+    docs="""
+        Export the portable caches for the target repo to a gzipped tarball.
+
+        Cache files are stored by repo identifier and git commit instead of
+        the repo's location, allowing them to be imported for checkouts at
+        different paths, e.g. to restore prebuilt caches in CI containers.
+        Caches depending on file locations or mtimes such as the eclass and
+        profiles caches are skipped.
+    """,
+)
+cache_actions.add_argument(
+    "--import",
+    dest="import_cache",
+    metavar="BUNDLE",
+    help="import caches from a bundle",
+    docs="""
+        Import caches for the target repo from a bundle created via
+        ``--export``.
+
+        Caches for repos with a different identifier or for git commits that
+        don't exist in the target repo's history are skipped. Bundles
+        containing unexpected data types are rejected, but they should still
+        only be imported from trusted sources.
+    """,
+)
 cache.add_argument(
     "-f", "--force", dest="force_cache", action="store_true", help="forcibly update/remove caches"
 )
@@ -76,6 +106,12 @@ def _cache(options, out: snakeoil.formatters.PlainTextFormatter, _err):
     elif options.update_cache:
         for addon_cls in options.pop("cache_addons"):
             init_addon(addon_cls, options)
+    elif options.export_cache:
+        cache_obj = CachedAddon(options)
+        cache_obj.export_caches(options.export_cache)
+    elif options.import_cache:
+        cache_obj = CachedAddon(options)
+        cache_obj.import_caches(options.import_cache)
     else:
         # list existing caches
         cache_obj = CachedAddon(options)
@@ -49,6 +49,20 @@ class EmptySource(Source):
         self.scope = scope
 
 
+class PartitionSource(Source):
+    """Source for a partition of the items pulled from another source."""
+
+    def __init__(self, source, items):
+        super().__init__(source.options, items)
+        self.scope = source.scope
+
+    @classmethod
+    def split(cls, source, restrict, count):
+        """Split items matching a restriction into at most count interleaved partitions."""
+        items = tuple(source.itermatch(restrict))
+        return [cls(source, items[i::count]) for i in range(min(count, len(items)))]
+
+
 class RepoSource(Source):
     """Base template for a repository source."""
 
@@ -366,6 +380,87 @@ class PackageRepoSource(_CombinedSource):
     keyfunc = attrgetter("key")
 
 
+class PkgDirEntry(typing.NamedTuple):
+    """Package directory entry snapshot."""
+
+    name: str
+    path: str
+    is_dir: bool
+    mode: int
+    size: int
+    # leading data block, only read for ebuilds
+    head: bytes | None = None
+
+
+class PkgDir:
+    """Snapshot of a package directory's contents.
+
+    All entries are collected in a single os.scandir() pass, including the
+    recursive contents of the files directory, so checks can use entry types,
+    sizes, and modes without further syscalls. Top-level entries are stat-ed
+    following symlinks while nested FILESDIR entries are not.
+
+    VCS directories and subdirectories matched by the optional ``gitignored``
+    callable are listed in their parent directory but never descended into.
+    """
+
+    __slots__ = ("path", "entries", "dirs")
+
+    # amount of data read from the start of each ebuild
+    blocksize = 8192
+    # FILESDIR subdirectories that are never scanned
+    ignore_dirs = frozenset(["cvs", ".svn", ".bzr"])
+
+    def __init__(self, path, gitignored=None):
+        self.path = path
+        self.entries = self._scan(path, follow_symlinks=True)
+        # mapping of relative subdirectory paths to their entries
+        self.dirs = {}
+        dirs = [x for x in self.entries if x.is_dir and x.name == "files"]
+        while dirs:
+            entry = dirs.pop()
+            entries = self._scan(entry.path, follow_symlinks=False)
+            self.dirs[entry.path[len(path) + 1 :]] = entries
+            dirs.extend(
+                x
+                for x in entries
+                if x.is_dir
+                and x.name not in self.ignore_dirs
+                and not (gitignored is not None and gitignored(x.path, directory=True))
+            )
+
+    def _scan(self, path, follow_symlinks):
+        entries = []
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    st = entry.stat(follow_symlinks=follow_symlinks)
+                except FileNotFoundError:
+                    # broken symlink
+                    st = entry.stat(follow_symlinks=False)
+                is_dir = entry.is_dir(follow_symlinks=follow_symlinks)
+                head = None
+                if entry.name.endswith(".ebuild") and not is_dir:
+                    try:
+                        with open(entry.path, "rb") as f:
+                            head = f.read(self.blocksize)
+                    except OSError:
+                        pass
+                entries.append(
+                    PkgDirEntry(entry.name, entry.path, is_dir, st.st_mode, st.st_size, head)
+                )
+        return tuple(entries)
+
+
+class PkgDirPkgs(list):
+    """List of package versions with a snapshot of their package directory."""
+
+    def __init__(self, pkgs, repo, gitignored=None):
+        super().__init__(pkgs)
+        pkg = self[0]
+        self.pkgdir = PkgDir(pjoin(repo.location, pkg.category, pkg.package), gitignored)
+
+
 class CategoryRepoSource(_CombinedSource):
     """Ebuild repository source yielding lists of versioned packages per category."""
 
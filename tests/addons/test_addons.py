@@ -1,4 +1,5 @@
 import os
+import re
 from os.path import join as pjoin
 from unittest.mock import patch
 
@@ -403,3 +404,72 @@ class TestNetAddon:
         with patch("pkgcheck.addons.net.Session") as net:
             addon.session
         net.assert_called_once_with(concurrent=50, timeout=10, user_agent="firefox")
+
+
+class TestLineScanAddon:
+    @pytest.fixture(autouse=True)
+    def _setup(self):
+        self.scanner = addons.LineScanAddon(None)
+
+    def mk_pkg(self, *lines):
+        return FakePkg("cat/pkg-1", lines=lines)
+
+    def test_no_patterns(self):
+        pkg = self.mk_pkg("foo\n")
+        assert self.scanner.lines(pkg, re.compile("foo")) == ()
+
+    def test_lines(self):
+        foo = self.scanner.register("foo")
+        bar = self.scanner.register(r"^\s*bar")
+        baz = self.scanner.register(r"^baz$")
+        pkg = self.mk_pkg("foo bar\n", "\n", "  bar foo\n", "bar\n", "baz\n", "xbaz\n")
+        assert self.scanner.lines(pkg, foo) == [1, 3]
+        assert self.scanner.lines(pkg, bar) == [3, 4]
+        assert self.scanner.lines(pkg, baz) == [5]
+
+    def test_registration(self):
+        # registering the same pattern returns an equivalent regex
+        foo = self.scanner.register("foo")
+        assert self.scanner.register("foo") == foo
+
+        # registering new patterns forces rescans
+        pkg = self.mk_pkg("foo\n", "bar\n")
+        assert self.scanner.lines(pkg, foo) == [1]
+        bar = self.scanner.register("bar")
+        assert self.scanner.lines(pkg, bar) == [2]
+
+    def test_cached_scans(self):
+        foo = self.scanner.register("foo")
+        bar = self.scanner.register("^bar")
+        pkg = self.mk_pkg("foo\n", "bar\n")
+        with patch.object(self.scanner, "_scan", wraps=self.scanner._scan) as scan:
+            assert self.scanner.lines(pkg, foo) == [1]
+            assert self.scanner.lines(pkg, bar) == [2]
+            assert scan.call_count == 1
+            # new items are rescanned
+            pkg = self.mk_pkg("bar\n", "foo\n")
+            assert self.scanner.lines(pkg, foo) == [2]
+            assert scan.call_count == 2
+
+    def test_multiline_matches(self):
+        # scan matches spanning lines only select candidate lines
+        regex = self.scanner.register(r"^\s*dodir\s+\S+")
+        pkg = self.mk_pkg("\n", "\n", "  dodir\n", "dodir /foo\n")
+        assert self.scanner.lines(pkg, regex) == [4]
+
+    def test_missing_newlines(self):
+        regex = self.scanner.register(r"^foo")
+        pkg = self.mk_pkg("bar", "foo", "barfoo", "foo")
+        assert self.scanner.lines(pkg, regex) == [2, 4]
+
+    def test_capturing_groups(self):
+        # anchored patterns with conflicting group names or backreferences
+        foo = self.scanner.register(r"^(?P<word>foo)")
+        bar = self.scanner.register(r"^\s*(?P<word>bar)")
+        double = self.scanner.register(r"^(\w)\1")
+        baz = self.scanner.register(r"^baz")
+        pkg = self.mk_pkg("foo\n", "  bar\n", "aab\n", "baz\n", "abab\n")
+        assert self.scanner.lines(pkg, foo) == [1]
+        assert self.scanner.lines(pkg, bar) == [2]
+        assert self.scanner.lines(pkg, double) == [3]
+        assert self.scanner.lines(pkg, baz) == [4]
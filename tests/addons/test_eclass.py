@@ -1,5 +1,6 @@
 import os
 import textwrap
+import threading
 from os.path import join as pjoin
 from time import sleep
 from unittest.mock import patch
@@ -9,7 +10,7 @@ from snakeoil.fileutils import touch
 
 from pkgcheck.addons import init_addon
 from pkgcheck.addons.caches import CacheDisabled
-from pkgcheck.addons.eclass import Eclass, EclassAddon
+from pkgcheck.addons.eclass import Eclass, EclassAddon, EclassInheritAddon
 from pkgcheck.base import PkgcheckUserException
 
 
@@ -139,6 +140,52 @@ class TestEclassAddon:
             with patch("pkgcheck.addons.caches.CachedAddon.save_cache") as save_cache:
                 self.addon.update_cache()
                 save_cache.assert_called_once()
+            # without removing the existing cache file
+            assert os.path.exists(self.cache_file)
+
+    def test_atomic_cache_save(self):
+        touch(pjoin(self.eclass_dir, "foo.eclass"))
+        self.addon.update_cache(force=True)
+        # temporary files are renamed into place
+        cache_dir = os.path.dirname(self.cache_file)
+        assert sorted(os.listdir(cache_dir)) == ["eclass.pickle", "eclass.pickle.lock"]
+
+    def test_cache_locking(self):
+        touch(pjoin(self.eclass_dir, "foo.eclass"))
+        self.addon.update_cache()
+        caches = []
+        thread = threading.Thread(
+            target=lambda: caches.append(self.addon.load_cache(self.cache_file))
+        )
+
+        # loading a cache waits for a concurrent writer to finish
+        with self.addon._lock_cache(self.cache_file, exclusive=True):
+            thread.start()
+            thread.join(0.5)
+            assert thread.is_alive()
+            assert not caches
+        thread.join()
+        assert list(caches[0]) == ["foo"]
+
+    def test_cache_lock_removal(self):
+        touch(pjoin(self.eclass_dir, "foo.eclass"))
+        self.addon.update_cache()
+        lock_file = f"{self.cache_file}.lock"
+        locked = []
+
+        def lock():
+            with self.addon._lock_cache(self.cache_file, exclusive=True):
+                locked.append(os.path.exists(lock_file))
+
+        # lockers waiting on a lock file removed by its holder use a new one
+        thread = threading.Thread(target=lock)
+        with self.addon._lock_cache(self.cache_file, exclusive=True):
+            thread.start()
+            thread.join(0.5)
+            assert thread.is_alive()
+            os.unlink(lock_file)
+        thread.join()
+        assert locked == [True]
 
     def test_error_dumping_cache(self):
         touch(pjoin(self.eclass_dir, "foo.eclass"))
@@ -175,3 +222,80 @@ class TestEclassAddon:
         self.addon.update_cache()
         assert list(self.addon.eclasses) == ["foo"]
         assert self.addon.deprecated == {"foo": "foo2"}
+
+
+class TestEclassInheritAddon:
+    @pytest.fixture(autouse=True)
+    def _setup(self, tool, tmp_path, repo):
+        self.repo = repo
+        self.md5_cache = pjoin(repo.location, "metadata", "md5-cache")
+
+        args = ["scan", "--cache-dir", str(tmp_path), "--repo", repo.location]
+        options, _ = tool.parse_args(args)
+        self.addon = EclassInheritAddon(options)
+        self.cache_file = self.addon.cache_file(self.repo)
+
+    def write_entry(self, cpvstr, *eclasses):
+        path = pjoin(self.md5_cache, cpvstr)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = "\t".join(f"{x}\t{'0' * 32}" for x in eclasses)
+        with open(path, "w") as f:
+            f.write(f"EAPI=8\n_eclasses_={data}\n_md5_={'0' * 32}\n")
+        return path
+
+    def test_no_md5_cache(self):
+        self.addon.update_cache()
+        assert not os.path.exists(self.cache_file)
+        assert not self.addon.inheritors(["foo"])
+
+    def test_inheritors(self):
+        self.write_entry("cat/pkg-1", "foo", "bar")
+        self.write_entry("cat/pkg-2", "bar")
+        self.write_entry("cat/other-1")
+        self.write_entry("dev-util/pkg-1", "foo")
+        # invalid entries are ignored
+        self.write_entry("cat/-1", "foo")
+        self.addon.update_cache()
+        assert self.addon.inheritors(["foo"]) == {"cat/pkg", "dev-util/pkg"}
+        assert self.addon.inheritors(["bar"]) == {"cat/pkg"}
+        assert self.addon.inheritors(["bar", "foo"]) == {"cat/pkg", "dev-util/pkg"}
+        assert not self.addon.inheritors(["baz"])
+
+    def test_cache_load(self):
+        self.write_entry("cat/pkg-1", "foo")
+        self.addon.update_cache()
+        assert self.addon.inheritors(["foo"]) == {"cat/pkg"}
+
+        with patch("pkgcheck.addons.caches.CachedAddon.save_cache") as save_cache:
+            self.addon.update_cache()
+            # verify the cache was loaded and not regenerated
+            save_cache.assert_not_called()
+            self.addon.update_cache(force=True)
+            # and is regenerated on a forced cache update
+            save_cache.assert_called_once()
+
+    def test_entry_changes(self):
+        path = self.write_entry("cat/pkg-1", "foo")
+        self.write_entry("cat/pkg-2", "foo")
+        self.addon.update_cache()
+        assert self.addon.inheritors(["foo"]) == {"cat/pkg"}
+
+        # only changed entries are reparsed
+        self.write_entry("cat/pkg-1", "bar")
+        os.utime(path, ns=(0, 0))
+        with patch.object(
+            EclassInheritAddon, "_read_metadata", wraps=self.addon._read_metadata
+        ) as read_metadata:
+            self.addon.update_cache()
+            read_metadata.assert_called_once_with(path)
+        assert self.addon.inheritors(["foo"]) == {"cat/pkg"}
+        assert self.addon.inheritors(["bar"]) == {"cat/pkg"}
+
+    def test_entry_removal(self):
+        self.write_entry("cat/pkg-1", "foo")
+        self.write_entry("dev-util/pkg-1", "foo")
+        self.addon.update_cache()
+        assert self.addon.inheritors(["foo"]) == {"cat/pkg", "dev-util/pkg"}
+        os.unlink(pjoin(self.md5_cache, "dev-util", "pkg-1"))
+        self.addon.update_cache()
+        assert self.addon.inheritors(["foo"]) == {"cat/pkg"}
@@ -1,10 +1,13 @@
 import os
+import pickle
+import sqlite3
 import subprocess
 from functools import partial
 from os.path import join as pjoin
 from unittest.mock import Mock, patch
 
 import pytest
+from pathspec import PathSpec
 from pkgcore.ebuild.atom import MalformedAtom
 from pkgcore.ebuild.atom import atom as atom_cls
 from pkgcore.restrictions import packages
@@ -13,9 +16,10 @@ from snakeoil.contexts import os_environ
 from snakeoil.fileutils import touch
 from snakeoil.process import CommandNotFound, find_binary
 
-from pkgcheck import base
+from pkgcheck import base, objects
 from pkgcheck.addons import git, init_addon
 from pkgcheck.addons.caches import CacheDisabled
+from pkgcheck.addons.eclass import EclassAddon
 from pkgcheck.base import PkgcheckUserException
 
 # skip testing module if git isn't installed
@@ -135,6 +139,164 @@ class TestPkgcheckScanCommitsParseArgs:
         assert restrictions[1][0] == base.eclass_scope
         assert restrictions[1][1] == frozenset(["foo"])
 
+    def test_expand_eclasses(self, make_repo, make_git_repo, tmp_path):
+        # create parent repo
+        parent = make_repo()
+        origin = make_git_repo(parent.location, commit=True)
+        parent.create_ebuild("cat/pkg-0")
+        origin.add_all("cat/pkg-0")
+
+        # create child repo and pull from parent
+        (local_path := tmp_path / "local").mkdir()
+        local = make_git_repo(str(local_path), commit=False)
+        local.run(["git", "remote", "add", "origin", origin.path])
+        local.run(["git", "pull", "origin", "main"])
+        local.run(["git", "remote", "set-head", "origin", "main"])
+        child = make_repo(local.path)
+
+        # generate md5-cache entries for packages inheriting eclasses
+        for cpvstr, eclasses in (
+            ("cat/pkg-0", "bar\t0"),
+            ("cat/pkg-1", "foo\t0\tbar\t1"),
+            ("other/pkg-0", "foo\t0"),
+            ("other/nonfoo-0", "baz\t0"),
+        ):
+            path = pjoin(local.path, "metadata", "md5-cache", cpvstr)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(f"EAPI=7\n_eclasses_={eclasses}\n")
+
+        # create local commits on child repo
+        child.create_ebuild("cat/newpkg-1")
+        local.add_all("cat/newpkg-1")
+        os.makedirs(pjoin(local.path, "eclass"))
+        with open(pjoin(local.path, "eclass", "foo.eclass"), "w") as f:
+            f.write("data\n")
+        local.add_all("foo.eclass")
+
+        args = self.args + ["-r", local.path, "--cache-dir", str(tmp_path / "cache")]
+        options, _func = self.tool.parse_args(args + ["--commits", "--expand-eclasses"])
+        atom_restricts = [atom_cls("cat/newpkg"), atom_cls("cat/pkg"), atom_cls("other/pkg")]
+        assert list(options.restrictions) == [
+            (base.package_scope, packages.OrRestriction(*atom_restricts)),
+            (base.eclass_scope, frozenset(["foo"])),
+        ]
+
+        # changed eclasses aren't expanded by default
+        options, _func = self.tool.parse_args(args + ["--commits"])
+        assert list(options.restrictions)[0] == (
+            base.package_scope,
+            packages.OrRestriction(atom_cls("cat/newpkg")),
+        )
+
+        # targets limited to specific checks are kept separate
+        revdeps = (base.package_scope, packages.OrRestriction(atom_cls("=cat/dep-1")), {"check"})
+        options.restrictions = [*options.restrictions, revdeps]
+        git._ExpandEclasses([], "expand_eclasses")(self.tool, options, [], "--expand-eclasses")
+        assert list(options.restrictions) == [
+            (base.package_scope, packages.OrRestriction(*atom_restricts)),
+            (base.eclass_scope, frozenset(["foo"])),
+            revdeps,
+        ]
+
+    def test_expand_eclasses_without_git_targets(self, capsys):
+        with pytest.raises(SystemExit) as excinfo:
+            self.tool.parse_args(self.args + ["--expand-eclasses"])
+        assert excinfo.value.code == 2
+        out, err = capsys.readouterr()
+        assert err.strip().endswith("--expand-eclasses requires --commits or --staged")
+
+    def test_commits_revdeps(self, make_repo, make_git_repo, tmp_path):
+        # create parent repo
+        parent = make_repo()
+        origin = make_git_repo(parent.location, commit=True)
+        parent.create_ebuild("cat/pkg-0")
+        parent.create_ebuild("cat/dep-0", rdepend="cat/pkg")
+        origin.add_all("initial")
+
+        # create child repo and pull from parent
+        (local_path := tmp_path / "local").mkdir()
+        local = make_git_repo(str(local_path), commit=False)
+        local.run(["git", "remote", "add", "origin", origin.path])
+        local.run(["git", "pull", "origin", "main"])
+        local.run(["git", "remote", "set-head", "origin", "main"])
+        child = make_repo(local.path)
+
+        # generate untracked md5-cache entries for reverse dependencies
+        with open(pjoin(local.path, ".git", "info", "exclude"), "a") as f:
+            f.write("/metadata/md5-cache\n")
+        for cpvstr, rdepend in (
+            ("cat/pkg-1", "cat/pkg"),
+            ("cat/dep-0", "cat/pkg"),
+            ("cat/dep-1", ">=cat/pkg-1"),
+            ("cat/other-0", "cat/dep"),
+        ):
+            path = pjoin(local.path, "metadata", "md5-cache", cpvstr)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(f"EAPI=7\nRDEPEND={rdepend}\n")
+
+        args = self.args + ["-r", local.path, "--cache-dir", str(tmp_path / "cache")]
+        pkg_restrict = (base.package_scope, packages.OrRestriction(atom_cls("cat/pkg")))
+        revdeps = [atom_cls("=cat/dep-0"), atom_cls("=cat/dep-1")]
+        revdeps_restrict = (
+            base.package_scope,
+            packages.OrRestriction(*revdeps),
+            frozenset([objects.CHECKS["VisibilityCheck"]]),
+        )
+
+        # version bumps and changes not affecting revdeps don't pull them in
+        child.create_ebuild("cat/pkg-1")
+        local.add_all("cat/pkg-1")
+        child.create_ebuild("cat/pkg-0", description="changed description")
+        local.add_all("cat/pkg-0: update description")
+        options, _func = self.tool.parse_args(args + ["--commits"])
+        assert list(options.restrictions) == [pkg_restrict]
+
+        # SLOT changes do
+        child.create_ebuild("cat/pkg-0", slot="1")
+        local.add_all("cat/pkg-0: change slot")
+        options, _func = self.tool.parse_args(args + ["--commits"])
+        assert list(options.restrictions) == [pkg_restrict, revdeps_restrict]
+
+        # reverse dependencies aren't scanned when their cache is disabled
+        options, _func = self.tool.parse_args(args + ["--commits", "--cache=-revdeps"])
+        assert list(options.restrictions) == [pkg_restrict]
+
+        # IUSE changes in staged ebuilds pull in revdeps
+        local.run(["git", "reset", "--hard", "origin/main"])
+        child.create_ebuild("cat/pkg-0", iuse="foo")
+        local.run(["git", "add", "cat/pkg"])
+        options, _func = self.tool.parse_args(args + ["--staged"])
+        assert list(options.restrictions) == [pkg_restrict, revdeps_restrict]
+
+        # as do KEYWORDS changes
+        local.run(["git", "reset", "--hard", "origin/main"])
+        child.create_ebuild("cat/pkg-0", keywords=["~amd64"])
+        local.run(["git", "add", "cat/pkg"])
+        options, _func = self.tool.parse_args(args + ["--staged"])
+        assert list(options.restrictions) == [pkg_restrict, revdeps_restrict]
+
+        # and dependency changes, including intermediate variables
+        local.run(["git", "reset", "--hard", "origin/main"])
+        child.create_ebuild("cat/pkg-0", data='COMMON_DEPEND="cat/dep"\nRDEPEND="${COMMON_DEPEND}"')
+        local.add_all("cat/pkg-0: add deps")
+        options, _func = self.tool.parse_args(args + ["--commits"])
+        assert list(options.restrictions) == [pkg_restrict, revdeps_restrict]
+
+        # as do removals
+        local.run(["git", "reset", "--hard", "origin/main"])
+        local.run(["git", "rm", "cat/pkg/pkg-0.ebuild"])
+        local.run(["git", "commit", "-m", "cat/pkg: drop 0"])
+        options, _func = self.tool.parse_args(args + ["--commits"])
+        assert list(options.restrictions) == [pkg_restrict, revdeps_restrict]
+
+        # and renames, detected as such
+        local.run(["git", "reset", "--hard", "origin/main"])
+        local.move("cat/pkg/pkg-0.ebuild", "cat/pkg/pkg-0-r1.ebuild")
+        options, _func = self.tool.parse_args(args + ["--commits"])
+        assert list(options.restrictions) == [pkg_restrict, revdeps_restrict]
+
     def test_commits_profiles(self, make_repo, make_git_repo, tmp_path):
         # create parent repo
         parent = make_repo()
@@ -233,6 +395,166 @@ class TestGitStash:
                 touch(path)
 
 
+class TestGitStagedTree:
+    def test_non_git_repo(self, tmp_path):
+        with pytest.raises(ValueError, match="not a git repo"), git.GitStagedTree(str(tmp_path)):
+            pass
+
+    def test_empty_git_repo(self, make_git_repo):
+        git_repo = make_git_repo()
+        with git.GitStagedTree(git_repo.path) as tree:
+            assert os.listdir(tree.location) == [".git"]
+        assert not os.path.exists(tree.location)
+
+    def test_staged_content(self, make_git_repo):
+        git_repo = make_git_repo()
+        with open(pjoin(git_repo.path, ".gitignore"), "w") as f:
+            f.write("/cache\n")
+        for name in ("modified", "deleted", "staged", "unchanged"):
+            with open(pjoin(git_repo.path, name), "w") as f:
+                f.write("old\n")
+        git_repo.add_all("initial")
+        os.utime(pjoin(git_repo.path, "unchanged"), (0, 0))
+
+        # staged changes
+        with open(pjoin(git_repo.path, "staged"), "w") as f:
+            f.write("new\n")
+        git_repo.run(["git", "add", "staged"])
+        # unstaged changes
+        with open(pjoin(git_repo.path, "modified"), "w") as f:
+            f.write("new\n")
+        os.unlink(pjoin(git_repo.path, "deleted"))
+        os.makedirs(pjoin(git_repo.path, "dir"))
+        touch(pjoin(git_repo.path, "dir", "untracked"))
+        # ignored files
+        os.makedirs(pjoin(git_repo.path, "cache"))
+        touch(pjoin(git_repo.path, "cache", "data"))
+
+        def content(*path):
+            with open(pjoin(*path)) as f:
+                return f.read()
+
+        worktree = {x: os.stat(pjoin(git_repo.path, x)) for x in ("modified", "staged")}
+        with git.GitStagedTree(git_repo.path) as tree:
+            assert content(tree.location, "modified") == "old\n"
+            assert content(tree.location, "deleted") == "old\n"
+            assert content(tree.location, "staged") == "new\n"
+            assert not os.path.exists(pjoin(tree.location, "dir"))
+            assert os.path.exists(pjoin(tree.location, "cache", "data"))
+            # unchanged files keep their mtimes
+            assert os.stat(pjoin(tree.location, "unchanged")).st_mtime == 0
+            # the working tree is left alone
+            assert content(git_repo.path, "modified") == "new\n"
+            assert not os.path.exists(pjoin(git_repo.path, "deleted"))
+            for name, st in worktree.items():
+                assert os.stat(pjoin(git_repo.path, name)).st_mtime_ns == st.st_mtime_ns
+            # git commands work within the checkout
+            head = partial(subprocess.check_output, ["git", "rev-parse", "HEAD"])
+            assert head(cwd=tree.location) == head(cwd=git_repo.path)
+        assert not os.path.exists(tree.location)
+        assert sorted(git_repo.changes) == ["deleted", "dir/untracked", "modified"]
+
+    def test_subdir_repo(self, make_git_repo):
+        git_repo = make_git_repo()
+        os.makedirs(pjoin(git_repo.path, "repo"))
+        for path in ("file", "repo/file"):
+            with open(pjoin(git_repo.path, path), "w") as f:
+                f.write("data\n")
+        git_repo.add_all("initial")
+
+        with git.GitStagedTree(pjoin(git_repo.path, "repo")) as tree:
+            assert tree.location.endswith("/repo")
+            assert os.listdir(tree.location) == ["file"]
+            # files outside the repo aren't checked out
+            assert not os.path.exists(pjoin(tree.location, "..", "file"))
+
+    def test_interrupted_checkout(self, make_git_repo):
+        git_repo = make_git_repo()
+        touch(pjoin(git_repo.path, "file"))
+        git_repo.add_all("initial")
+
+        # checkouts left behind by killed scans are replaced
+        tree = git.GitStagedTree(git_repo.path).__enter__()
+        touch(pjoin(tree.location, "stale"))
+        os.close(tree._lock)
+        with git.GitStagedTree(git_repo.path) as tree:
+            assert sorted(os.listdir(tree.location)) == [".git", "file"]
+
+    def test_failed_checkout(self, git_repo):
+        with patch("pkgcheck.addons.git.os.symlink", side_effect=OSError("failed")):
+            touch(pjoin(git_repo.path, ".gitignore"))
+            with open(pjoin(git_repo.path, ".gitignore"), "w") as f:
+                f.write("ignored\n")
+            touch(pjoin(git_repo.path, "ignored"))
+            with pytest.raises(PkgcheckUserException, match="git failed checking out staged files"):
+                with git.GitStagedTree(git_repo.path):
+                    pass
+        assert not os.path.exists(pjoin(git_repo.path, ".git", "pkgcheck-staged"))
+
+
+class TestGitIgnore:
+    paths = (
+        "foo",
+        "foo/bar",
+        "bar/foo",
+        "bar/foo/baz",
+        "a/b",
+        "a/b/c",
+        "a/x/c",
+        "x/a/b",
+        "files/a.ext",
+        "a.ext/files",
+        "pkg.tar.gz",
+        "dir/.foo.swp",
+        "backup~",
+        "#x",
+        "a b/c",
+    )
+
+    @pytest.mark.parametrize(
+        "patterns",
+        (
+            ["foo", "*.ext", "/a/b"],
+            ["foo/", "*.ext/", "a/b/"],
+            ["/foo", "**/bar", "*.tar.gz", "\\#x", "a\\ b"],
+            ["a/**/c", ".*.swp", "*~", "foo/**"],
+            ["/*.ext", "a*b", "b/c", "*"],
+            ["foo", "!foo/bar", "*.ext", "!files/"],
+        ),
+    )
+    def test_match(self, patterns):
+        """Matches are identical to pathspec's for both files and directories."""
+        spec = PathSpec.from_lines("gitignore", patterns)
+        gitignore = git.GitIgnore(patterns)
+        for path in self.paths:
+            assert gitignore.match(path) == spec.match_file(path), path
+            assert gitignore.match(path, directory=True) == spec.match_file(f"{path}/"), path
+        assert not gitignore.match("")
+
+    def test_set_lookups(self):
+        gitignore = git.GitIgnore(["foo", "bar/", "/a/b", "*.ext", "*.d/", "a/**/c"])
+        with patch.object(gitignore, "_regex") as regex:
+            regex.match.return_value = None
+            assert gitignore.match("foo")
+            assert gitignore.match("bar", directory=True)
+            assert gitignore.match("y.ext")
+            assert gitignore.match("x.d", directory=True)
+            regex.match.assert_not_called()
+            # the regex is only used for unmatched paths and parent dirs
+            assert gitignore.match("a/b")
+            assert not gitignore.match("z/y")
+            assert regex.match.call_args_list == [(("a/",),), (("z/",),), (("z/y",),)]
+
+    def test_dir_caching(self):
+        gitignore = git.GitIgnore(["foo/", "a/**/c"])
+        assert gitignore.match("x/foo/y")
+        with patch.object(gitignore, "_match") as match:
+            # paths under previously matched directories don't require matching
+            assert gitignore.match("x/foo/y/z", directory=True)
+            assert gitignore.match("x/foo/z")
+            match.assert_not_called()
+
+
 class TestGitRepoCommits:
     def test_non_git(self, tmp_path):
         with pytest.raises(git.GitError, match="failed running git log"):
@@ -370,6 +692,39 @@ class TestGitRepoPkgs:
             assert len(pkgs) == 0
 
 
+class TestGitCatFile:
+    def test_non_git(self, tmp_path):
+        cat_file = git.GitCatFile(str(tmp_path))
+        with pytest.raises(git.GitError):
+            cat_file.ls_tree("HEAD")
+        with pytest.raises(git.GitError, match="failed reading git object"):
+            cat_file.read("HEAD:file")
+        cat_file.close()
+
+    def test_reading(self, make_git_repo):
+        git_repo = make_git_repo()
+        with open(pjoin(git_repo.path, "file"), "w") as f:
+            f.write("old\n")
+        os.makedirs(pjoin(git_repo.path, "dir"))
+        with open(pjoin(git_repo.path, "dir", "file"), "w") as f:
+            f.write("data\n")
+        git_repo.add_all("initial")
+        with open(pjoin(git_repo.path, "file"), "w") as f:
+            f.write("new\n")
+        git_repo.add_all("update")
+
+        cat_file = git.GitCatFile(git_repo.path)
+        files = cat_file.ls_tree("HEAD~1")
+        assert sorted(files) == ["dir/file", "file"]
+        assert list(cat_file.ls_tree("HEAD", ["dir"])) == ["dir/file"]
+        mode, blob = files["file"]
+        assert mode == "100644"
+        assert cat_file.read(blob) == b"old\n"
+        assert cat_file.read("HEAD:file") == b"new\n"
+        assert cat_file.read("HEAD:nonexistent") is None
+        cat_file.close()
+
+
 class TestGitChangedRepo:
     def test_pkg_history(self, repo, make_git_repo):
         git_repo = make_git_repo(repo.location, commit=True)
@@ -478,6 +833,15 @@ class TestGitAddon:
             with pytest.raises(CacheDisabled, match="git cache support required"):
                 git.GitAddon(options)
 
+    def test_staged_cache_file(self, tmp_path):
+        staged = Mock(location=str(tmp_path / "staged"), repo_id=self.repo.repo_id)
+        assert self.addon.cache_file(staged) != self.cache_file
+        # staged checkouts share portable caches with their source repo
+        self.addon.options.staged_sources = {staged.location: self.repo.location}
+        assert self.addon.cache_file(staged) == self.cache_file
+        eclass_addon = EclassAddon(self.addon.options)
+        assert eclass_addon.cache_file(staged) != eclass_addon.cache_file(self.repo)
+
     def test_no_gitignore(self):
         assert self.addon._gitignore is None
         assert not self.addon.gitignored("")
@@ -500,6 +864,15 @@ class TestGitAddon:
             assert not self.addon.gitignored("foo.swp")
             assert not self.addon.gitignored(pjoin(self.repo.location, "foo.swp"))
 
+    def test_gitignore_dirs(self):
+        with open(pjoin(self.repo.location, ".gitignore"), "w") as f:
+            f.write("/build/\n")
+        # directory-only patterns only match directories themselves when requested
+        assert not self.addon.gitignored("build")
+        assert self.addon.gitignored("build", directory=True)
+        assert self.addon.gitignored(pjoin(self.repo.location, "build", "foo"))
+        assert not self.addon.gitignored("cat/build", directory=True)
+
     def test_cache_disabled(self, tool):
         args = ["scan", "--cache", "no", "--repo", self.repo.location]
         options, _ = tool.parse_args(args)
@@ -517,14 +890,22 @@ class TestGitAddon:
         assert not os.path.exists(self.cache_file)
 
     def test_git_repo_no_pkg_commits(self, make_git_repo):
-        """Cache file isn't updated if no relevant commits exist."""
+        """Cache file is created without history if no relevant commits exist."""
         parent_repo = make_git_repo(commit=True)
         child_repo = make_git_repo(self.repo.location, commit=False)
         child_repo.run(["git", "remote", "add", "origin", parent_repo.path])
         child_repo.run(["git", "pull", "origin", "main"])
         child_repo.run(["git", "remote", "set-head", "origin", "main"])
         self.addon.update_cache()
-        assert not os.path.exists(self.cache_file)
+        assert os.path.exists(self.cache_file)
+        history = self.addon._cached_repos[self.repo.location]
+        assert history.commit.startswith(parent_repo.HEAD)
+        assert not list(history)
+
+        # the empty cache is loaded instead of rescanning the repo's history
+        with patch("pkgcheck.addons.git.GitAddon.save_cache") as save_cache:
+            self.addon.update_cache()
+            save_cache.assert_not_called()
 
     def test_cache_creation_and_load(self, repo, make_git_repo):
         parent_repo = make_git_repo(repo.location, commit=True)
@@ -539,7 +920,7 @@ class TestGitAddon:
         self.addon.update_cache()
         assert atom_cls("=cat/pkg-0") in self.addon.cached_repo(git.GitAddedRepo)
 
-        with patch("pkgcheck.addons.caches.CachedAddon.save_cache") as save_cache:
+        with patch("pkgcheck.addons.git.GitAddon.save_cache") as save_cache:
             # verify the cache was loaded and not regenerated
             self.addon.update_cache()
             save_cache.assert_not_called()
@@ -558,6 +939,30 @@ class TestGitAddon:
         self.addon.update_cache()
         assert atom_cls("=cat/pkg-1") in self.addon.cached_repo(git.GitAddedRepo)
 
+    def test_cache_history(self, repo, make_git_repo):
+        parent_repo = make_git_repo(repo.location, commit=True)
+        repo.create_ebuild("cat/pkg-0")
+        parent_repo.add_all("cat/pkg-0")
+        repo.create_ebuild("cat/pkg-1")
+        parent_repo.add_all("cat/pkg-1")
+        os.unlink(pjoin(repo.location, "cat/pkg/pkg-0.ebuild"))
+        parent_repo.add_all("cat/pkg: drop 0")
+
+        child_repo = make_git_repo(self.repo.location, commit=False)
+        child_repo.run(["git", "remote", "add", "origin", parent_repo.path])
+        child_repo.run(["git", "pull", "origin", "main"])
+        child_repo.run(["git", "remote", "set-head", "origin", "main"])
+        self.addon.update_cache()
+
+        # the database mirrors the in-memory history layout
+        history = self.addon._cached_repos[self.repo.location]
+        data = git.GitAddon.pkg_history(self.repo, "origin/HEAD")
+        assert list(history) == ["cat"]
+        assert list(history["cat"]) == ["pkg"]
+        assert history["cat"]["pkg"] == data["cat"]["pkg"]
+        assert "nonexistent" not in history
+        assert "nonexistent" not in history["cat"]
+
     def test_outdated_cache(self, repo, make_git_repo):
         parent_repo = make_git_repo(repo.location, commit=True)
         # create a pkg and commit it
@@ -571,13 +976,13 @@ class TestGitAddon:
         self.addon.update_cache()
         assert atom_cls("=cat/pkg-0") in self.addon.cached_repo(git.GitAddedRepo)
 
-        # increment cache version and dump cache
-        cache = self.addon.load_cache(self.cache_file)
-        cache.version += 1
-        self.addon.save_cache(cache, self.cache_file)
+        # increment cache version
+        with sqlite3.connect(self.cache_file) as conn:
+            conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+        conn.close()
 
         # verify cache load causes regen
-        with patch("pkgcheck.addons.caches.CachedAddon.save_cache") as save_cache:
+        with patch("pkgcheck.addons.git.GitAddon.save_cache") as save_cache:
             self.addon.update_cache()
             save_cache.assert_called_once()
 
@@ -610,18 +1015,24 @@ class TestGitAddon:
         self.addon.update_cache()
         assert atom_cls("=cat/pkg-0") in self.addon.cached_repo(git.GitAddedRepo)
 
-        with patch("pkgcheck.addons.caches.pickle.load") as pickle_load:
+        with patch("pkgcheck.addons.git.GitHistory.query") as query:
             # catastrophic errors are raised
-            pickle_load.side_effect = MemoryError("unpickling failed")
-            with pytest.raises(MemoryError, match="unpickling failed"):
+            query.side_effect = MemoryError("loading failed")
+            with pytest.raises(MemoryError, match="loading failed"):
                 self.addon.update_cache()
 
-            # but various load failure exceptions cause cache regen
-            pickle_load.side_effect = Exception("unpickling failed")
-            with patch("pkgcheck.addons.caches.CachedAddon.save_cache") as save_cache:
+            # but database errors cause cache regen
+            query.side_effect = sqlite3.DatabaseError("loading failed")
+            with patch("pkgcheck.addons.git.GitAddon.save_cache") as save_cache:
                 self.addon.update_cache()
                 save_cache.assert_called_once()
 
+        # invalid databases are regenerated
+        with open(self.cache_file, "w") as f:
+            f.write("foo")
+        self.addon.update_cache()
+        assert atom_cls("=cat/pkg-0") in self.addon.cached_repo(git.GitAddedRepo)
+
     def test_error_dumping_cache(self, repo, make_git_repo):
         parent_repo = make_git_repo(repo.location, commit=True)
         # create a pkg and commit it
@@ -634,10 +1045,12 @@ class TestGitAddon:
         child_repo.run(["git", "remote", "set-head", "origin", "main"])
 
         # verify IO related dump failures are raised
-        with patch("pkgcheck.addons.caches.pickle.dump") as pickle_dump:
-            pickle_dump.side_effect = OSError("unpickling failed")
+        with patch("pkgcheck.addons.git.sqlite3.connect") as connect:
+            connect.side_effect = sqlite3.OperationalError("database is locked")
             with pytest.raises(PkgcheckUserException, match="failed dumping git cache"):
                 self.addon.update_cache()
+        # temporary databases are removed on failure
+        assert os.listdir(os.path.dirname(self.cache_file)) == ["git.sqlite.lock"]
 
     def test_commits_repo(self, repo, make_repo, make_git_repo):
         parent_repo = repo
@@ -715,3 +1128,150 @@ class TestGitAddon:
             git_log.side_effect = git.GitError("git parsing failed")
             with pytest.raises(PkgcheckUserException, match="git parsing failed"):
                 self.addon.commits()
+
+
+class TestGitFilesAddon:
+    @pytest.fixture(autouse=True)
+    def _setup(self, tool, tmp_path, repo):
+        self.repo = repo
+        self.cache_dir = str(tmp_path)
+
+        args = ["scan", "--cache-dir", self.cache_dir, "--repo", self.repo.location]
+        options, _ = tool.parse_args(args)
+        self.addon = git.GitFilesAddon(options)
+        self.cache_file = self.addon.cache_file(self.repo)
+
+    def write(self, path, data):
+        with open(pjoin(self.repo.location, path), "wb") as f:
+            f.write(data)
+
+    def test_git_unavailable(self, tool):
+        args = ["scan", "--cache-dir", self.cache_dir, "--repo", self.repo.location]
+        options, _ = tool.parse_args(args)
+        with patch("pkgcheck.addons.git.find_binary") as find_binary:
+            find_binary.side_effect = CommandNotFound("git not found")
+            with pytest.raises(CacheDisabled, match="files cache support required"):
+                git.GitFilesAddon(options)
+
+    def test_non_git_repo(self):
+        self.addon.update_cache()
+        assert self.addon.files is None
+        assert self.addon.blobs("cat/pkg") == {}
+        self.addon.flush()
+        assert not os.path.exists(self.cache_file)
+
+    def test_files(self, make_git_repo):
+        git_repo = make_git_repo(self.repo.location, commit=True)
+        self.write("binary", b"\xd3\x06\xf8\xef")
+        self.write("text", b"text")
+        self.write("modified", b"text")
+        git_repo.add_all("add files")
+        self.write("modified", b"\xd3\x06\xf8\xef")
+        self.write("untracked", b"\xd3\x06\xf8\xef")
+        self.write(".gitignore", b"ignored\n")
+        self.write("ignored", b"\xd3\x06\xf8\xef")
+        self.addon.update_cache()
+
+        # the repo is only listed on demand
+        assert not self.addon._listed
+        files = self.addon.files
+        assert files.keys() >= {"binary", "text", "modified", "untracked", ".gitignore"}
+        assert "ignored" not in files
+        assert files["binary"] is not None
+        assert files["modified"] is None
+        assert files["untracked"] is None
+
+        paths = ["binary", "text", "modified", "untracked"]
+        assert self.addon.binary(paths) == {
+            "binary": True,
+            "text": False,
+            "modified": True,
+            "untracked": True,
+        }
+        # verdicts are only pushed to disk on flush
+        assert not os.path.exists(self.cache_file)
+        self.addon.flush()
+        assert os.path.exists(self.cache_file)
+
+    def test_subdir_repo(self, tool, make_git_repo, make_repo):
+        git_repo = make_git_repo(commit=True)
+        repo = make_repo(pjoin(git_repo.path, "repo"))
+        os.makedirs(pjoin(repo.location, "cat", "pkg"))
+        for path in ("modified", "cat/pkg/modified", "cat/pkg/text"):
+            with open(pjoin(repo.location, path), "w") as f:
+                f.write("text")
+        git_repo.add_all("add files")
+        for path in ("modified", "cat/pkg/modified"):
+            with open(pjoin(repo.location, path), "wb") as f:
+                f.write(b"\xd3\x06\xf8\xef")
+
+        args = ["scan", "--cache-dir", self.cache_dir, "--repo", repo.location]
+        options, _ = tool.parse_args(args)
+        addon = git.GitFilesAddon(options)
+        # modified files within repos nested in git repo subdirs are detected
+        blobs = addon.blobs("cat/pkg")
+        assert blobs.keys() == {"cat/pkg/modified", "cat/pkg/text"}
+        assert blobs["cat/pkg/modified"] is None
+        assert blobs["cat/pkg/text"] is not None
+        assert addon.files["modified"] is None
+        assert addon.binary(["modified", "cat/pkg/text"]) == {
+            "modified": True,
+            "cat/pkg/text": False,
+        }
+
+    def test_blobs(self, make_git_repo):
+        git_repo = make_git_repo(self.repo.location, commit=True)
+        os.makedirs(pjoin(self.repo.location, "cat", "pkg"))
+        self.write("cat/pkg/tracked", b"text")
+        self.write("text", b"text")
+        git_repo.add_all("add files")
+        self.write("cat/pkg/untracked", b"text")
+
+        # only the given directory is listed
+        blobs = self.addon.blobs("cat/pkg")
+        assert blobs.keys() == {"cat/pkg/tracked", "cat/pkg/untracked"}
+        assert blobs["cat/pkg/tracked"] is not None
+        assert blobs["cat/pkg/untracked"] is None
+        assert not self.addon._listed
+
+        # the repo-wide listing is reused when available
+        assert "text" in self.addon.files
+        with patch("pkgcheck.addons.git.subprocess.run") as run:
+            assert self.addon.blobs("cat/pkg") == blobs
+            run.assert_not_called()
+
+    def test_cached_verdicts(self, tool, make_git_repo):
+        git_repo = make_git_repo(self.repo.location, commit=True)
+        self.write("binary", b"\xd3\x06\xf8\xef")
+        git_repo.add_all("add file")
+        self.addon.binary(["binary"])
+        self.addon.flush()
+
+        def new_addon(force=False):
+            args = ["scan", "--cache-dir", self.cache_dir, "--repo", self.repo.location]
+            options, _ = tool.parse_args(args)
+            addon = git.GitFilesAddon(options)
+            addon.update_cache(force=force)
+            return addon
+
+        # verdicts for unmodified tracked files are pulled from the cache
+        with patch("pkgcheck.addons.git.is_binary") as is_binary:
+            addon = new_addon()
+            assert addon.binary(["binary"]) == {"binary": True}
+            is_binary.assert_not_called()
+
+        # changing a file's contents forces it to be rechecked
+        self.write("binary", b"text")
+        git_repo.add_all("modify file")
+        addon = new_addon()
+        assert addon.binary(["binary"]) == {"binary": False}
+        addon.flush()
+        # verdicts for blobs no longer in the repo are dropped
+        with open(self.cache_file, "rb") as f:
+            assert len(pickle.load(f)) == 1
+
+        # forced updates regenerate all verdicts
+        with patch("pkgcheck.addons.git.is_binary", return_value=False) as is_binary:
+            addon = new_addon(force=True)
+            addon.binary(["binary"])
+            assert is_binary.called
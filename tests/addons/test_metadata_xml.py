@@ -0,0 +1,113 @@
+import fcntl
+import os
+from os.path import join as pjoin
+from unittest.mock import patch
+
+import pytest
+from lxml import etree
+from pkgcore import const as pkgcore_const
+
+from pkgcheck.addons import init_addon
+from pkgcheck.addons.caches import CacheDisabled
+from pkgcheck.addons.metadata_xml import XmlValidationAddon
+from pkgcheck.checks.metadata_xml import MetadataXml, parse_metadata_xml
+
+
+class TestXmlValidationAddon:
+    @pytest.fixture(autouse=True)
+    def _setup(self, tool, tmp_path, repo):
+        self.repo = repo
+        args = ["scan", "--cache-dir", str(tmp_path), "--repo", repo.location]
+        self.options, _ = tool.parse_args(args)
+        self.addon = init_addon(XmlValidationAddon, self.options)
+        self.cache_file = self.addon.cache_file(self.repo)
+        xsd = pjoin(pkgcore_const.DATA_PATH, "xml-schema", "metadata.xsd")
+        self.schema = etree.XMLSchema(etree.parse(xsd))
+
+    def write_xml(self, data):
+        path = pjoin(self.repo.location, "cat", "pkg", "metadata.xml")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(data)
+        return parse_metadata_xml(path)
+
+    def test_cache_disabled(self, tool):
+        args = ["scan", "--cache", "no", "--repo", self.repo.location]
+        options, _ = tool.parse_args(args)
+        with pytest.raises(CacheDisabled, match="xml cache support required"):
+            init_addon(XmlValidationAddon, options)
+
+    def test_validate(self):
+        xml = self.write_xml("<pkgmetadata><foo/></pkgmetadata>\n")
+        errors = self.addon.validate(xml, self.schema, b"xsd")
+        assert len(errors) == 1
+        assert "foo" in errors[0]
+
+        # results are pushed to disk
+        assert not os.path.exists(self.cache_file)
+        self.addon.flush()
+        assert os.path.exists(self.cache_file)
+
+        # cached results skip validation for unchanged files and schemas
+        addon = init_addon(XmlValidationAddon, self.options)
+        with patch.object(MetadataXml, "validate") as validate:
+            assert addon.validate(xml, self.schema, b"xsd") == errors
+            validate.assert_not_called()
+            addon.validate(xml, self.schema, b"new-xsd")
+            validate.assert_called_once()
+
+        # modified files are revalidated
+        xml = self.write_xml("<pkgmetadata></pkgmetadata>\n")
+        assert addon.validate(xml, self.schema, b"xsd") == ()
+
+    def test_flush_merge(self):
+        xml = self.write_xml("<pkgmetadata></pkgmetadata>\n")
+        addon = init_addon(XmlValidationAddon, self.options)
+        self.addon.validate(xml, self.schema, b"xsd")
+        self.addon.flush()
+        # entries saved by other processes are kept
+        addon.validate(xml, self.schema, b"new-xsd")
+        with patch.object(addon, "save_cache", wraps=addon.save_cache) as save_cache:
+            addon.flush()
+            addon.flush()
+            save_cache.assert_called_once()
+        assert len(addon.load_cache(self.cache_file)) == 1
+
+    def test_flush_locking(self):
+        xml = self.write_xml("<pkgmetadata></pkgmetadata>\n")
+        self.addon.validate(xml, self.schema, b"xsd")
+        load_cache = self.addon.load_cache
+
+        def _load_cache(*args, **kwargs):
+            # the exclusive lock is held while merging entries
+            with open(f"{self.cache_file}.lock") as f:
+                with pytest.raises(BlockingIOError):
+                    fcntl.flock(f, fcntl.LOCK_SH | fcntl.LOCK_NB)
+            return load_cache(*args, **kwargs)
+
+        with patch.object(self.addon, "load_cache", side_effect=_load_cache) as load:
+            self.addon.flush()
+            load.assert_called_once()
+        assert len(self.addon.load_cache(self.cache_file)) == 1
+
+    def test_prune(self):
+        xml = self.write_xml("<pkgmetadata></pkgmetadata>\n")
+        self.addon.validate(xml, self.schema, b"xsd")
+        self.addon.flush()
+
+        # entries for removed files are dropped when loading the cache
+        os.unlink(xml.path)
+        path = pjoin(self.repo.location, "cat", "other", "metadata.xml")
+        os.makedirs(os.path.dirname(path))
+        with open(path, "w") as f:
+            f.write("<pkgmetadata></pkgmetadata>\n")
+        addon = init_addon(XmlValidationAddon, self.options)
+        assert not addon._entries
+        assert not addon.load_cache(self.cache_file)
+
+        # flushing only merges new entries without checking existing files
+        addon.validate(parse_metadata_xml(path), self.schema, b"xsd")
+        with patch("os.path.exists", wraps=os.path.exists) as exists:
+            addon.flush()
+        assert not [x for x in exists.call_args_list if x.args[0].endswith("metadata.xml")]
+        assert list(addon.load_cache(self.cache_file)) == ["cat/other/metadata.xml"]
@@ -0,0 +1,88 @@
+import os
+from os.path import join as pjoin
+from unittest.mock import patch
+
+import pytest
+
+from pkgcheck.addons import init_addon
+from pkgcheck.addons.caches import CacheDisabled
+from pkgcheck.addons.revdeps import RevdepsAddon
+
+
+class TestRevdepsAddon:
+    @pytest.fixture(autouse=True)
+    def _setup(self, tool, tmp_path, repo):
+        self.repo = repo
+        self.md5_cache = pjoin(repo.location, "metadata", "md5-cache")
+
+        args = ["scan", "--cache-dir", str(tmp_path), "--repo", repo.location]
+        options, _ = tool.parse_args(args)
+        self.addon = RevdepsAddon(options)
+        self.cache_file = self.addon.cache_file(self.repo)
+
+    def write_entry(self, cpvstr, **deps):
+        path = pjoin(self.md5_cache, cpvstr)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write("EAPI=8\n")
+            for key, val in deps.items():
+                f.write(f"{key}={val}\n")
+        return path
+
+    def test_cache_disabled(self, tool):
+        args = ["scan", "--cache", "no", "--repo", self.repo.location]
+        options, _ = tool.parse_args(args)
+        with pytest.raises(CacheDisabled, match="revdeps cache support required"):
+            init_addon(RevdepsAddon, options)
+
+    def test_no_md5_cache(self):
+        self.addon.update_cache()
+        assert not os.path.exists(self.cache_file)
+        assert not self.addon.revdeps(["cat/pkg"])
+
+    def test_revdeps(self):
+        self.write_entry("cat/pkg-1", RDEPEND=">=dev-libs/foo-1:=[bar(+)]")
+        self.write_entry("cat/pkg-2", DEPEND="bar? ( || ( dev-libs/foo dev-libs/bar ) )")
+        self.write_entry("cat/other-1", BDEPEND="dev-util/tool", PDEPEND="dev-libs/bar:0")
+        # blockers and malformed atoms are ignored
+        self.write_entry("cat/blocker-1", RDEPEND="!dev-libs/foo !!dev-libs/bar dev-libs/foo-1")
+        # as are non-dependency attributes
+        self.write_entry("cat/nodeps-1", LICENSE="dev-libs/foo")
+        self.addon.update_cache()
+        assert self.addon.revdeps(["dev-libs/foo"]) == {"cat/pkg-1", "cat/pkg-2"}
+        assert self.addon.revdeps(["dev-libs/bar"]) == {"cat/pkg-2", "cat/other-1"}
+        assert self.addon.revdeps(["dev-util/tool", "dev-libs/foo"]) == {
+            "cat/pkg-1",
+            "cat/pkg-2",
+            "cat/other-1",
+        }
+        assert not self.addon.revdeps(["cat/pkg"])
+
+    def test_cache_load(self):
+        self.write_entry("cat/pkg-1", RDEPEND="dev-libs/foo")
+        self.addon.update_cache()
+        assert self.addon.revdeps(["dev-libs/foo"]) == {"cat/pkg-1"}
+
+        with patch("pkgcheck.addons.caches.CachedAddon.save_cache") as save_cache:
+            self.addon.update_cache()
+            # verify the cache was loaded and not regenerated
+            save_cache.assert_not_called()
+            self.addon.update_cache(force=True)
+            # and is regenerated on a forced cache update
+            save_cache.assert_called_once()
+
+    def test_entry_changes(self):
+        path = self.write_entry("cat/pkg-1", RDEPEND="dev-libs/foo")
+        self.addon.update_cache()
+        assert self.addon.revdeps(["dev-libs/foo"]) == {"cat/pkg-1"}
+
+        self.write_entry("cat/pkg-1", RDEPEND="dev-libs/bar")
+        os.utime(path, ns=(0, 0))
+        self.write_entry("cat/other-1", RDEPEND="dev-libs/foo")
+        self.addon.update_cache()
+        assert self.addon.revdeps(["dev-libs/foo"]) == {"cat/other-1"}
+        assert self.addon.revdeps(["dev-libs/bar"]) == {"cat/pkg-1"}
+
+        os.unlink(path)
+        self.addon.update_cache()
+        assert not self.addon.revdeps(["dev-libs/bar"])
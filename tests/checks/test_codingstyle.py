@@ -3,6 +3,7 @@ from itertools import chain
 import pytest
 from pkgcore.ebuild.eapi import EAPI
 
+from pkgcheck import addons
 from pkgcheck.checks import codingstyle
 from pkgcheck.sources import _ParsedPkg
 
@@ -38,14 +39,14 @@ class TestInsintoCheck(misc.ReportTestCase):
             "/usr/share/applications",
             "//usr/share//applications",
         )
-        check = self.check_kls(None)
+        check = self.check_kls(None, line_scan_addon=addons.LineScanAddon(None))
 
         reports = self.assertReports(check, fake_pkg)
         for r, path in zip(reports, bad):
             assert path in str(r)
 
     def test_docinto(self):
-        check = self.check_kls(None)
+        check = self.check_kls(None, line_scan_addon=addons.LineScanAddon(None))
         for path in ("${PF}", "${P}", "${PF}/examples"):
             for eapi_str, eapi in EAPI.known_eapis.items():
                 fake_src = [f"\tinsinto /usr/share/doc/{path}\n"]
@@ -98,7 +99,7 @@ class TestAbsoluteSymlink(misc.ReportTestCase):
         fake_src.append("# That's it for now\n")
         fake_pkg = misc.FakePkg("dev-util/diffball-0.5", lines=fake_src)
 
-        check = self.check_kls(None)
+        check = self.check_kls(None, line_scan_addon=addons.LineScanAddon(None))
         reports = self.assertReports(check, fake_pkg)
 
         assert len(reports) == len(absolute) + len(absolute_prefixed)
@@ -108,7 +109,7 @@ class TestAbsoluteSymlink(misc.ReportTestCase):
 
 class TestPathVariablesCheck(misc.ReportTestCase):
     check_kls = codingstyle.PathVariablesCheck
-    check = check_kls(None)
+    check = check_kls(None, line_scan_addon=addons.LineScanAddon(None))
 
     def _found(self, cls, suffix=""):
         # check single and multiple matches across all specified variables
@@ -226,20 +227,26 @@ class TestObsoleteUri(misc.ReportTestCase):
         uri = "https://github.com/foo/bar/archive/${PV}.tar.gz"
         fake_src = [f'SRC_URI="{uri} -> ${{P}}.tar.gz"\n']
         fake_pkg = misc.FakePkg("dev-util/diffball-0.5", lines=fake_src)
-        self.assertNoReport(self.check_kls(None), fake_pkg)
+        self.assertNoReport(
+            self.check_kls(None, line_scan_addon=addons.LineScanAddon(None)), fake_pkg
+        )
 
     def test_commented_github_tarball_uri(self):
         uri = "https://github.com/foo/bar/tarball/${PV}"
         fake_src = ["# github tarball\n", "\n", f"# {uri}\n"]
         fake_pkg = misc.FakePkg("dev-util/diffball-0.5", lines=fake_src)
-        self.assertNoReport(self.check_kls(None), fake_pkg)
+        self.assertNoReport(
+            self.check_kls(None, line_scan_addon=addons.LineScanAddon(None)), fake_pkg
+        )
 
     def test_github_tarball_uri(self):
         uri = "https://github.com/foo/bar/tarball/${PV}"
         fake_src = [f'SRC_URI="{uri} -> ${{P}}.tar.gz"\n']
 
         fake_pkg = misc.FakePkg("dev-util/diffball-0.5", lines=fake_src)
-        r = self.assertReport(self.check_kls(None), fake_pkg)
+        r = self.assertReport(
+            self.check_kls(None, line_scan_addon=addons.LineScanAddon(None)), fake_pkg
+        )
         assert r.line == 1
         assert r.uri == uri
         assert r.replacement == "https://github.com/foo/bar/archive/${PV}.tar.gz"
@@ -250,7 +257,9 @@ class TestObsoleteUri(misc.ReportTestCase):
         fake_src = [f'SRC_URI="{uri} -> ${{P}}.zip"\n']
 
         fake_pkg = misc.FakePkg("dev-util/diffball-0.5", lines=fake_src)
-        r = self.assertReport(self.check_kls(None), fake_pkg)
+        r = self.assertReport(
+            self.check_kls(None, line_scan_addon=addons.LineScanAddon(None)), fake_pkg
+        )
         assert r.line == 1
         assert r.uri == uri
         assert r.replacement == "https://github.com/foo/bar/archive/${PV}.tar.gz"
@@ -260,14 +269,18 @@ class TestObsoleteUri(misc.ReportTestCase):
         uri = "https://gitlab.com/foo/bar/-/archive/${PV}/${P}.tar.gz"
         fake_src = [f'SRC_URI="{uri}"\n']
         fake_pkg = misc.FakePkg("dev-util/diffball-0.5", lines=fake_src)
-        self.assertNoReport(self.check_kls(None), fake_pkg)
+        self.assertNoReport(
+            self.check_kls(None, line_scan_addon=addons.LineScanAddon(None)), fake_pkg
+        )
 
     def test_gitlab_tar_gz_uri(self):
         uri = "https://gitlab.com/foo/bar/repository/archive.tar.gz?ref=${PV}"
         fake_src = [f'SRC_URI="{uri} -> ${{P}}.tar.gz"\n']
 
         fake_pkg = misc.FakePkg("dev-util/diffball-0.5", lines=fake_src)
-        r = self.assertReport(self.check_kls(None), fake_pkg)
+        r = self.assertReport(
+            self.check_kls(None, line_scan_addon=addons.LineScanAddon(None)), fake_pkg
+        )
         assert r.line == 1
         assert r.uri == uri
         assert r.replacement == "https://gitlab.com/foo/bar/-/archive/${PV}/bar-${PV}.tar.gz"
@@ -278,7 +291,9 @@ class TestObsoleteUri(misc.ReportTestCase):
         fake_src = [f'SRC_URI="{uri} -> ${{P}}.tar.bz2"\n']
 
         fake_pkg = misc.FakePkg("dev-util/diffball-0.5", lines=fake_src)
-        r = self.assertReport(self.check_kls(None), fake_pkg)
+        r = self.assertReport(
+            self.check_kls(None, line_scan_addon=addons.LineScanAddon(None)), fake_pkg
+        )
         assert r.line == 1
         assert r.uri == uri
         assert r.replacement == "https://gitlab.com/foo/bar/-/archive/${PV}/bar-${PV}.tar.bz2"
@@ -289,7 +304,9 @@ class TestObsoleteUri(misc.ReportTestCase):
         fake_src = [f'SRC_URI="{uri} -> ${{P}}.zip"\n']
 
         fake_pkg = misc.FakePkg("dev-util/diffball-0.5", lines=fake_src)
-        r = self.assertReport(self.check_kls(None), fake_pkg)
+        r = self.assertReport(
+            self.check_kls(None, line_scan_addon=addons.LineScanAddon(None)), fake_pkg
+        )
         assert r.line == 1
         assert r.uri == uri
         assert r.replacement == "https://gitlab.com/foo/bar/-/archive/${PV}/bar-${PV}.zip"
@@ -303,7 +320,9 @@ class TestBetterCompression(misc.ReportTestCase):
         uri = "https://github.com/foo/bar/archive/${PV}.tar.gz"
         fake_src = [f'SRC_URI="{uri} -> ${{P}}.tar.gz"\n']
         fake_pkg = misc.FakePkg("dev-util/diffball-0.5", lines=fake_src)
-        self.assertNoReport(self.check_kls(None), fake_pkg)
+        self.assertNoReport(
+            self.check_kls(None, line_scan_addon=addons.LineScanAddon(None)), fake_pkg
+        )
 
     def test_comment_uri(self):
         uri = "https://gitlab.com/GNOME/${PN}/-/archive/${PV}/${P}.tar"
@@ -314,7 +333,9 @@ class TestBetterCompression(misc.ReportTestCase):
             f'SRC_URI="{uri} -> ${{P}}.tar.gz"\n',
         ]
         fake_pkg = misc.FakePkg("dev-util/diffball-0.5", lines=fake_src)
-        r = self.assertReport(self.check_kls(None), fake_pkg)
+        r = self.assertReport(
+            self.check_kls(None, line_scan_addon=addons.LineScanAddon(None)), fake_pkg
+        )
         assert r.lineno == 4
 
     @pytest.mark.parametrize(
@@ -329,7 +350,9 @@ class TestBetterCompression(misc.ReportTestCase):
     def test_gitlab_archive_uri(self, uri):
         fake_src = [f'SRC_URI="{uri} -> ${{P}}.tar.gz"\n']
         fake_pkg = misc.FakePkg("dev-util/diffball-0.5", lines=fake_src)
-        r = self.assertReport(self.check_kls(None), fake_pkg)
+        r = self.assertReport(
+            self.check_kls(None, line_scan_addon=addons.LineScanAddon(None)), fake_pkg
+        )
         assert r.lineno == 1
         assert r.line == uri
         assert r.replacement == ".tar.bz2"
@@ -458,7 +481,7 @@ class TestRedundantPypiPN(misc.ReportTestCase):
 
 class TestExcessiveLineLength(misc.ReportTestCase):
     check_kls = codingstyle.LineLengthCheck
-    check = check_kls(None)
+    check = check_kls(None, line_scan_addon=addons.LineScanAddon(None))
     word_length = codingstyle.ExcessiveLineLength.word_length
 
     @staticmethod
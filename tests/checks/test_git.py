@@ -2,17 +2,20 @@ import os
 import textwrap
 import time
 from datetime import datetime, timedelta
+from itertools import chain
 from os.path import join as pjoin
 from unittest.mock import patch
 
 import pytest
 from pkgcore.ebuild.cpv import UnversionedCPV as CP
 from pkgcore.ebuild.cpv import VersionedCPV as CPV
+from pkgcore.restrictions import packages
 from pkgcore.test.misc import FakeRepo
 from snakeoil.cli import arghparse
 from snakeoil.fileutils import touch
 
-from pkgcheck.addons.git import GitCommit
+from pkgcheck import runners, sources
+from pkgcheck.addons.git import GitCommit, GitError
 from pkgcheck.base import PkgcheckUserException
 from pkgcheck.checks import git as git_mod
 
@@ -67,6 +70,42 @@ class TestGitCommitMessageCheck(ReportTestCase):
             ),
         )
 
+    def test_sign_offs_per_commit(self):
+        # sign offs from previous commits don't apply to later ones
+        commit = FakeCommit(
+            author="user1", committer="user1", message=["summary", "", "Signed-off-by: user1"]
+        )
+        self.assertNoReport(self.check, commit)
+        r = self.assertReport(
+            self.check, FakeCommit(author="user1", committer="user1", message=["blah"])
+        )
+        assert isinstance(r, git_mod.MissingSignOff)
+        assert r.missing_sign_offs == ("user1",)
+
+    def test_partitioned_runs(self):
+        commits = tuple(
+            FakeCommit(author=f"user{i}", committer=f"user{i}", message=["blah"]) for i in range(5)
+        )
+        source = sources.Source(self.options, commits)
+        runner = runners.PartitionedCheckRunner(self.options, source, [self.check])
+        results = list(runner.run())
+        assert len(results) == 5
+
+        # partitions split commits between them without overlap
+        partitioned = []
+        with patch.object(source, "itermatch", wraps=source.itermatch) as itermatch:
+            partitions = sources.PartitionSource.split(source, packages.AlwaysTrue, 2)
+        # source items are only pulled once for all partitions
+        itermatch.assert_called_once()
+        for partition in partitions:
+            assert partition.scope == source.scope
+            runner = runners.PartitionedCheckRunner(self.options, partition, [self.check])
+            partitioned.append(list(runner.run()))
+        assert list(map(len, partitioned)) == [3, 2]
+        # partitions aren't created for missing items
+        assert len(sources.PartitionSource.split(source, packages.AlwaysTrue, 10)) == 5
+        assert sorted(chain.from_iterable(partitioned)) == sorted(results)
+
     def SO_commit(self, summary="summary", body="", tags=(), **kwargs):
         """Create a commit object from summary, body, and tags components."""
         author = kwargs.pop("author", "author@domain.com")
@@ -563,9 +602,9 @@ class TestGitPkgCommitsCheck(ReportTestCase):
         expected = git_mod.DroppedStableKeywords(["amd64"], commit, pkg=CPV("cat/pkg-1"))
         assert r == expected
 
-        # git archive failures error out
-        with patch("pkgcheck.checks.git.subprocess.Popen") as git_archive:
-            git_archive.return_value.poll.return_value = -1
+        # git failures error out
+        with patch("pkgcheck.addons.git.GitCatFile.ls_tree") as ls_tree:
+            ls_tree.side_effect = GitError("fatal: not a tree object")
             with pytest.raises(PkgcheckUserException, match="failed populating archive repo"):
                 self.assertNoReport(self.check, self.source)
 
@@ -658,9 +697,9 @@ class TestGitPkgCommitsCheck(ReportTestCase):
         self.init_check()
         self.assertNoReport(self.check, self.source)
 
-        # git archive failures error out
-        with patch("pkgcheck.checks.git.subprocess.Popen") as git_archive:
-            git_archive.return_value.poll.return_value = -1
+        # git failures error out
+        with patch("pkgcheck.addons.git.GitCatFile.ls_tree") as ls_tree:
+            ls_tree.side_effect = GitError("fatal: not a tree object")
             with pytest.raises(PkgcheckUserException, match="failed populating archive repo"):
                 self.assertNoReport(self.check, self.source)
 
@@ -694,6 +733,20 @@ class TestGitPkgCommitsCheck(ReportTestCase):
         self.init_check()
         self.assertNoReport(self.check, self.source)
 
+    def test_missing_move_dropped_version(self):
+        # drop a version and move the package in separate commits
+        self.child_repo.create_ebuild("cat/pkg-1")
+        self.child_git_repo.add_all("cat/pkg: version bump to 1")
+        self.child_git_repo.remove("cat/pkg/pkg-0.ebuild", msg="cat/pkg: drop 0")
+        self.child_git_repo.move("cat/pkg", "cat/newpkg", msg="cat/newpkg: moved pkg")
+        self.child_git_repo.move(
+            "cat/newpkg/pkg-1.ebuild", "cat/newpkg/newpkg-1.ebuild", msg="cat/newpkg: rename"
+        )
+        self.init_check()
+        r = self.assertReport(self.check, self.source)
+        expected = git_mod.MissingMove("cat/pkg", "cat/newpkg", pkg=CPV("cat/newpkg-1"))
+        assert r == expected
+
     def test_revision_move(self):
         self.parent_git_repo.move(
             "cat/pkg/pkg-0.ebuild",
@@ -6,6 +6,7 @@ from functools import partial
 from itertools import combinations
 from operator import attrgetter
 from os.path import join as pjoin
+from unittest.mock import patch
 
 import pytest
 from pkgcore.ebuild import eapi, repo_objs, repository
@@ -809,6 +810,43 @@ class TestLicenseCheck(use_based(), misc.ReportTestCase):
         assert isinstance(r, addons.UnstatedIuse)
         assert "unstated flag: [ foo ]" in str(r)
 
+    def test_shared_use_validation(self):
+        self.repo = FakeRepo(repo_id="test", licenses=("BSD",))
+        options = self.get_options()
+        use_addon = addons.UseAddon(options)
+        checks = [self.check_kls(options, use_addon=use_addon) for _ in range(2)]
+        pkg = self.mk_pkg(license="foo? ( BSD )")
+        with (
+            patch.object(use_addon, "_flatten", wraps=use_addon._flatten) as flatten,
+            patch.object(use_addon, "_unstated_iuse", wraps=use_addon._unstated_iuse) as unstated,
+        ):
+            # conditionals are flattened and unstated IUSE determined once per package
+            reports = [self.assertReport(chk, pkg) for chk in checks]
+            assert all(isinstance(r, addons.UnstatedIuse) for r in reports)
+            flatten.assert_called_once()
+            unstated.assert_called_once()
+            # new packages are revalidated
+            self.assertReport(checks[0], self.mk_pkg(license="foo? ( BSD )"))
+            assert flatten.call_count == 2
+
+    def test_unstated_iuse_profiles(self):
+        self.repo = FakeRepo(repo_id="test", licenses=("BSD",))
+        options = self.get_options()
+        use_addon = addons.UseAddon(options)
+        use_addon.profiles = tuple(
+            misc.FakeProfile(iuse_effective=iuse, name=name)
+            for name, iuse in (("a", ["foo"]), ("b", []), ("c", ["bar"]), ("d", []))
+        )
+        chk = self.check_kls(options, use_addon=use_addon)
+        pkg = self.mk_pkg(license="foo? ( BSD ) bar? ( BSD )")
+        # profiles are grouped by the flags they lack, ordered by first profile
+        reports = self.assertReports(chk, pkg)
+        assert [(r.flags, r.profile, r.num_profiles) for r in reports] == [
+            (("bar",), "a", 1),
+            (("bar", "foo"), "b", 2),
+            (("foo",), "c", 1),
+        ]
+
     def test_single_missing(self):
         r = self.assertReport(self.mk_check(), self.mk_pkg("foo"))
         assert isinstance(r, metadata.UnknownLicense)
@@ -1390,6 +1428,16 @@ class TestSrcUriCheck(use_based(), misc.ReportTestCase):
         assert isinstance(r, addons.UnstatedIuse)
         assert "unstated flag: [ foo ]" in str(r)
 
+    def test_no_use_desc(self):
+        # USE flag validation is skipped for repos without use.desc
+        chk = self.mk_check(options={"use_desc": ()})
+        assert chk.use_addon.ignore
+        pkg = self.mk_pkg(src_uri="foo? ( https://foo.com/foo-0.tar.gz )")
+        self.assertNoReport(chk, pkg)
+        fetchables, unstated = chk.use_addon.fetchables(pkg)
+        assert list(fetchables.values()) == [()]
+        assert not unstated
+
     def test_bad_proto(self):
         chk = self.mk_check()
 
@@ -1433,6 +1481,25 @@ class TestSrcUriCheck(use_based(), misc.ReportTestCase):
         assert r.uris == (uri,)
         assert "zip archive used when tarball available" in str(r)
 
+    def test_shared_fetchables(self):
+        chk = self.mk_check()
+        pkg = self.mk_pkg(
+            src_uri="https://foon.com/foon-2.7.1.tar.gz -> foon-2.7.1.tar.gz "
+            "foo? ( https://foo.com/foo-0.tar.gz )"
+        )
+        pkg.data["EAPI"] = "8"
+        generate_fetchables = misc.FakePkg.generate_fetchables
+        with patch.object(
+            misc.FakePkg, "generate_fetchables", autospec=True, side_effect=generate_fetchables
+        ) as generate:
+            # SRC_URI is only parsed once while log-based reports are regenerated
+            for _ in range(2):
+                reports = self.assertReports(chk, pkg)
+                assert len(reports) == 2
+                assert isinstance(reports[0], metadata.RedundantUriRename)
+                assert isinstance(reports[1], addons.UnstatedIuse)
+            generate.assert_called_once()
+
 
 class TestMissingUnpackerDepCheck(use_based(), misc.ReportTestCase):
     check_kls = metadata.MissingUnpackerDepCheck
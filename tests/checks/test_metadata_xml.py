@@ -0,0 +1,68 @@
+import os
+import textwrap
+
+import pytest
+from lxml import etree
+from pkgcore import const as pkgcore_const
+
+from pkgcheck.addons import init_addon
+from pkgcheck.addons.metadata_xml import XmlValidationAddon
+from pkgcheck.checks import metadata_xml
+
+
+class TestParseMetadataXml:
+    @pytest.fixture(autouse=True)
+    def _setup(self, tmp_path):
+        self.path = tmp_path / "metadata.xml"
+
+    def test_missing(self):
+        with pytest.raises(OSError):
+            metadata_xml.parse_metadata_xml(str(self.path))
+
+    def test_malformed(self):
+        self.path.write_text("<pkgmetadata>\n")
+        xml = metadata_xml.parse_metadata_xml(str(self.path))
+        assert xml.doc is None
+        assert isinstance(xml.error, etree.XMLSyntaxError)
+
+    def test_shared(self):
+        data = textwrap.dedent(
+            """\
+                <?xml version="1.0" encoding="UTF-8"?>
+                <pkgmetadata>
+                \t<upstream>
+                \t\t<remote-id type="github">pkgcore/pkgcheck</remote-id>
+                \t</upstream>
+                </pkgmetadata>
+            """
+        )
+        self.path.write_text(data)
+        xml = metadata_xml.parse_metadata_xml(str(self.path))
+        assert xml.data == data.encode()
+        assert list(xml.lines) == data.splitlines(keepends=True)
+        assert xml.doc.find("upstream/remote-id").sourceline == 4
+        # files are only parsed once
+        assert metadata_xml.parse_metadata_xml(str(self.path)) is xml
+
+        # schema validation results are stored
+        xsd = os.path.join(pkgcore_const.DATA_PATH, "xml-schema", "metadata.xsd")
+        schema = etree.XMLSchema(etree.parse(xsd))
+        assert xml.validate(schema) == ()
+
+        # modified files are reparsed
+        self.path.write_text(data.replace("pkgcheck", "pkgcore") + "\n")
+        assert metadata_xml.parse_metadata_xml(str(self.path)) is not xml
+
+
+class TestXmlValidationCache:
+    @pytest.mark.parametrize("enabled", (True, False))
+    def test_optional_addon(self, tool, tmp_path, repo, enabled):
+        args = ["scan", "--cache-dir", str(tmp_path), "--repo", repo.location]
+        if not enabled:
+            args.append("--cache=-xml")
+        options, _ = tool.parse_args(args)
+        addons_map = {}
+        check = init_addon(metadata_xml.PackageMetadataXmlCheck, options, addons_map)
+        # the check runs without cached validation when the cache is disabled
+        assert check.xml_cache is addons_map.get(XmlValidationAddon)
+        assert (check.xml_cache is not None) == enabled
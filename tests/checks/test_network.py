@@ -1,15 +1,21 @@
 import importlib.util
 import os
+import socket
 import tempfile
+import textwrap
+import threading
 import urllib.request
 from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from operator import attrgetter
+from os.path import join as pjoin
 from unittest.mock import patch
 
 import pytest
 from snakeoil.formatters import PlainTextFormatter
 
 from pkgcheck import objects, reporters, scan
+from pkgcheck.base import PkgcheckException
 from pkgcheck.checks import NetworkCheck
 from pkgcheck.checks.network import DeadUrl, FetchablesUrlCheck, HomepageUrlCheck
 from pkgcheck.packages import RawCPV
@@ -53,6 +59,28 @@ class TestNetworkChecks:
             output = f.read().decode()
             return output
 
+    @staticmethod
+    def _fake_send(responses):
+        """Return a fake send function serving recorded responses in order.
+
+        GET requests falling back from failed HEAD requests are served the
+        same response as the HEAD request.
+        """
+        responses = iter(responses)
+        failed = {}
+
+        def send(request, **kwargs):
+            if request.method == "GET" and request.url in failed:
+                return failed.pop(request.url)
+            response = next(responses)
+            if isinstance(response, Exception):
+                raise response
+            if request.method == "HEAD" and response.status_code >= 400:
+                failed[request.url] = response
+            return response
+
+        return send
+
     @pytest.mark.parametrize("check, result", _net_results)
     def test_scan(self, check, result):
         check_name = check.__name__
@@ -74,9 +102,10 @@ class TestNetworkChecks:
             spec.loader.exec_module(responses_mod)
 
             results = []
-            args = ["-c", check_name, "-k", keyword, f"{check_name}/{ebuild_name}"]
+            # disable the URL cache since ebuilds reuse URLs with different responses
+            args = ["--cache=-url", "-c", check_name, "-k", keyword, f"{check_name}/{ebuild_name}"]
             with patch("pkgcheck.addons.net.requests.Session.send") as send:
-                send.side_effect = responses_mod.responses
+                send.side_effect = self._fake_send(responses_mod.responses)
 
                 # load expected results if they exist
                 try:
@@ -121,7 +150,7 @@ class TestNetworkChecks:
             (None, None),  # faking a clean connection
         )
 
-        args = ["-c", check_name, "-k", keyword, f"{check_name}/ftp-{keyword}"]
+        args = ["--cache=-url", "-c", check_name, "-k", keyword, f"{check_name}/ftp-{keyword}"]
         for side_effect, expected_result in data:
             with patch("pkgcheck.checks.network.urllib.request.urlopen") as urlopen:
                 if side_effect is not None:
@@ -132,3 +161,238 @@ class TestNetworkChecks:
                 else:
                     assert results == [expected_result]
                     assert self._render_results(results), "failed rendering results"
+
+    def test_url_cache(self):
+        pkg = RawCPV("HomepageUrlCheck", "ftp-DeadUrl", "0")
+        deadurl = DeadUrl("HOMEPAGE", "ftp://pkgcheck.net/pkgcheck/", "dead ftp", pkg=pkg)
+        args = ["-c", "HomepageUrlCheck", "-k", "DeadUrl", "HomepageUrlCheck/ftp-DeadUrl"]
+        ttl_args = ["--url-cache-ttl", "dead=0"]
+
+        with patch("pkgcheck.checks.network.urllib.request.urlopen") as urlopen:
+            urlopen.side_effect = urllib.error.URLError("dead ftp")
+            assert list(self.scan(self.scan_args + args)) == [deadurl]
+
+        # fresh results are pulled from the cache
+        with patch("pkgcheck.checks.network.urllib.request.urlopen") as urlopen:
+            assert list(self.scan(self.scan_args + args)) == [deadurl]
+            # expired results are rechecked
+            assert not list(self.scan(self.scan_args + ttl_args + args))
+
+        with patch("pkgcheck.checks.network.urllib.request.urlopen") as urlopen:
+            urlopen.side_effect = urllib.error.URLError("dead ftp")
+            # valid results are cached as well
+            assert not list(self.scan(self.scan_args + ttl_args + args))
+            # disabling the cache always hits the network
+            assert list(self.scan(self.scan_args + ["--cache=-url"] + args)) == [deadurl]
+
+    def test_url_cache_ttl_args(self):
+        for arg in ("foo=1", "dead=bar"):
+            with pytest.raises(PkgcheckException, match="URL cache TTL"):
+                list(self.scan(self.scan_args + ["--url-cache-ttl", arg]))
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """Request handler for the stand-in HTTP server.
+
+    Responses are served from the server's mapping of paths to routes
+    falling back to 404 errors for unknown paths.
+    """
+
+    def _respond(self):
+        server = self.server
+        with server.lock:
+            server.requests.append((self.command, self.path))
+            server.active += 1
+            server.max_active = max(server.active, server.max_active)
+        try:
+            route = server.routes.get(self.path, {})
+            if route.get("block"):
+                # hold the response until the server is shut down
+                server.release.wait()
+            if (barrier := route.get("barrier")) is not None:
+                # respond once the expected number of requests are active
+                try:
+                    barrier.wait(timeout=30)
+                except threading.BrokenBarrierError:
+                    server.errors.append(f"{self.command} {self.path}: barrier broken")
+            if self.command == "HEAD" and "head_status" in route:
+                self.send_response(route["head_status"])
+            else:
+                self.send_response(route.get("status", 404))
+                for header, value in route.get("headers", {}).items():
+                    self.send_header(header, value.format(url=server.url))
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        except (BrokenPipeError, ConnectionResetError):
+            # clients give up on slow responses
+            pass
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    do_GET = do_HEAD = _respond
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def http_server():
+    """Local HTTP server standing in for remote hosts.
+
+    Routes map paths to their response status, headers, and alternative
+    HEAD response status. Header values are formatted with the server's URL.
+    Responses can also be held until shutdown or until a barrier is passed
+    by the given number of concurrent requests.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StandInHandler)
+    server.daemon_threads = True
+    server.url = f"http://127.0.0.1:{server.server_port}"
+    server.routes = {}
+    server.lock = threading.Lock()
+    server.release = threading.Event()
+    server.errors = []
+    server.requests = []
+    server.active = server.max_active = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.release.set()
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def dead_port():
+    """Local port without any listening server."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TestStandInServer:
+    @pytest.fixture(autouse=True)
+    def _setup(self, testconfig, tmp_path, make_repo, http_server):
+        self.server = http_server
+        self.url = http_server.url
+        self.repo = make_repo()
+        base_args = ["--config", testconfig]
+        self.scan = partial(scan, base_args=base_args)
+        self.scan_args = [
+            "--config",
+            "no",
+            "--cache-dir",
+            str(tmp_path),
+            "--cache=-url",
+            "--net",
+            "-r",
+            self.repo.path,
+        ]
+        self.server.routes.update(
+            {
+                "/ok": {"status": 200},
+                "/nohead": {"status": 200, "head_status": 405},
+                "/head400": {"status": 200, "head_status": 400},
+                "/head404": {"status": 200, "head_status": 404},
+                "/head500": {"status": 200, "head_status": 500},
+                "/moved": {"status": 301, "headers": {"Location": "{url}/ok"}},
+                "/chain": {"status": 301, "headers": {"Location": "{url}/chain2"}},
+                "/chain2": {"status": 308, "headers": {"Location": "{url}/ok"}},
+                "/temp": {"status": 302, "headers": {"Location": "{url}/ok"}},
+                "/hsts": {
+                    "status": 301,
+                    "headers": {
+                        "Location": "{url}/ok",
+                        "Strict-Transport-Security": "max-age=31536000",
+                    },
+                },
+                "/slow": {"status": 200, "block": True},
+            }
+        )
+
+    def _results(self, results):
+        """Return comparable data for a given set of network results."""
+        return sorted(
+            (x.__class__.__name__, x.package, x.attr, x.url, getattr(x, "new_url", None))
+            for x in results
+        )
+
+    def test_homepage(self, dead_port):
+        url = self.url
+        homepages = {
+            "ok": f"{url}/ok",
+            "nohead": f"{url}/nohead",
+            "headfour": f"{url}/head400",
+            "headnotfound": f"{url}/head404",
+            "headerror": f"{url}/head500",
+            "moved": f"{url}/moved",
+            "chain": f"{url}/chain",
+            "temp": f"{url}/temp",
+            "hsts": f"{url}/hsts",
+            "dead": f"{url}/dead",
+            "tls": f"https://127.0.0.1:{self.server.server_port}/tls",
+            "ftp": f"ftp://127.0.0.1:{dead_port}/foo",
+        }
+        for name, homepage in homepages.items():
+            self.repo.create_ebuild(f"cat/{name}-0", homepage=homepage)
+        results = list(self.scan(self.scan_args + ["-c", "HomepageUrlCheck"]))
+        ssl_error = next(x for x in results if x.__class__.__name__ == "SSLCertificateError")
+        assert ssl_error.message
+        assert self._results(results) == sorted(
+            [
+                ("DeadUrl", "dead", "HOMEPAGE", f"{url}/dead", None),
+                ("DeadUrl", "ftp", "HOMEPAGE", homepages["ftp"], None),
+                ("RedirectedUrl", "chain", "HOMEPAGE", f"{url}/chain", f"{url}/ok"),
+                ("RedirectedUrl", "hsts", "HOMEPAGE", f"{url}/hsts", f"https{url[4:]}/ok"),
+                ("RedirectedUrl", "moved", "HOMEPAGE", f"{url}/moved", f"{url}/ok"),
+                ("SSLCertificateError", "tls", "HOMEPAGE", homepages["tls"], None),
+            ]
+        )
+
+        # HEAD requests are used, falling back to GET for error responses
+        for path in ("/nohead", "/head400", "/head404", "/head500", "/dead"):
+            assert ("HEAD", path) in self.server.requests
+            assert ("GET", path) in self.server.requests
+        assert ("GET", "/ok") not in self.server.requests
+        assert ("GET", "/moved") not in self.server.requests
+
+    def test_fetchables_and_metadata(self):
+        url = self.url
+        self.repo.create_ebuild("cat/pkg-0", src_uri=f"{url}/dead -> foo.tar.gz")
+        metadata = textwrap.dedent(
+            f"""\
+                <?xml version="1.0" encoding="UTF-8"?>
+                <!DOCTYPE pkgmetadata SYSTEM "https://www.gentoo.org/dtd/metadata.dtd">
+                <pkgmetadata>
+                    <upstream>
+                        <changelog>{url}/moved</changelog>
+                        <doc>{url}/ok</doc>
+                    </upstream>
+                </pkgmetadata>
+            """
+        )
+        with open(pjoin(self.repo.path, "cat", "pkg", "metadata.xml"), "w") as f:
+            f.write(metadata)
+        checks = "FetchablesUrlCheck,MetadataUrlCheck"
+        results = list(self.scan(self.scan_args + ["-c", checks]))
+        assert self._results(results) == [
+            ("DeadUrl", "pkg", "SRC_URI", f"{url}/dead", None),
+            ("RedirectedUrl", "pkg", "metadata.xml: changelog", f"{url}/moved", f"{url}/ok"),
+        ]
+
+    def test_timeout(self):
+        self.repo.create_ebuild("cat/pkg-0", homepage=f"{self.url}/slow")
+        results = list(self.scan(self.scan_args + ["-c", "HomepageUrlCheck", "--timeout", "0.5"]))
+        assert self._results(results) == [("DeadUrl", "pkg", "HOMEPAGE", f"{self.url}/slow", None)]
+
+    @pytest.mark.parametrize("host_tasks", (1, 2))
+    def test_host_tasks(self, host_tasks):
+        # requests are only answered in groups matching the per-host limit
+        barrier = threading.Barrier(host_tasks)
+        for i in range(6):
+            self.repo.create_ebuild(f"cat/pkg{i}-0", homepage=f"{self.url}/ok{i}")
+            self.server.routes[f"/ok{i}"] = {"status": 200, "barrier": barrier}
+        args = ["-c", "HomepageUrlCheck", "--host-tasks", str(host_tasks)]
+        assert not list(self.scan(self.scan_args + args))
+        assert not self.server.errors
+        assert self.server.max_active == host_tasks
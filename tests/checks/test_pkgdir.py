@@ -1,6 +1,8 @@
 import os
+import stat
 from datetime import datetime, timedelta
 from os.path import join as pjoin
+from unittest.mock import patch
 
 import pytest
 from pkgcore.ebuild.cpv import UnversionedCPV
@@ -9,7 +11,7 @@ from snakeoil.cli import arghparse
 from snakeoil.fileutils import touch
 from snakeoil.osutils import ensure_dirs
 
-from pkgcheck import addons
+from pkgcheck import addons, sources
 from pkgcheck.checks import SkipCheck, pkgdir
 
 from .. import misc
@@ -26,13 +28,21 @@ class PkgDirCheckBase(misc.ReportTestCase):
 
     def mk_check(self, gentoo=False):
         options = arghparse.Namespace(
-            target_repo=self.repo, cache={"git": False}, gentoo_repo=gentoo
+            target_repo=self.repo, cache={"git": False, "files": False}, gentoo_repo=gentoo
         )
         kwargs = {}
         if addons.git.GitAddon in self.check_kls.required_addons:
             kwargs["git_addon"] = addons.git.GitAddon(options)
+        if addons.git.GitFilesAddon in self.check_kls.optional_addons:
+            kwargs["git_files_addon"] = addons.git.GitFilesAddon(options)
         return self.check_kls(options, **kwargs)
 
+    def _run_check(self, check, data):
+        # inject package directory snapshots as done by the check's source
+        if isinstance(check, pkgdir.PkgDirCheck) and isinstance(data, list):
+            data = sources.PkgDirPkgs(data, self.repo, check.gitignored)
+        return super()._run_check(check, data)
+
     def mk_pkg(self, files={}, category=None, package=None, version="0.7.1", revision=""):
         # generate random cat/PN
         category = misc.random_str() if category is None else category
@@ -44,7 +54,7 @@ class PkgDirCheckBase(misc.ReportTestCase):
         os.makedirs(pjoin(self.filesdir, misc.random_str()), exist_ok=True)
 
         # create dirs that should be ignored
-        for d in getattr(self.check_kls, "ignore_dirs", ()):
+        for d in sources.PkgDir.ignore_dirs:
             os.makedirs(pjoin(self.filesdir, d), exist_ok=True)
 
         # create specified files in FILESDIR
@@ -61,6 +71,47 @@ class TestPkgDirCheck(PkgDirCheckBase):
     def test_empty_dir(self):
         self.assertNoReport(self.mk_check(), [self.mk_pkg()])
 
+    def test_snapshot(self):
+        pkg = self.mk_pkg({"foo.patch": "foo"}, category="cat", package="pkg")
+        pkg_path = pjoin(self.repo.location, "cat", "pkg")
+        with open(pjoin(pkg_path, "pkg-0.7.1.ebuild"), "w") as f:
+            f.write("EAPI=8\n")
+        os.symlink("foo.patch", pjoin(self.filesdir, "bar.patch"))
+        os.makedirs(pjoin(self.filesdir, "sub"))
+        touch(pjoin(self.filesdir, "sub", "baz"))
+
+        snapshot = sources.PkgDirPkgs([pkg], self.repo).pkgdir
+        assert snapshot.path == pkg_path
+        entries = {x.name: x for x in snapshot.entries}
+        assert entries.keys() == {"files", "pkg-0.7.1.ebuild"}
+        assert entries["files"].is_dir
+        assert entries["files"].head is None
+        assert entries["pkg-0.7.1.ebuild"].head == b"EAPI=8\n"
+        assert entries["pkg-0.7.1.ebuild"].size == 7
+
+        # FILESDIR is recursively scanned without following symlinks
+        assert snapshot.dirs.keys() >= {"files", "files/sub"}
+        files = {x.name: x for x in snapshot.dirs["files"]}
+        assert stat.S_ISLNK(files["bar.patch"].mode)
+        assert stat.S_ISREG(files["foo.patch"].mode)
+        assert [x.name for x in snapshot.dirs["files/sub"]] == ["baz"]
+
+    def test_snapshot_pruned_dirs(self):
+        pkg = self.mk_pkg({"foo.patch": "foo"}, category="cat", package="pkg")
+        for d in ("ignored", "ignored/nested", ".svn/nested", "kept"):
+            os.makedirs(pjoin(self.filesdir, d), exist_ok=True)
+        touch(pjoin(self.filesdir, "ignored", "bar~"))
+        with open(pjoin(self.repo.location, ".gitignore"), "w") as f:
+            f.write("ignored/\n")
+        check = self.mk_check()
+
+        # VCS and gitignored dirs are listed but never descended into
+        snapshot = sources.PkgDirPkgs([pkg], self.repo, check.gitignored).pkgdir
+        assert {x.name for x in snapshot.dirs["files"]} >= {".svn", "ignored", "kept"}
+        assert "files/kept" in snapshot.dirs
+        assert not {"files/.svn", "files/ignored", "files/ignored/nested"} & snapshot.dirs.keys()
+        self.assertNoReport(check, [pkg])
+
 
 class TestDuplicateFiles(PkgDirCheckBase):
     """Check DuplicateFiles results."""
@@ -92,6 +143,33 @@ class TestDuplicateFiles(PkgDirCheckBase):
             ("files/test3", "files/test4"),
         )
 
+    def test_git_blobs(self, make_git_repo, tmp_path_factory):
+        pkg = self.mk_pkg({"test": "abc", "test2": "abc", "test3": "bcd"})
+        git_repo = make_git_repo(self.repo.location)
+        git_repo.add_all("add pkg")
+        check = self.mk_check()
+        check.options.cache_dir = str(tmp_path_factory.mktemp("cache"))
+
+        # unmodified tracked files use their git blob ids without rehashing
+        with patch("pkgcheck.checks.pkgdir.get_chksums") as get_chksums:
+            r = self.assertReport(check, [pkg])
+            get_chksums.assert_not_called()
+        assert r.files == ("files/test", "files/test2")
+        # only the package directory is listed
+        assert not check.git_files._listed
+
+        # modified files are rehashed
+        with open(pjoin(self.filesdir, "test2"), "w") as f:
+            f.write("bcd")
+        r = self.assertReport(check, [pkg])
+        assert r.files == ("files/test2", "files/test3")
+
+        # files are hashed when the files cache is disabled
+        check = self.check_kls(check.options, git_addon=addons.git.GitAddon(check.options))
+        assert check.git_files is None
+        r = self.assertReport(check, [pkg])
+        assert r.files == ("files/test2", "files/test3")
+
 
 class TestEmptyFile(PkgDirCheckBase):
     """Check EmptyFile results."""
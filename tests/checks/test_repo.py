@@ -1,4 +1,5 @@
 import os
+import subprocess
 from os.path import join as pjoin
 from unittest import mock
 
@@ -17,11 +18,16 @@ from .. import misc
 class TestRepoDirCheck(misc.Tmpdir, misc.ReportTestCase):
     check_kls = repo.RepoDirCheck
 
-    def mk_check(self):
+    def mk_check(self, files=True):
         self.repo = FakeRepo(repo_id="repo", location=self.dir)
-        options = arghparse.Namespace(target_repo=self.repo, cache={"git": False}, gentoo_repo=True)
+        options = arghparse.Namespace(
+            target_repo=self.repo,
+            cache={"git": False, "files": False},
+            gentoo_repo=True,
+        )
         git_addon = addons.git.GitAddon(options)
-        return repo.RepoDirCheck(options, git_addon=git_addon)
+        git_files_addon = addons.git.GitFilesAddon(options) if files else None
+        return repo.RepoDirCheck(options, git_addon=git_addon, git_files_addon=git_files_addon)
 
     def mk_pkg(self, cpvstr):
         pkg = atom.atom(cpvstr)
@@ -110,6 +116,35 @@ class TestRepoDirCheck(misc.Tmpdir, misc.ReportTestCase):
             self.assertNoReport(self.mk_check(), [])
             os.unlink(path)
 
+    def test_git_files(self, tmp_path_factory):
+        # files are pulled from the git index when the repo is under git
+        subprocess.run(["git", "init", self.dir], check=True, stdout=subprocess.DEVNULL)
+        for path in ("foo", "cat/pkg/files/bar", "distfiles/baz"):
+            os.makedirs(os.path.dirname(pjoin(self.dir, path)), exist_ok=True)
+            with open(pjoin(self.dir, path), "wb") as f:
+                f.write(b"\xd3\x06\xf8\xef")
+        with open(pjoin(self.dir, ".gitignore"), "w") as f:
+            f.write("/distfiles/")
+        subprocess.run(["git", "add", "--all"], cwd=self.dir, check=True)
+
+        check = self.mk_check()
+        check.options.cache_dir = str(tmp_path_factory.mktemp("cache"))
+        assert check.git_files.files is not None
+        r = self.assertReports(check, [])
+        assert sorted(x.path for x in r) == ["cat/pkg/files/bar", "foo"]
+
+        # binary file verdicts are cached on flush
+        check.flush()
+        assert os.path.exists(check.git_files.cache_file(self.repo))
+
+        # the repo is walked when the files cache is disabled
+        check = self.mk_check(files=False)
+        with mock.patch.object(check, "_walk", wraps=check._walk) as walk:
+            r = self.assertReports(check, [])
+            walk.assert_called_once()
+        assert sorted(x.path for x in r) == ["cat/pkg/files/bar", "foo"]
+        check.flush()
+
     def test_non_utf8_encodings(self):
         # non-english languages courtesy of google translate mangling
         langs = (
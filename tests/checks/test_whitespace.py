@@ -2,6 +2,7 @@ import re
 import sys
 import unicodedata
 
+from pkgcheck import addons
 from pkgcheck.checks import whitespace
 
 from .. import misc
@@ -11,7 +12,7 @@ class WhitespaceCheckTest(misc.ReportTestCase):
     """Various whitespace related test support."""
 
     check_kls = whitespace.WhitespaceCheck
-    check = whitespace.WhitespaceCheck(None)
+    check = whitespace.WhitespaceCheck(None, line_scan_addon=addons.LineScanAddon(None))
 
 
 class TestWhitespaceFound(WhitespaceCheckTest):
@@ -154,7 +155,7 @@ class TestMultipleChecks(WhitespaceCheckTest):
 
 class TestMissingWhitespaceCheck(misc.ReportTestCase):
     check_kls = whitespace.MissingWhitespaceCheck
-    check = whitespace.MissingWhitespaceCheck(None)
+    check = whitespace.MissingWhitespaceCheck(None, line_scan_addon=addons.LineScanAddon(None))
 
     def test_it(self):
         fake_src = [
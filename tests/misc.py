@@ -227,14 +227,20 @@ def init_check(check_cls, options):
     # check class is guaranteed to be last in the list
     try:
         for cls in enabled_addons:
-            if issubclass(cls, AsyncCheck):
-                addon = addons.init_addon(cls, options, addons_map, results_q=results_q)
-            else:
-                addon = addons.init_addon(cls, options, addons_map)
+            try:
+                if issubclass(cls, AsyncCheck):
+                    addon = addons.init_addon(cls, options, addons_map, results_q=results_q)
+                else:
+                    addon = addons.init_addon(cls, options, addons_map)
+            except CacheDisabled:
+                # disabled optional addons are passed to the check as None
+                if cls is check_cls:
+                    raise
 
         source = sources.init_source(addon.source, options, addons_map)
     except CacheDisabled as e:
         raise SkipCheck(cls, e)
 
     required_addons = {base.param_name(x): addons_map[x] for x in addon.required_addons}
+    required_addons.update({base.param_name(x): addons_map.get(x) for x in addon.optional_addons})
     return addon, required_addons, source
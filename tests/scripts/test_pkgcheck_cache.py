@@ -1,5 +1,10 @@
+import io
+import json
 import os
+import pickle
+import tarfile
 from functools import partial
+from os.path import join as pjoin
 from unittest.mock import patch
 
 import pytest
@@ -107,3 +112,73 @@ class TestPkgcheckCache:
             out, err = capsys.readouterr()
             assert (out, err) == ("", "")
             assert excinfo.value.code == 0
+
+    def test_cache_bundles(self, capsys, tmp_path):
+        bundle = str(tmp_path / "caches.tar.gz")
+        args = self.args + ["-r", "eclass"]
+
+        # generate portable and non-portable caches and export them
+        for opts in (["-uf", "-t", "url,eclass"], ["--export", bundle]):
+            with patch("sys.argv", args + opts), pytest.raises(SystemExit) as excinfo:
+                self.script()
+            assert excinfo.value.code == 0
+        # caches depending on file locations and mtimes aren't exported
+        with tarfile.open(bundle) as tar:
+            assert sorted(tar.getnames()) == ["0/url.pickle", "manifest.json"]
+
+        # import the bundle into a separate cache dir
+        cache_dir = str(tmp_path / "imported")
+        import_args = [project, "--config", self.args[2], "cache", "--cache-dir", cache_dir]
+        import_args += ["-r", "eclass", "-t", "url"]
+        with patch("sys.argv", import_args + ["-n", "--import", bundle]):
+            with pytest.raises(SystemExit) as excinfo:
+                self.script()
+            out, err = capsys.readouterr()
+            assert out.startswith(f"Would import {cache_dir}")
+            assert excinfo.value.code == 0
+        with patch("sys.argv", import_args + ["--import", bundle]):
+            with pytest.raises(SystemExit) as excinfo:
+                self.script()
+            assert excinfo.value.code == 0
+
+        # verify the imported cache shows up
+        with patch("sys.argv", import_args), pytest.raises(SystemExit) as excinfo:
+            self.script()
+        out, err = capsys.readouterr()
+        assert out.strip().splitlines()[-1].startswith("eclass-")
+        assert excinfo.value.code == 0
+
+    def test_untrusted_cache_bundle(self, capsys, tmp_path):
+        bundle = str(tmp_path / "caches.tar.gz")
+        manifest = {
+            "version": 1,
+            "repos": [{"repo_id": "eclass", "commit": None, "caches": {"url": "0/url.pickle"}}],
+        }
+        with tarfile.open(bundle, "w:gz") as tar:
+            for name, data in (
+                ("0/url.pickle", pickle.dumps(os.getcwd)),
+                ("manifest.json", json.dumps(manifest).encode()),
+            ):
+                tarinfo = tarfile.TarInfo(name)
+                tarinfo.size = len(data)
+                tar.addfile(tarinfo, io.BytesIO(data))
+
+        # bundled caches referencing arbitrary globals are rejected
+        with patch("sys.argv", self.args + ["-r", "eclass", "--import", bundle]):
+            with pytest.raises(SystemExit) as excinfo:
+                self.script()
+            out, err = capsys.readouterr()
+            assert "invalid url cache in bundle" in err
+            assert "disallowed global: posix.getcwd" in err
+            assert excinfo.value.code == 2
+        assert not os.path.exists(pjoin(self.cache_dir, "repos"))
+
+    def test_invalid_cache_bundle(self, capsys, tmp_path):
+        bundle = tmp_path / "caches.tar.gz"
+        bundle.write_text("foo")
+        with patch("sys.argv", self.args + ["--import", str(bundle)]):
+            with pytest.raises(SystemExit) as excinfo:
+                self.script()
+            out, err = capsys.readouterr()
+            assert err.startswith("pkgcheck cache: error: failed importing caches")
+            assert excinfo.value.code == 2
@@ -521,6 +521,44 @@ class TestPkgcheckScan:
         with pytest.raises(base.PkgcheckException, match=error):
             self.scan(self.scan_args + args)
 
+    def test_cache_disabled_optional_addon(self):
+        """Checks with optional addons still run when the related cache is disabled."""
+        args = ["--cache=-files", "-r", "standalone", "-c", "PkgDirCheck", "-k", "DuplicateFiles"]
+        results = list(self.scan(self.scan_args + args + ["PkgDirCheck/DuplicateFiles"]))
+        assert [x.__class__.__name__ for x in results] == ["DuplicateFiles"]
+
+        # explicitly selected checks aren't skipped either
+        args = ["--cache=-files", "-r", "gentoo", "-c", "RepoDirCheck"]
+        assert not list(self.scan(self.scan_args + args))
+
+    def test_staged(self, capsys, make_repo, make_git_repo):
+        git_repo = make_git_repo()
+        repo = make_repo(git_repo.path)
+        repo.create_ebuild("cat/pkg-0")
+        git_repo.add_all("cat/pkg-0")
+        # stage an invalid EAPI while the working tree has a valid one
+        ebuild = repo.create_ebuild("cat/pkg-0", eapi="-1")
+        git_repo.run(["git", "add", "cat/pkg"])
+        repo.create_ebuild("cat/pkg-0")
+        with open(ebuild) as f:
+            data = f.read()
+        mtime = os.stat(ebuild).st_mtime_ns
+
+        args = ["-r", repo.location, "--staged", "-k", "InvalidEapi", "-R", "StrReporter"]
+        with patch("sys.argv", self.args + args):
+            with pytest.raises(SystemExit) as excinfo:
+                self.script()
+            assert excinfo.value.code == 0
+        out, err = capsys.readouterr()
+        assert not err
+        assert out.startswith("cat/pkg-0: ")
+        assert "invalid EAPI" in out
+
+        # the working tree is left untouched
+        with open(ebuild) as f:
+            assert f.read() == data
+        assert os.stat(ebuild).st_mtime_ns == mtime
+
     @pytest.mark.parametrize(
         "module",
         (
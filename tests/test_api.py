@@ -1,6 +1,7 @@
 import multiprocessing
 import os
 import signal
+from unittest.mock import patch
 
 import pytest
 
@@ -24,6 +25,13 @@ class TestScanApi:
     def test_no_base_args(self, repo):
         assert [] == list(scan(self.scan_args + ["-r", repo.location]))
 
+    def test_gc_freeze(self, repo):
+        """Verify objects are only frozen in the GC while forking the pipeline."""
+        with patch("pkgcheck.pipeline.gc") as fake_gc:
+            assert [] == list(scan(self.scan_args + ["-r", repo.location]))
+        fake_gc.freeze.assert_called_once()
+        fake_gc.unfreeze.assert_called_once()
+
     def test_sigint_handling(self, repo):
         """Verify SIGINT is properly handled by the parallelized pipeline."""
 
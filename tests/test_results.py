@@ -0,0 +1,132 @@
+import io
+import itertools
+import pickle
+import re
+
+import pytest
+from pkgcore.ebuild import cpv
+
+from pkgcheck import results
+from pkgcheck.checks.metadata import RedundantUriRename
+from pkgcheck.packages import FilteredPkg, RawCPV
+
+
+class _Result(results.VersionResult, results.Warning):
+    """Result with a counted description."""
+
+    calls = 0
+
+    def __init__(self, msg, **kwargs):
+        super().__init__(**kwargs)
+        self.msg = msg
+
+    @property
+    def desc(self):
+        _Result.calls += 1
+        return self.msg
+
+
+class LineStyle(results.LineResult, results.Style):
+    """Line result described by its line."""
+
+    @property
+    def desc(self):
+        return self.line
+
+
+class TestResult:
+    def test_cached_values(self):
+        pkg = RawCPV("cat", "pkg", "1")
+        r1, r2 = _Result("foo", pkg=pkg), _Result("bar", pkg=pkg)
+        _Result.calls = 0
+        for _ in range(3):
+            assert sorted([r1, r2]) == [r2, r1]
+        # descriptions are only rendered once for sorting
+        assert _Result.calls == 2
+        assert r1._attrs == {"category": "cat", "package": "pkg", "version": "1", "msg": "foo"}
+        # attribute mappings are copies
+        r1._attrs["msg"] = "bar"
+        assert r1.msg == r1._attrs["msg"] == "foo"
+        assert hash(r1) == hash(_Result("foo", pkg=pkg))
+
+        # cached values aren't serialized
+        data = pickle.dumps(r1)
+        assert b"_cached_" not in data
+        r = pickle.loads(data)
+        assert r == r1
+        assert hash(r) == hash(r1)
+
+    def test_sort_key(self):
+        versions = [
+            "0", "0.01", "0.1", "0.10", "0.100", "0.2", "1", "1.0", "1.00", "1.0-r1", "1.0.0",
+            "1.0a", "1.0b-r2", "1.1", "1.01", "1.10", "1.2_alpha", "1.2_alpha1", "1.2_beta",
+            "1.2_pre2", "1.2_rc", "1.2_rc1_p1", "1.2", "1.2-r01", "1.2_p", "1.2_p0", "1.2_p1_alpha",
+            "1.2_p1", "1.2_p1-r3", "2_pre1_p2", "2_pre1_p2-r1", "10", "2010.09",
+        ]  # fmt: skip
+        pkgs = [RawCPV("cat", "pkg", v) for v in versions]
+        for pkg1, pkg2 in itertools.product(pkgs, repeat=2):
+            r1, r2 = _Result("foo", pkg=pkg1), _Result("foo", pkg=pkg2)
+            cmp = cpv.ver_cmp(*(r1.ver_rev + r2.ver_rev))
+            assert (r1 < r2, r2 < r1) == (cmp < 0, cmp > 0), (pkg1.version, pkg2.version)
+
+        # package level results sort before version results and lines by line number
+        pkg = RawCPV("cat", "pkg", "1")
+        objs = [
+            LineStyle("bar", 1, pkg=pkg),
+            _Result("foo", pkg=RawCPV("cat", "pkg", "2")),
+            LineStyle("foo", 2, pkg=pkg),
+            _Result("bar", pkg=pkg),
+            LineStyle("baz", 1, pkg=pkg),
+            RedundantUriRename(RawCPV("a", "pkg", "0"), "foo"),
+        ]
+        assert sorted(reversed(objs)) == sorted(objs) == [objs[i] for i in (5, 3, 0, 4, 2, 1)]
+
+    def test_pack(self):
+        pkg = RawCPV("cat", "pkg", "1")
+        objs = [
+            RedundantUriRename(pkg, "foo"),
+            RedundantUriRename(pkg, "bar"),
+            RedundantUriRename(FilteredPkg(pkg=pkg), "baz"),
+            _Result("qux", pkg=pkg),
+        ]
+        packed = results.pack(objs)
+        # registered keywords are stored by index, other classes directly
+        assert isinstance(packed[0][0], int)
+        assert packed[3][0] is _Result
+        # attribute names are shared between results with matching attributes
+        assert packed[0][1] is packed[1][1]
+
+        unpacked = results.unpack(pickle.loads(pickle.dumps(packed)))
+        assert [r.__dict__ for r in unpacked] == [r.__getstate__() for r in objs]
+        assert unpacked == objs
+        assert unpacked[2]._filtered
+
+    def test_dump(self):
+        pkg = RawCPV("cat", "pkg", "1")
+        objs = [RedundantUriRename(pkg, "foo"), _Result("bar", pkg=pkg)]
+        f = io.BytesIO()
+        results.dump(objs, f)
+        f.seek(0)
+        assert results.load(f) == objs
+
+        # unknown keywords and malformed data raise errors
+        f = io.BytesIO()
+        pickle.dump((("Unknown",), ((0, (), ()),)), f)
+        f.seek(0)
+        with pytest.raises(results.InvalidResult, match="unknown result keyword"):
+            results.load(f)
+        with pytest.raises(results.InvalidResult, match="failed loading results"):
+            results.load(io.BytesIO(b"foo"))
+
+    @pytest.mark.parametrize(
+        "packed, error",
+        (
+            (((1, (), ()),), "invalid result keyword index: 1"),
+            (((-1, (), ()),), "invalid result keyword index: -1"),
+            ((("Unknown", (), ()),), "invalid result class: 'Unknown'"),
+            (((dict, (), ()),), "invalid result class: <class 'dict'>"),
+        ),
+    )
+    def test_unpack_invalid(self, packed, error):
+        with pytest.raises(results.InvalidResult, match=re.escape(error)):
+            results.unpack(packed, ("RedundantUriRename",))